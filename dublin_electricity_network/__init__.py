@@ -1,6 +1,145 @@
-from dublin_electricity_network.distance import *
-from dublin_electricity_network.download import *
-from dublin_electricity_network.io import *
-from dublin_electricity_network.join import *
-from dublin_electricity_network.paths import *
-from dublin_electricity_network.plot import *
+"""
+Submodules are only imported when one of their functions is first used.
+
+`import dublin_electricity_network as den` is therefore cheap &
+`den.read_dgn(...)` only pulls in the dependencies of `read_dgn`, which
+matters for CLI & worker processes that only need a few functions.
+"""
+
+from importlib import import_module
+
+# importing a submodule sets it as an attribute of the package, which would
+# hide a function of the same name, so `download` is bound up front
+from dublin_electricity_network.download import download
+
+_submodule_attrs = {
+    "aggregate": ["Incidence", "aggregate_to_stations", "build_incidence"],
+    "assemble": ["assemble_network", "write_tile_tables"],
+    "astar": [
+        "Landmarks",
+        "get_shortest_paths",
+        "read_landmarks",
+        "select_landmarks",
+        "write_landmarks",
+    ],
+    "assign": ["assign_stations_with_capacity", "solve_capacitated_assignment"],
+    "catchments": ["get_network_voronoi", "get_station_catchments"],
+    "cluster": ["ClusterSweep", "cluster_itm_coords", "sweep_cluster_params"],
+    "components": ["extract_components", "label_components", "summarise_components"],
+    "distance": [
+        "get_large_subgraphs",
+        "get_largest_subgraph",
+        "get_nearest_node",
+        "get_nearest_nodes",
+        "get_network_paths_between_points_recursively",
+        "remove_subgraph",
+    ],
+    "dgn": ["DGNElements", "elements_to_gdf", "read_dgn"],
+    "download": ["TqdmUpTo", "download"],
+    "files": ["atomic_output"],
+    "graph": [
+        "NetworkGraph",
+        "as_network_graph",
+        "dequantise_xy",
+        "edge_coordinates",
+        "find_nodes",
+        "from_lines",
+        "from_networkx",
+        "make_network_graph",
+        "nearest_nodes",
+        "node_coordinates",
+        "pack_xy_keys",
+        "points_to_xy",
+        "quantise_xy",
+        "read_network_graph",
+        "subset_graph",
+        "to_csr_matrix",
+        "to_gdfs",
+        "unpack_xy_keys",
+        "write_network_graph",
+    ],
+    "io": [
+        "read_capacitymap",
+        "read_dublin_admin_county_boundaries",
+        "read_dublin_small_areas",
+        "read_heatmap",
+        "read_mv_index",
+        "read_network",
+    ],
+    "join": [
+        "centroids_within",
+        "join_nearest_points",
+        "link_remaining_to_nearest",
+        "snap_points_to_network",
+    ],
+    "layers": [
+        "LayeredNetwork",
+        "build_layered_network",
+        "read_layered_network",
+        "route_through_layers",
+    ],
+    "osm": ["OVERPASS_URL", "get_osm_points"],
+    "paths": [
+        "extract_nearest_dest",
+        "get_k_nearest_dests",
+        "get_network_paths_between_points",
+        "iter_network_paths_between_points",
+    ],
+    "plot": [
+        "plot_cad_stations_vs_heatmap_stations",
+        "plot_gdf_vs_nx",
+        "plot_graph",
+        "plot_heatmap_vs_capacitymap",
+        "plot_path_n",
+        "plot_paths_to_files",
+        "plot_paths_to_files_delayed",
+        "plot_small_areas_linked_to_stations",
+    ],
+    "pool": ["process_pool", "worker_state"],
+    "projection": [
+        "get_transformer",
+        "points_from_xy",
+        "to_crs",
+        "transform_xy",
+        "with_lat_long",
+    ],
+    "raster": [
+        "NO_STATION",
+        "StationGrid",
+        "lookup_stations",
+        "rasterise_nearest_stations",
+        "read_station_grid",
+        "write_station_grid",
+    ],
+    "service": [
+        "StationIndex",
+        "build_station_index",
+        "handle_request",
+        "query_station_index",
+        "serve",
+    ],
+    "stream": ["read_chunks", "write_nearest_dest_in_chunks"],
+    "tiles": ["write_mbtiles"],
+}
+
+_attr_to_submodule = {
+    attr: submodule for submodule, attrs in _submodule_attrs.items() for attr in attrs
+}
+
+
+def __getattr__(name):
+
+    if name in _attr_to_submodule:
+        submodule = import_module(f"{__name__}.{_attr_to_submodule[name]}")
+        attr = getattr(submodule, name)
+        globals()[name] = attr  # cache so __getattr__ is skipped next time
+        return attr
+    elif name in _submodule_attrs:
+        return import_module(f"{__name__}.{name}")
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+
+    return sorted(list(globals()) + list(_attr_to_submodule) + list(_submodule_attrs))
@@ -0,0 +1,111 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse import csr_matrix
+
+
+class Incidence(NamedTuple):
+    """
+    Share of each area served by each station.
+
+    `matrix[i, j]` is the share of `areas[j]` served by `stations[i]`, so
+    station totals of any per-area quantity are one sparse matrix multiply.
+    """
+
+    matrix: csr_matrix
+    stations: np.ndarray
+    areas: np.ndarray
+
+
+def build_incidence(
+    linked,
+    area_column="SMALL_AREA",
+    station_column="station_name",
+    share_column=None,
+    areas=None,
+):
+    """
+    Build the sparse station x area incidence matrix of an assignment.
+
+    Parameters
+    ----------
+    linked : pandas.DataFrame
+        One row per (area, station) link, e.g. from `extract_nearest_dest` or
+        the allocations of `solve_capacitated_assignment`
+    area_column : str
+        Column identifying each area
+    station_column : str
+        Column identifying each station
+    share_column : str, optional
+        Column holding the share of the area served by the station where an
+        area is split between stations, by default each link has a share of 1
+    areas : array-like, optional
+        Order of the matrix columns, e.g. the rows of a profile matrix, by
+        default the areas in the order they first appear in linked
+
+    Returns
+    -------
+    Incidence
+    """
+    link_areas = linked[area_column].to_numpy()
+    if areas is None:
+        areas = pd.unique(link_areas)
+    area_ids = pd.Index(areas).get_indexer(link_areas)
+    if (area_ids < 0).any():
+        raise ValueError(f"{(area_ids < 0).sum()} linked areas are not in areas")
+    stations, station_ids = np.unique(
+        linked[station_column].to_numpy(), return_inverse=True
+    )
+
+    if share_column:
+        shares = linked[share_column].to_numpy(dtype=np.float64)
+    else:
+        shares = np.ones(len(linked))
+
+    # duplicate links are summed by the conversion to CSR
+    matrix = coo_matrix(
+        (shares, (station_ids.ravel(), area_ids)),
+        shape=(len(stations), len(areas)),
+    ).tocsr()
+    return Incidence(matrix=matrix, stations=stations, areas=np.asarray(areas))
+
+
+def aggregate_to_stations(incidence, values):
+    """
+    Sum per-area values up to each station with one sparse matrix multiply.
+
+    Parameters
+    ----------
+    incidence : Incidence
+    values : pandas.DataFrame, pandas.Series or numpy.ndarray
+        Attribute columns (e.g. population) indexed by area, or an
+        (n_areas, n_hours) profile matrix whose rows follow
+        `incidence.areas`; areas missing from a DataFrame count as 0
+
+    Returns
+    -------
+    pandas.DataFrame, pandas.Series or numpy.ndarray
+        Indexed by station if values is a pandas object, else an
+        (n_stations, n_hours) array with rows following `incidence.stations`
+    """
+    if isinstance(values, (pd.DataFrame, pd.Series)):
+        area_values = values.reindex(incidence.areas, fill_value=0)
+        station_values = incidence.matrix @ area_values.to_numpy()
+        if isinstance(values, pd.Series):
+            return pd.Series(station_values, index=incidence.stations, name=values.name)
+        return pd.DataFrame(
+            station_values, index=incidence.stations, columns=values.columns
+        )
+
+    values = np.asarray(values)
+    if len(values) != len(incidence.areas):
+        raise ValueError(
+            f"values has {len(values)} rows but there are {len(incidence.areas)} areas"
+        )
+    matrix = incidence.matrix
+    if np.issubdtype(values.dtype, np.floating):
+        # avoid upcasting large float32 profiles to float64
+        matrix = matrix.astype(values.dtype, copy=False)
+    return matrix @ values
@@ -0,0 +1,151 @@
+from os import path
+from pathlib import Path
+
+import numpy as np
+from tqdm import tqdm
+
+from dublin_electricity_network.files import atomic_output
+from dublin_electricity_network.graph import _snap_keys
+from dublin_electricity_network.graph import dequantise_xy
+from dublin_electricity_network.graph import from_lines
+from dublin_electricity_network.graph import make_network_graph
+from dublin_electricity_network.graph import unpack_xy_keys
+from dublin_electricity_network.io import read_network
+
+
+def write_tile_tables(
+    filepaths, dirpath, levels=[10, 11, 14], tolerance=0.01, include_geometry=True
+):
+    """
+    Convert each network tile to node & edge tables on disk one at a time.
+
+    Each tile is written to `{dirpath}/{tile}.npz` holding the snapped
+    coordinate keys & lengths of its edges, so peak memory is bounded by the
+    largest tile.  Tiles that have already been written are skipped.
+
+    Parameters
+    ----------
+    filepaths : list of pathlib.Path
+        MV-LV Data DGN tiles
+    dirpath : str or pathlib.Path
+        Directory in which to save the tables
+    levels : list of int
+        Levels of the network lines
+    tolerance : float
+        Endpoints within the same `tolerance` metre grid cell are treated as
+        the same node
+    include_geometry : bool
+        Also save the vertices of each edge
+    """
+    dirpath = Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+
+    for filepath in tqdm(filepaths):
+
+        tile_filepath = dirpath / f"{Path(filepath).stem}.npz"
+        if path.exists(tile_filepath):
+            continue
+
+        lines = read_network([filepath], levels=levels)
+        tile = from_lines(lines, tolerance=tolerance)
+
+        node_keys = _snap_keys(tile.node_xy, tolerance)
+        tables = {
+            "u_key": node_keys[tile.edge_u],
+            "v_key": node_keys[tile.edge_v],
+            "length": tile.edge_length,
+        }
+        if include_geometry:
+            tables["edge_offsets"] = tile.edge_offsets
+            tables["edge_xy"] = tile.edge_xy
+
+        # np.savez appends .npz to a path, but not to an open file
+        with atomic_output(tile_filepath) as temp_filepath, open(
+            temp_filepath, "wb"
+        ) as f:
+            np.savez(f, **tables)
+
+
+def assemble_network(dirpath, tolerance=0.01, include_geometry=False, quantise=False):
+    """
+    Assemble the tile tables written by `write_tile_tables` into one graph.
+
+    Nodes shared by neighbouring tiles are merged via their snapped
+    coordinate keys & edges duplicated across tile boundaries are dropped.
+
+    Parameters
+    ----------
+    dirpath : str or pathlib.Path
+        Directory containing the tile tables
+    tolerance : float
+        The tolerance the tables were written with
+    include_geometry : bool
+        Also load the vertices of each edge
+    quantise : bool
+        Keep the coordinates as integer multiples of `tolerance`
+
+    Returns
+    -------
+    NetworkGraph
+    """
+    tile_filepaths = sorted(Path(dirpath).glob("*.npz"))
+    if not tile_filepaths:
+        raise FileNotFoundError(f"No tile tables saved in {dirpath}")
+
+    u_keys = []
+    v_keys = []
+    lengths = []
+    vertex_counts = []
+    edge_xys = []
+    for tile_filepath in tqdm(tile_filepaths):
+        with np.load(tile_filepath) as tile:
+            u_keys.append(tile["u_key"])
+            v_keys.append(tile["v_key"])
+            lengths.append(tile["length"])
+            if include_geometry:
+                vertex_counts.append(np.diff(tile["edge_offsets"]))
+                edge_xys.append(tile["edge_xy"])
+
+    u_keys = np.concatenate(u_keys)
+    v_keys = np.concatenate(v_keys)
+    lengths = np.concatenate(lengths)
+
+    node_keys, node_ids = np.unique(
+        np.concatenate([u_keys, v_keys]), return_inverse=True
+    )
+    node_ids = node_ids.ravel()
+    edge_u, edge_v = node_ids[: len(u_keys)], node_ids[len(u_keys) :]
+
+    # lines which cross a tile boundary can appear in both tiles
+    edges = np.column_stack(
+        [
+            np.minimum(edge_u, edge_v),
+            np.maximum(edge_u, edge_v),
+            np.round(lengths / tolerance).astype(np.int64),
+        ]
+    )
+    _, first = np.unique(edges, axis=0, return_index=True)
+    first = np.sort(first)
+
+    if include_geometry:
+        vertex_counts = np.concatenate(vertex_counts)
+        edge_offsets = np.zeros(len(first) + 1, dtype=np.int64)
+        np.cumsum(vertex_counts[first], out=edge_offsets[1:])
+        is_first = np.zeros(len(vertex_counts), dtype=bool)
+        is_first[first] = True
+        edge_xy = np.concatenate(edge_xys)[np.repeat(is_first, vertex_counts)]
+    else:
+        edge_offsets = None
+        edge_xy = None
+
+    # the node keys are already the quantised coordinates
+    node_xy = unpack_xy_keys(node_keys)
+    return make_network_graph(
+        node_xy if quantise else dequantise_xy(node_xy, tolerance),
+        edge_u[first],
+        edge_v[first],
+        lengths[first],
+        edge_offsets=edge_offsets,
+        edge_xy=edge_xy,
+        resolution=tolerance if quantise else None,
+    )
@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+from scipy.sparse import coo_matrix
+
+from dublin_electricity_network.paths import get_k_nearest_dests
+
+
+def _get_values(points, column):
+
+    if isinstance(column, str):
+        return points[column].to_numpy(dtype=np.float64)
+    else:
+        return np.asarray(column, dtype=np.float64)
+
+
+def solve_capacitated_assignment(candidates, demand, capacity):
+    """
+    Assign demand to candidate stations without exceeding station capacity.
+
+    Solves the min-cost flow from origins to stations over the sparse set of
+    candidate (origin, station) pairs as a linear program, so an origin's
+    demand is split across stations only where a station fills up.  Demand
+    that cannot be served by any of an origin's candidates is overflow.
+
+    Parameters
+    ----------
+    candidates : pandas.DataFrame
+        Columns `origin`, `station` & `distance` where origin & station are
+        integer positions into `demand` & `capacity`
+    demand : numpy.ndarray
+        (n_orig,) demand of each origin
+    capacity : numpy.ndarray
+        (n_dest,) available capacity of each station
+
+    Returns
+    -------
+    tuple of (pandas.DataFrame, pandas.DataFrame)
+        Allocations with columns `origin`, `station`, `distance`, `demand` &
+        `share`, and overflow with columns `origin` & `demand`
+
+    Raises
+    ------
+    ValueError
+        If any demand or capacity is negative, NaN or infinite
+    """
+    demand = np.asarray(demand, dtype=np.float64)
+    capacity = np.asarray(capacity, dtype=np.float64)
+    for name, values in (("demand", demand), ("capacity", capacity)):
+        # a NaN bound is silently dropped by the solver
+        if not np.all(np.isfinite(values) & (values >= 0)):
+            raise ValueError(f"{name} must be finite & non-negative")
+    origin = candidates["origin"].to_numpy()
+    station = candidates["station"].to_numpy()
+    distance = candidates["distance"].to_numpy(dtype=np.float64)
+
+    n_orig = len(demand)
+    n_candidates = len(candidates)
+
+    # overflow must always cost more than re-routing demand through a chain of
+    # stations so that it is only used when capacity is exhausted
+    max_distance = distance.max() if n_candidates else 0
+    overflow_cost = (max_distance + 1) * (len(capacity) + 1)
+    costs = np.concatenate([distance, np.full(n_orig, overflow_cost)])
+
+    flow_ids = np.arange(n_candidates + n_orig)
+    A_eq = coo_matrix(
+        (
+            np.ones(n_candidates + n_orig),
+            (np.concatenate([origin, np.arange(n_orig)]), flow_ids),
+        ),
+        shape=(n_orig, n_candidates + n_orig),
+    ).tocsr()
+    A_ub = coo_matrix(
+        (np.ones(n_candidates), (station, np.arange(n_candidates))),
+        shape=(len(capacity), n_candidates + n_orig),
+    ).tocsr()
+
+    result = linprog(
+        costs,
+        A_ub=A_ub,
+        b_ub=capacity,
+        A_eq=A_eq,
+        b_eq=demand,
+        bounds=(0, None),
+        method="highs",
+    )
+    if not result.success:
+        raise ValueError(f"Assignment could not be solved: {result.message}")
+
+    flows = result.x[:n_candidates]
+    overflows = result.x[n_candidates:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        share = np.where(demand[origin] > 0, flows / demand[origin], 0)
+
+    allocated = flows > 1e-9
+    allocations = pd.DataFrame(
+        {
+            "origin": origin[allocated],
+            "station": station[allocated],
+            "distance": distance[allocated],
+            "demand": flows[allocated],
+            "share": share[allocated],
+        }
+    ).reset_index(drop=True)
+
+    overflowed = overflows > 1e-9
+    overflow = pd.DataFrame(
+        {
+            "origin": np.flatnonzero(overflowed),
+            "demand": overflows[overflowed],
+        }
+    )
+
+    return allocations, overflow
+
+
+def assign_stations_with_capacity(
+    G, orig_points, dest_points, demand, capacity, k=5, max_distance=np.inf
+):
+    """
+    Link each orig to its nearest dests along the network subject to capacity.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+        input graph
+    orig_points : geopandas.GeoDataFrame
+        The points (or polygons such as Small Areas) to be assigned
+    dest_points : geopandas.GeoDataFrame
+        The stations, already snapped to the network
+    demand : str or array-like
+        Column of `orig_points` (or values) holding each orig's demand
+    capacity : str or array-like
+        Column of `dest_points` (or values) holding each station's available
+        capacity such as `Demand Available MVA`
+    k : int
+        Number of nearest stations considered as candidates for each orig
+    max_distance : float
+        Ignore stations further than this along the network
+
+    Returns
+    -------
+    tuple of (pandas.DataFrame, pandas.DataFrame)
+        Allocations & overflow as returned by `solve_capacitated_assignment`
+        where `origin` & `station` are positions in `orig_points` &
+        `dest_points`
+    """
+    candidates = get_k_nearest_dests(
+        G, orig_points, dest_points, k=k, max_distance=max_distance
+    )
+
+    return solve_capacitated_assignment(
+        candidates,
+        demand=_get_values(orig_points, demand),
+        capacity=_get_values(dest_points, capacity),
+    )
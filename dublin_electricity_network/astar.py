@@ -0,0 +1,281 @@
+import json
+from heapq import heappop
+from heapq import heappush
+from math import hypot
+from math import inf
+from pathlib import Path
+from typing import NamedTuple
+
+import geopandas as gpd
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+from shapely.geometry import LineString
+
+from dublin_electricity_network.graph import as_network_graph
+from dublin_electricity_network.graph import dequantise_xy
+from dublin_electricity_network.graph import nearest_nodes
+from dublin_electricity_network.graph import node_coordinates
+from dublin_electricity_network.graph import points_to_xy
+from dublin_electricity_network.graph import to_csr_matrix
+
+# relative rounding error of a landmark distance stored as float32
+_LANDMARK_EPS = float(np.finfo(np.float32).eps)
+
+
+class Landmarks(NamedTuple):
+    """
+    Network distances from a few landmark nodes to every node.
+
+    `distances[node, i]` is the distance from `nodes[i]` to node (inf if
+    unreachable), stored as float32 to keep the table compact.
+    """
+
+    nodes: np.ndarray
+    distances: np.ndarray
+
+
+def select_landmarks(G, n_landmarks=8):
+    """
+    Pick landmarks spread around the edge of the network.
+
+    Each landmark is the node furthest along the network from the landmarks
+    already chosen, so the landmarks end up on the periphery where their
+    lower bounds are tightest.  Only the component of node 0 is covered, so
+    select landmarks on a graph reduced by `extract_components`.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+        input graph
+    n_landmarks : int
+        Number of landmarks, each costs one float32 per node
+
+    Returns
+    -------
+    Landmarks
+    """
+    graph = as_network_graph(G)
+    csr = to_csr_matrix(graph)
+
+    nodes = []
+    distances = []
+    # start from the node furthest from an arbitrary node
+    furthest = dijkstra(csr, directed=True, indices=0)
+    for _ in range(n_landmarks):
+        node = int(np.argmax(np.where(np.isfinite(furthest), furthest, -1)))
+        if node in nodes:
+            break
+        nodes.append(node)
+        distances.append(dijkstra(csr, directed=True, indices=node))
+        furthest = np.minimum.reduce(distances)
+
+    return Landmarks(
+        nodes=np.array(nodes, dtype=np.int64),
+        distances=np.column_stack(distances).astype(np.float32),
+    )
+
+
+def write_landmarks(landmarks, dirpath):
+
+    dirpath = Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+    np.save(dirpath / "landmark_nodes.npy", landmarks.nodes)
+    np.save(dirpath / "landmark_distances.npy", landmarks.distances)
+    with open(dirpath / "landmarks.json", "w") as f:
+        json.dump({"n_landmarks": len(landmarks.nodes)}, f)
+
+
+def read_landmarks(dirpath, mmap_mode="r"):
+
+    dirpath = Path(dirpath)
+    if not (dirpath / "landmarks.json").exists():
+        raise FileNotFoundError(f"No landmarks saved in {dirpath}")
+    return Landmarks(
+        nodes=np.load(dirpath / "landmark_nodes.npy"),
+        distances=np.load(dirpath / "landmark_distances.npy", mmap_mode=mmap_mode),
+    )
+
+
+def _astar(graph, source, target, landmarks=None, n_active_landmarks=4):
+    """
+    Find the shortest path between two nodes with A*.
+
+    The heuristic is the straight-line distance to the target, which never
+    overestimates as no edge is shorter than the straight line between its
+    nodes, & if landmarks are given the ALT bound
+    `|d(L, target) - d(L, node)|` for each landmark L, less its float32
+    rounding error.  As in ALT only the `n_active_landmarks` landmarks with
+    the tightest bound at the source are checked at each node.
+
+    Returns
+    -------
+    tuple of (float, list of int, list of int, int)
+        Network distance (inf if unreachable), node path & edge path from
+        source to target and the number of nodes settled
+    """
+    # plain arrays as indexing memory-mapped arrays is several times slower
+    indptr = np.asarray(graph.indptr)
+    indices = np.asarray(graph.indices)
+    weights = np.asarray(graph.weights)
+    edge_index = np.asarray(graph.edge_index)
+    node_xy = np.asarray(graph.node_xy)
+    # quantised coordinates are scaled back to metres per node
+    scale = graph.resolution or 1.0
+    target_x, target_y = node_xy[target].tolist()
+
+    if landmarks is not None:
+        landmark_distances = np.asarray(landmarks.distances)
+        target_landmark = landmark_distances[target].tolist()
+        source_landmark = landmark_distances[source].tolist()
+        if [d < inf for d in target_landmark] != [d < inf for d in source_landmark]:
+            # a landmark reaches one of them but not the other
+            return inf, [], [], 0
+        # only the landmarks giving the tightest bound at the source are used,
+        # those in other components bound nothing
+        active_landmarks = sorted(
+            (
+                (abs(target_distance - source_distance), i, target_distance)
+                for i, (target_distance, source_distance) in enumerate(
+                    zip(target_landmark, source_landmark)
+                )
+                if target_distance < inf
+            ),
+            reverse=True,
+        )
+        active_landmarks = [
+            (i, target_distance)
+            for _, i, target_distance in active_landmarks[:n_active_landmarks]
+        ]
+
+    def heuristic(node):
+        x, y = node_xy[node].tolist()
+        bound = hypot(x - target_x, y - target_y) * scale
+        if landmarks is not None:
+            node_landmark = landmark_distances[node].tolist()
+            for i, target_distance in active_landmarks:
+                node_distance = node_landmark[i]
+                landmark_bound = abs(target_distance - node_distance) - (
+                    _LANDMARK_EPS * (target_distance + node_distance)
+                )
+                if landmark_bound > bound:
+                    bound = landmark_bound
+        return bound
+
+    best = {source: 0.0}
+    bounds = {}
+    predecessors = {source: (-1, -1)}
+    queue = [(0.0, 0.0, source)]
+    n_settled = 0
+    while queue:
+        _, distance, node = heappop(queue)
+        if node == target:
+            break
+        if distance > best[node]:
+            continue
+        n_settled += 1
+
+        start, end = indptr[node], indptr[node + 1]
+        for neighbour, weight, edge in zip(
+            indices[start:end].tolist(),
+            weights[start:end].tolist(),
+            edge_index[start:end].tolist(),
+        ):
+            neighbour_distance = distance + weight
+            if neighbour_distance < best.get(neighbour, inf):
+                best[neighbour] = neighbour_distance
+                predecessors[neighbour] = (node, edge)
+                if neighbour not in bounds:
+                    bounds[neighbour] = heuristic(neighbour)
+                heappush(
+                    queue,
+                    (
+                        neighbour_distance + bounds[neighbour],
+                        neighbour_distance,
+                        neighbour,
+                    ),
+                )
+
+    if target not in best:
+        return inf, [], [], n_settled
+
+    path = [target]
+    edges = []
+    while predecessors[path[-1]][0] >= 0:
+        node, edge = predecessors[path[-1]]
+        path.append(node)
+        edges.append(edge)
+    return best[target], path[::-1], edges[::-1], n_settled
+
+
+def _path_geometry(graph, path, edges):
+
+    if len(path) < 2:
+        return None
+    if graph.edge_xy is None:
+        return LineString(node_coordinates(graph, path))
+
+    coords = []
+    for node, edge in zip(path[:-1], edges):
+        edge_xy = graph.edge_xy[graph.edge_offsets[edge] : graph.edge_offsets[edge + 1]]
+        if graph.edge_u[edge] != node:
+            edge_xy = edge_xy[::-1]
+        # drop the first vertex of each edge as it ends the previous edge
+        coords.append(edge_xy if not coords else edge_xy[1:])
+    coords = np.concatenate(coords)
+    if graph.resolution:
+        coords = dequantise_xy(coords, graph.resolution)
+    return LineString(coords)
+
+
+def get_shortest_paths(G, orig_points, dest_points, landmarks=None):
+    """
+    Find the shortest path between each pair of points along the network.
+
+    Unlike `get_network_paths_between_points` each query is goal directed, so
+    a single path touches only the part of the network between its ends.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+        input graph
+    orig_points : geopandas.GeoDataFrame
+        The points (or polygons such as Small Areas) to route from
+    dest_points : geopandas.GeoDataFrame
+        The points to route to, paired with orig_points row by row
+    landmarks : Landmarks, optional
+        Precomputed by `select_landmarks` on the same graph to tighten the
+        heuristic so fewer nodes are settled
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        Columns `network_distance` (inf if unreachable), `n_settled` nodes &
+        the path `geometry` for each pair, None if unreachable or if both
+        points snap to the same node
+    """
+    if len(orig_points) != len(dest_points):
+        raise ValueError("orig_points & dest_points must be paired row by row")
+
+    graph = as_network_graph(G)
+    # snap both ends in one go so the KD-tree is only built once
+    nodes, _ = nearest_nodes(
+        graph, np.vstack([points_to_xy(orig_points), points_to_xy(dest_points)])
+    )
+    orig_nodes, dest_nodes = nodes[: len(orig_points)], nodes[len(orig_points) :]
+
+    distances = []
+    n_settled = []
+    geometries = []
+    for orig_node, dest_node in zip(orig_nodes.tolist(), dest_nodes.tolist()):
+        distance, path, edges, settled = _astar(
+            graph, orig_node, dest_node, landmarks=landmarks
+        )
+        distances.append(distance)
+        n_settled.append(settled)
+        geometries.append(_path_geometry(graph, path, edges))
+
+    return gpd.GeoDataFrame(
+        {"network_distance": distances, "n_settled": n_settled},
+        geometry=geometries,
+        crs=getattr(orig_points, "crs", None),
+    )
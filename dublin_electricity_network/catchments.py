@@ -0,0 +1,213 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from dublin_electricity_network.files import atomic_output
+from dublin_electricity_network.graph import as_network_graph
+from dublin_electricity_network.graph import nearest_nodes
+from dublin_electricity_network.graph import to_gdfs
+from dublin_electricity_network.paths import _nearest_dest_per_node
+
+
+def _union_by_group(geometries, groups, chunksize=250, n_workers=None, coverage=False):
+    """
+    Union geometries per group in chunks on a thread pool.
+
+    Each group is split into chunks of `chunksize` geometries which are
+    unioned in parallel, as GEOS releases the GIL, & the partial unions are
+    then unioned per group.  Unioning many small pieces is much cheaper than
+    growing one large polygon a geometry at a time.
+
+    Returns
+    -------
+    tuple of (numpy.ndarray, numpy.ndarray)
+        Unique groups & the union of each
+    """
+    union = shapely.coverage_union_all if coverage else shapely.union_all
+
+    order = np.argsort(groups, kind="stable")
+    unique_groups, starts, counts = np.unique(
+        np.asarray(groups)[order], return_index=True, return_counts=True
+    )
+    geometries = np.asarray(geometries)[order]
+
+    chunks = [
+        (group, geometries[chunk_start : min(chunk_start + chunksize, start + count)])
+        for group, (start, count) in enumerate(zip(starts, counts))
+        for chunk_start in range(start, start + count, chunksize)
+    ]
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        partial_unions = list(executor.map(lambda chunk: union(chunk[1]), chunks))
+
+    pieces = [[] for _ in unique_groups]
+    for (group, _), partial_union in zip(chunks, partial_unions):
+        pieces[group].append(partial_union)
+
+    def union_pieces(group_pieces):
+        return group_pieces[0] if len(group_pieces) == 1 else union(group_pieces)
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        unions = list(executor.map(union_pieces, pieces))
+
+    return unique_groups, np.array(unions, dtype=object)
+
+
+def _hash_assignment(linked, station_column, coverage):
+
+    digest = hashlib.sha1()
+    # the options change the output so are part of the key too
+    digest.update(f"{station_column}:{coverage}".encode())
+    digest.update(
+        pd.util.hash_pandas_object(linked[station_column], index=False).to_numpy()
+    )
+    digest.update(b"".join(shapely.to_wkb(linked.geometry.to_numpy())))
+    return digest.hexdigest()[:16]
+
+
+def get_station_catchments(
+    linked,
+    station_column="station_name",
+    chunksize=250,
+    n_workers=None,
+    coverage=False,
+    cache_dirpath=None,
+):
+    """
+    Dissolve the small areas linked to each station into its catchment.
+
+    Parameters
+    ----------
+    linked : geopandas.GeoDataFrame
+        Small areas linked to stations, e.g. via `extract_nearest_dest`
+    station_column : str
+        Column identifying each area's station
+    chunksize : int
+        Number of areas unioned per task
+    n_workers : int, optional
+        Number of threads, by default one per CPU
+    coverage : bool
+        The areas form a coverage, i.e. they do not overlap & neighbours share
+        identical edges as Small Area boundaries do, so the much faster
+        `shapely.coverage_union_all` can be used
+    cache_dirpath : str or pathlib.Path, optional
+        Save the catchments to `{cache_dirpath}/catchments-{hash}.parquet`
+        keyed by a hash of the assignment, area geometries & options, &
+        reuse them if the same assignment is passed again
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        One row per station with `n_areas` & the catchment `geometry`
+    """
+    if cache_dirpath:
+        cache_dirpath = Path(cache_dirpath)
+        key = _hash_assignment(linked, station_column, coverage)
+        cache_filepath = cache_dirpath / f"catchments-{key}.parquet"
+        if cache_filepath.exists():
+            return gpd.read_parquet(cache_filepath)
+
+    stations, catchments = _union_by_group(
+        linked.geometry.to_numpy(),
+        linked[station_column].to_numpy(),
+        chunksize=chunksize,
+        n_workers=n_workers,
+        coverage=coverage,
+    )
+    n_areas = linked[station_column].value_counts()
+    station_catchments = gpd.GeoDataFrame(
+        {station_column: stations, "n_areas": n_areas.loc[stations].to_numpy()},
+        geometry=catchments,
+        crs=linked.crs,
+    )
+
+    if cache_dirpath:
+        cache_dirpath.mkdir(parents=True, exist_ok=True)
+        with atomic_output(cache_filepath) as temp_filepath:
+            station_catchments.to_parquet(temp_filepath)
+
+    return station_catchments
+
+
+def get_network_voronoi(
+    G, stations, station_column=None, buffer=None, chunksize=250, n_workers=None
+):
+    """
+    Split the network between stations by nearest station along the network.
+
+    Every node is assigned to its nearest station in one multi-source search
+    & each edge to the station of its nearest endpoint.  Buffering the edges
+    of each station gives a catchment which, unlike `get_station_catchments`,
+    does not depend on the small area boundaries.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+        input graph
+    stations : geopandas.GeoDataFrame
+        Stations in ITM, snapped to their nearest node
+    station_column : str, optional
+        Column identifying each station, by default its position
+    buffer : float, optional
+        Buffer each station's edges by this many metres
+    chunksize : int
+        Number of buffered edges unioned per task
+    n_workers : int, optional
+        Number of threads, by default one per CPU
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        One row per reachable station with the `length` of network it serves
+        & its edges, or their buffer, as `geometry`
+    """
+    graph = as_network_graph(G)
+    station_nodes, _ = nearest_nodes(graph, stations)
+    node_station, node_distance, _ = _nearest_dest_per_node(graph, station_nodes)
+
+    u_is_nearer = node_distance[graph.edge_u] <= node_distance[graph.edge_v]
+    edge_station = np.where(
+        u_is_nearer, node_station[graph.edge_u], node_station[graph.edge_v]
+    )
+    reached = edge_station >= 0
+
+    _, edges = to_gdfs(graph, crs=stations.crs)
+    geometries = edges.geometry.to_numpy()[reached]
+    if buffer:
+        station_positions, catchments = _union_by_group(
+            shapely.buffer(geometries, buffer),
+            edge_station[reached],
+            chunksize=chunksize,
+            n_workers=n_workers,
+        )
+    else:
+        # the edges only need collecting, noding them in a union is wasted work
+        station_positions, groups = np.unique(
+            edge_station[reached], return_inverse=True
+        )
+        order = np.argsort(groups.ravel(), kind="stable")
+        catchments = shapely.multilinestrings(
+            geometries[order], indices=groups.ravel()[order]
+        )
+    lengths = np.bincount(
+        edge_station[reached],
+        weights=graph.edge_length[reached],
+        minlength=len(stations),
+    )
+
+    if station_column:
+        station_ids = stations[station_column].to_numpy()[station_positions]
+    else:
+        station_ids = station_positions
+    return gpd.GeoDataFrame(
+        {
+            station_column or "station": station_ids,
+            "length": lengths[station_positions],
+        },
+        geometry=catchments,
+        crs=stations.crs,
+    )
@@ -1,66 +1,289 @@
+from typing import NamedTuple
+
 import geopandas as gpd
-import pandas as pd
 import numpy as np
+import pandas as pd
+from scipy.spatial import ConvexHull
+from scipy.spatial import QhullError
+from scipy.spatial.distance import pdist
 from sklearn.cluster import DBSCAN
 from sklearn.cluster import KMeans
-from shapely.geometry import MultiPoint
-from scipy.spatial import cKDTree
-
-
-def _join_nearest_points(gdA, gdB):
-    nA = np.array(list(gdA.geometry.apply(lambda x: (x.x, x.y))))
-    nB = np.array(list(gdB.geometry.apply(lambda x: (x.x, x.y))))
-    btree = cKDTree(nB)
-    dist, idx = btree.query(nA, k=1)
-    gdB_nearest = gdB.iloc[idx].reset_index(drop=True)
-    gdf = pd.concat(
-        [
-            gdA.reset_index(drop=True).drop(columns="geometry"),
-            gdB_nearest,
-        ],
-        axis=1,
-    )
-    return gdf
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from tqdm import tqdm
 
+from dublin_electricity_network.graph import _link_points_within_distance
+from dublin_electricity_network.pool import process_pool
+from dublin_electricity_network.pool import worker_state
 
-def cluster_itm_coords(
-    gdf,
+# metrics of `sweep_cluster_params` where higher is better, lower otherwise
+_MAXIMISE = {"silhouette"}
+
+
+def _get_cluster_labels(
     coords,
-    keep_columns,
     how="knearest",
     n_clusters=8,
     max_km_distance_between_points=2500,
+    min_samples=1,
+    minibatch_threshold=10000,
+    random_state=None,
 ):
     if how == "knearest":
-        model = KMeans(n_clusters)
+        if len(coords) > minibatch_threshold:
+            model = MiniBatchKMeans(n_clusters, n_init=3, random_state=random_state)
+        else:
+            model = KMeans(n_clusters, random_state=random_state)
+        labels = model.fit_predict(coords)
     elif how == "dbscan":
-        model = DBSCAN(
-            eps=max_km_distance_between_points,
-            min_samples=1,
-            algorithm="ball_tree",
-        )
+        if min_samples == 1:
+            labels = _link_points_within_distance(
+                coords, max_km_distance_between_points
+            )
+        else:
+            labels = DBSCAN(
+                eps=max_km_distance_between_points,
+                min_samples=min_samples,
+                algorithm="kd_tree",
+            ).fit_predict(coords)
     else:
         raise NotImplementedError("Only 'knearest' or 'dbscan' implemented...")
 
-    model.fit(coords)
-    cluster_labels = model.labels_
-    num_clusters = len(set(cluster_labels))
+    # DBSCAN labels noise as -1, keep each noise point as its own cluster
+    noise = labels == -1
+    labels[noise] = labels.max() + 1 + np.arange(noise.sum())
+
+    # renumber so that cluster ids are contiguous from 0
+    return np.unique(labels, return_inverse=True)[1].ravel()
+
+
+def cluster_itm_coords(
+    gdf,
+    coords,
+    keep_columns,
+    how="knearest",
+    n_clusters=8,
+    max_km_distance_between_points=2500,
+    min_samples=1,
+    minibatch_threshold=10000,
+    random_state=None,
+):
+    """
+    Cluster points & sum their columns by cluster.
+
+    Parameters
+    ----------
+    gdf : geopandas.GeoDataFrame
+        Points to be clustered
+    coords : numpy.ndarray
+        (n, 2) ITM coordinates of each point in gdf
+    keep_columns : list of str
+        Columns to keep, all but `cluster_id` & `geometry` are summed
+    how : str
+        'knearest' (KMeans) or 'dbscan'
+    n_clusters : int
+        Number of KMeans clusters
+    max_km_distance_between_points : float
+        DBSCAN eps in ITM units (metres)
+    min_samples : int
+        DBSCAN min_samples, noise points are kept as single point clusters
+    minibatch_threshold : int
+        Use MiniBatchKMeans rather than KMeans for more points than this
+    random_state : int, optional
+        Seed of KMeans, so the same points always give the same clusters
 
-    clusters = gpd.GeoDataFrame(
-        geometry=[MultiPoint(coords[cluster_labels == n]) for n in range(num_clusters)]
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        One row per cluster located at the cluster centroid
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    labels = _get_cluster_labels(
+        coords,
+        how=how,
+        n_clusters=n_clusters,
+        max_km_distance_between_points=max_km_distance_between_points,
+        min_samples=min_samples,
+        minibatch_threshold=minibatch_threshold,
+        random_state=random_state,
     )
 
-    centermost_points = (
-        clusters.assign(geometry=lambda gdf: gdf.geometry.centroid)
+    counts = np.bincount(labels)
+    centroid_x = np.bincount(labels, weights=coords[:, 0]) / counts
+    centroid_y = np.bincount(labels, weights=coords[:, 1]) / counts
+
+    sum_columns = [c for c in keep_columns if c not in ("cluster_id", "geometry")]
+    clusters = (
+        gdf[sum_columns]
+        .reset_index(drop=True)
+        .groupby(labels)
+        .sum()
+        .rename_axis("cluster_id")
         .reset_index()
-        .rename(columns={"index": "cluster_id"})
     )
 
-    gdf_linked_to_clusters = _join_nearest_points(
-        gdf,
-        centermost_points,
+    return gpd.GeoDataFrame(
+        clusters,
+        geometry=gpd.points_from_xy(centroid_x, centroid_y),
+        crs=gdf.crs,
+    ).loc[:, keep_columns]
+
+
+class ClusterSweep(NamedTuple):
+    """
+    Quality metrics of each clustering configuration tried by a sweep.
+
+    `results` has one row per configuration & `best` holds the keyword
+    arguments of the best one, ready to pass to `cluster_itm_coords`.
+    """
+
+    results: pd.DataFrame
+    best: dict
+
+
+def _max_intra_cluster_distance(coords, labels):
+
+    max_distance = 0.0
+    order = np.argsort(labels, kind="stable")
+    starts = np.flatnonzero(np.diff(labels[order], prepend=-1))
+    for cluster_coords in np.split(coords[order], starts[1:]):
+        if len(cluster_coords) < 2:
+            continue
+        if len(cluster_coords) > 3:
+            # the furthest apart points always lie on the convex hull
+            try:
+                cluster_coords = cluster_coords[ConvexHull(cluster_coords).vertices]
+            except QhullError:  # collinear or coincident points
+                pass
+        max_distance = max(max_distance, pdist(cluster_coords).max())
+    return max_distance
+
+
+def _init_sweep_worker(coords, capacities, sample_ids, random_state):
+
+    from threadpoolctl import threadpool_limits
+
+    # one thread per process, the pool already uses every CPU
+    threadpool_limits(1)
+    return coords, capacities, sample_ids, random_state
+
+
+def _evaluate_cluster_params(params):
+
+    coords, capacities, sample_ids, random_state = worker_state()
+    labels = _get_cluster_labels(coords, **{"random_state": random_state, **params})
+
+    counts = np.bincount(labels)
+    centroids = np.column_stack(
+        [np.bincount(labels, weights=coords[:, i]) / counts for i in range(2)]
     )
+    inertia = ((coords - centroids[labels]) ** 2).sum()
+
+    # silhouette is quadratic in the number of points so is scored on a
+    # sample, the same sample for every configuration
+    sample_labels = labels[sample_ids]
+    n_sample_clusters = len(np.unique(sample_labels))
+    if 1 < n_sample_clusters < len(sample_ids):
+        silhouette = silhouette_score(coords[sample_ids], sample_labels)
+    else:
+        silhouette = np.nan
+
+    metrics = {
+        "n_clusters_found": len(counts),
+        "inertia": inertia,
+        "silhouette": silhouette,
+        "max_intra_cluster_distance": _max_intra_cluster_distance(coords, labels),
+    }
+    if capacities is not None:
+        cluster_capacities = np.bincount(labels, weights=capacities)
+        # coefficient of variation, 0 if every cluster has the same capacity
+        metrics["capacity_cv"] = cluster_capacities.std() / cluster_capacities.mean()
+    return metrics
+
 
-    return gdf_linked_to_clusters[keep_columns].dissolve(
-        by="cluster_id", aggfunc="sum", as_index=False
+def sweep_cluster_params(
+    coords,
+    params,
+    capacities=None,
+    metric="silhouette",
+    sample_size=2000,
+    n_workers=None,
+    random_state=0,
+):
+    """
+    Evaluate many clustering configurations in parallel & pick the best.
+
+    The coordinates are shipped to each worker process once & every
+    configuration is then clustered with the same code as
+    `cluster_itm_coords`, e.g.::
+
+        sweep_cluster_params(
+            coords,
+            [{"how": "knearest", "n_clusters": n} for n in range(2, 31)]
+            + [
+                {"how": "dbscan", "max_km_distance_between_points": d}
+                for d in range(500, 5001, 250)
+            ],
+            capacities=esbmap_stations_dublin["demand_available_mva"],
+        )
+
+    Parameters
+    ----------
+    coords : numpy.ndarray
+        (n, 2) ITM coordinates of each point
+    params : list of dict
+        Keyword arguments of `cluster_itm_coords` for each configuration,
+        i.e. `how`, `n_clusters`, `max_km_distance_between_points`,
+        `min_samples` & `minibatch_threshold`
+    capacities : array-like, optional
+        Capacity of each point, e.g. "demand_available_mva", so the balance
+        of capacity across clusters can be scored as `capacity_cv`
+    metric : str
+        Pick the best configuration by "silhouette" (highest), "inertia",
+        "max_intra_cluster_distance" or "capacity_cv" (lowest)
+    sample_size : int
+        Number of points on which the silhouette is scored
+    n_workers : int, optional
+        Number of processes, by default one per CPU
+    random_state : int
+        Seed of the silhouette sample & of KMeans, unless a configuration
+        sets its own, so a sweep always picks the same best configuration
+
+    Returns
+    -------
+    ClusterSweep
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    if capacities is not None:
+        capacities = np.nan_to_num(np.asarray(capacities, dtype=np.float64))
+    sample_ids = np.sort(
+        np.random.default_rng(random_state).choice(
+            len(coords), size=min(sample_size, len(coords)), replace=False
+        )
+    )
+
+    with process_pool(
+        _init_sweep_worker,
+        coords,
+        capacities,
+        sample_ids,
+        random_state,
+        n_workers=n_workers,
+    ) as executor:
+        metrics = list(
+            tqdm(executor.map(_evaluate_cluster_params, params), total=len(params))
+        )
+
+    results = pd.concat(
+        [pd.DataFrame(params).reset_index(drop=True), pd.DataFrame(metrics)],
+        axis="columns",
     )
+    if results[metric].isna().all():
+        raise ValueError(f"No configuration could be scored by {metric}")
+    if metric in _MAXIMISE:
+        best_position = results[metric].idxmax()
+    else:
+        best_position = results[metric].idxmin()
+    # keep the seed so `cluster_itm_coords` reproduces the scored clusters
+    best = {"random_state": random_state, **params[best_position]}
+    return ClusterSweep(results=results, best=best)
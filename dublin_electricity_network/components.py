@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from dublin_electricity_network.graph import NetworkGraph
+from dublin_electricity_network.graph import as_network_graph
+from dublin_electricity_network.graph import nearest_nodes
+from dublin_electricity_network.graph import node_coordinates
+from dublin_electricity_network.graph import subset_graph
+from dublin_electricity_network.graph import to_csr_matrix
+
+
+def _networkx_adjacency(G):
+
+    nodes = list(G.nodes)
+    node_ids = {node: i for i, node in enumerate(nodes)}
+    edges = np.array(
+        [(node_ids[u], node_ids[v]) for u, v in G.edges()], dtype=np.int64
+    ).reshape(-1, 2)
+    adjacency = coo_matrix(
+        (np.ones(len(edges), dtype=np.int8), (edges[:, 0], edges[:, 1])),
+        shape=(len(nodes), len(nodes)),
+    ).tocsr()
+    return adjacency
+
+
+def label_components(G):
+    """
+    Label the connected component of every node in one pass.
+
+    Components are numbered by size so component 0 is always the largest.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+
+    Returns
+    -------
+    numpy.ndarray
+        (n_nodes,) component id of each node in `G.nodes` order
+    """
+    if isinstance(G, NetworkGraph):
+        adjacency = to_csr_matrix(G)
+    else:
+        adjacency = _networkx_adjacency(G)
+
+    _, labels = connected_components(adjacency, directed=False)
+
+    # relabel so that component ids are ranked by size, largest first
+    sizes = np.bincount(labels)
+    rank = np.empty_like(sizes)
+    rank[np.argsort(-sizes, kind="stable")] = np.arange(len(sizes))
+    return rank[labels]
+
+
+def _select_components(labels, n_largest, min_size):
+
+    sizes = np.bincount(labels)
+    keep = np.zeros(len(sizes), dtype=bool)
+    if n_largest is not None:
+        keep[:n_largest] = True
+    if min_size is not None:
+        keep |= sizes > min_size
+    return keep[labels]
+
+
+def extract_components(G, n_largest=1, min_size=None):
+    """
+    Extract the largest components of a graph as a new materialised graph.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+    n_largest : int, optional
+        Keep the `n_largest` components
+    min_size : int, optional
+        Keep all components with more than `min_size` nodes; set `n_largest`
+        to None to select on size alone
+
+    Returns
+    -------
+    NetworkGraph or networkx.Graph
+        A compact copy of `G` of the same type containing only the selected
+        components
+    """
+    labels = label_components(G)
+    node_mask = _select_components(labels, n_largest, min_size)
+
+    if isinstance(G, NetworkGraph):
+        return subset_graph(G, node_mask)
+
+    nodes = [node for node, kept in zip(G.nodes, node_mask) if kept]
+    keep = set(nodes)
+    H = G.__class__()
+    H.graph.update(G.graph)
+    H.add_nodes_from((node, G.nodes[node]) for node in nodes)
+    if G.is_multigraph():
+        H.add_edges_from(
+            (u, v, key, data)
+            for u, v, key, data in G.edges(keys=True, data=True)
+            if u in keep
+        )
+    else:
+        H.add_edges_from((u, v, data) for u, v, data in G.edges(data=True) if u in keep)
+    return H
+
+
+def summarise_components(G, stations=None):
+    """
+    Summarise the size, extent & number of stations in each component.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+    stations : geopandas.GeoDataFrame, optional
+        Stations which are snapped to their nearest node to be counted
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per component, largest first, with columns `n_nodes`,
+        `n_edges`, `minx`, `miny`, `maxx`, `maxy` & optionally `n_stations`
+    """
+    graph = as_network_graph(G)
+    labels = label_components(graph)
+    n_components = labels.max() + 1 if len(labels) else 0
+    node_xy = node_coordinates(graph)
+    edge_labels = labels[graph.edge_u]
+
+    bounds = np.empty((n_components, 4))
+    bounds[:, :2] = np.inf
+    bounds[:, 2:] = -np.inf
+    np.minimum.at(bounds[:, 0], labels, node_xy[:, 0])
+    np.minimum.at(bounds[:, 1], labels, node_xy[:, 1])
+    np.maximum.at(bounds[:, 2], labels, node_xy[:, 0])
+    np.maximum.at(bounds[:, 3], labels, node_xy[:, 1])
+
+    summary = pd.DataFrame(
+        {
+            "n_nodes": np.bincount(labels, minlength=n_components),
+            "n_edges": np.bincount(edge_labels, minlength=n_components),
+            "minx": bounds[:, 0],
+            "miny": bounds[:, 1],
+            "maxx": bounds[:, 2],
+            "maxy": bounds[:, 3],
+        }
+    ).rename_axis("component_id")
+
+    if stations is not None:
+        station_nodes, _ = nearest_nodes(graph, stations)
+        summary["n_stations"] = np.bincount(
+            labels[station_nodes], minlength=n_components
+        )
+
+    return summary
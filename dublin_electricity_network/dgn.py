@@ -0,0 +1,226 @@
+import mmap
+from typing import NamedTuple
+import warnings
+
+import geopandas as gpd
+import numpy as np
+import shapely
+
+# element types decoded by `read_dgn`, every other type is skipped
+LINE = 3
+LINE_STRING = 4
+TEXT = 17
+
+# graphic element types GDAL's DGN driver reads but `read_dgn` cannot decode
+_UNDECODED_TYPES = {2: "cell", 6: "shape", 11: "curve", 15: "ellipse", 16: "arc"}
+
+# the terminal control block holding the units & global origin of the design
+_TCB = 9
+
+
+class DGNElements(NamedTuple):
+    """
+    Elements of a DGN v7 file decoded into flat arrays.
+
+    The vertices of element i are `xy[offsets[i] : offsets[i + 1]]`, two for
+    a line, one per vertex for a line string & the origin for a text, in the
+    units of the design file (metres for the ESB CAD data).
+    """
+
+    levels: np.ndarray
+    types: np.ndarray
+    offsets: np.ndarray
+    xy: np.ndarray
+    text: np.ndarray
+
+
+def _decode_int32(buffer, positions):
+    """
+    Decode DGN "middle-endian" int32s, two little-endian words high first.
+    """
+    b = buffer[np.asarray(positions)[:, None] + np.arange(4)].astype(np.uint32)
+    return (b[:, 2] | b[:, 3] << 8 | b[:, 0] << 16 | b[:, 1] << 24).view(np.int32)
+
+
+def _decode_vax_double(data):
+    """
+    Decode a VAX D-float, four little-endian words with the sign, an 8 bit
+    exponent biased by 128 & a 55 bit fraction with a hidden leading 1.
+    """
+    w0, w1, w2, w3 = (int.from_bytes(data[i : i + 2], "little") for i in (0, 2, 4, 6))
+    exponent = (w0 >> 7) & 0xFF
+    if exponent == 0:
+        return 0.0
+    fraction = (w0 & 0x7F) << 48 | w1 << 32 | w2 << 16 | w3
+    value = float((1 << 55) | fraction) * 2.0 ** (exponent - 129 - 55)
+    return -value if w0 & 0x8000 else value
+
+
+def _read_tcb(element):
+
+    is_3d = bool(element[1214] & 0x40)
+    buffer = np.frombuffer(element, dtype=np.uint8)
+    subunits_per_master, uor_per_subunit = _decode_int32(buffer, [1112, 1116])
+    uor_per_master = float(subunits_per_master) * float(uor_per_subunit) or 1.0
+    origin = [
+        _decode_vax_double(element[i : i + 8]) / uor_per_master for i in (1240, 1248)
+    ]
+    return is_3d, 1 / uor_per_master, origin
+
+
+def _decode_text(element, start):
+
+    n_chars = element[start - 2]
+    text = bytes(element[start : start + n_chars])
+    if text[:2] == b"\xff\xfd":
+        # multi-byte text is stored as 16 bit characters
+        return text[2:].decode("utf-16-le", errors="replace")
+    return text.decode("latin-1")
+
+
+def read_dgn(filepath, levels=None, element_types=(LINE, LINE_STRING, TEXT)):
+    """
+    Read the lines, line strings & text of a DGN v7 file.
+
+    The file is memory mapped & walked one element header at a time, so
+    elements on other levels or of other types are skipped without being
+    decoded, & the coordinates of the rest are decoded in bulk.  Unlike
+    GDAL's DGN driver elements such as shapes, arcs & cells are skipped &
+    the components of complex chains are read as separate line strings,
+    a warning counts any such elements skipped on the requested levels.
+    Only x & y are decoded so the output is always 2D, the Z of a 3D design
+    is dropped.
+
+    Parameters
+    ----------
+    filepath : str or pathlib.Path
+        e.g. an MV-LV Data DGN tile
+    levels : list of int, optional
+        Only read elements on these levels, by default all levels
+    element_types : tuple of int
+        Only read these of LINE, LINE_STRING & TEXT
+
+    Returns
+    -------
+    DGNElements
+    """
+    levels = None if levels is None else set(levels)
+    element_types = set(element_types)
+
+    with open(filepath, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as m:
+        size = len(m)
+        is_3d, scale, origin = False, 1.0, [0.0, 0.0]
+        found = []
+        undecoded = {}
+        offset = 0
+        while offset + 4 <= size:
+            level_byte, type_byte = m[offset], m[offset + 1]
+            if level_byte == 0xFF and type_byte == 0xFF:
+                break  # end of design marker
+            n_bytes = (m[offset + 2] | m[offset + 3] << 8) * 2 + 4
+            element_type = type_byte & 0x7F
+            if element_type == _TCB and offset == 0 and n_bytes >= 1264:
+                is_3d, scale, origin = _read_tcb(m[offset : offset + n_bytes])
+            elif not type_byte & 0x80 and (  # deleted
+                levels is None or level_byte & 0x3F in levels
+            ):
+                if element_type in element_types:
+                    found.append((offset, n_bytes, element_type, level_byte & 0x3F))
+                elif element_type in _UNDECODED_TYPES:
+                    name = _UNDECODED_TYPES[element_type]
+                    undecoded[name] = undecoded.get(name, 0) + 1
+            offset += n_bytes
+
+        if undecoded:
+            counts = ", ".join(f"{n} {name}" for name, n in sorted(undecoded.items()))
+            warnings.warn(
+                f"Skipped {counts} elements in {filepath} which cannot be decoded,"
+                " read it with GDAL to keep them"
+            )
+
+        n_dims = 3 if is_3d else 2
+        stride = 4 * n_dims
+        starts = []
+        counts = []
+        text = []
+        for offset, n_bytes, element_type, _ in found:
+            if element_type == LINE:
+                starts.append(offset + 36)
+                counts.append(2)
+                text.append(None)
+            elif element_type == LINE_STRING:
+                n_vertices = m[offset + 36] | m[offset + 37] << 8
+                starts.append(offset + 38)
+                # never read past the element if the count is corrupt
+                counts.append(min(n_vertices, (n_bytes - 38) // stride))
+                text.append(None)
+            else:
+                starts.append(offset + (62 if is_3d else 50))
+                counts.append(1)
+                text.append(_decode_text(m, offset + (76 if is_3d else 60)))
+
+        counts = np.array(counts, dtype=np.int64)
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        vertex_positions = (
+            np.repeat(np.array(starts, dtype=np.int64), counts)
+            + (np.arange(offsets[-1]) - np.repeat(offsets[:-1], counts)) * stride
+        )
+        buffer = np.frombuffer(m, dtype=np.uint8)
+        xy = np.column_stack(
+            [
+                _decode_int32(buffer, vertex_positions) * scale - origin[0],
+                _decode_int32(buffer, vertex_positions + 4) * scale - origin[1],
+            ]
+        ).reshape(-1, 2)
+        # the mapping can only be closed once no array views it
+        del buffer
+
+    return DGNElements(
+        levels=np.array([level for *_, level in found], dtype=np.int16),
+        types=np.array([element_type for *_, element_type, _ in found], dtype=np.int16),
+        offsets=offsets,
+        xy=xy,
+        text=np.array(text, dtype=object),
+    )
+
+
+def elements_to_gdf(elements, crs="epsg:29903"):
+    """
+    Convert DGNElements to a GeoDataFrame like GDAL's DGN driver.
+
+    Lines & line strings become LineStrings & text its origin Point, with
+    the same `Type`, `Level` & `Text` columns as GDAL, so reads through
+    either can be filtered the same way.
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+    """
+    counts = np.diff(elements.offsets)
+    is_text = elements.types == TEXT
+    # a line string needs at least two vertices
+    keep = is_text | (counts >= 2)
+    element_ids = np.repeat(np.arange(len(counts)), counts)
+
+    geometries = np.empty(len(counts), dtype=object)
+    line_ids = np.flatnonzero(keep & ~is_text)
+    vertex_is_line = np.isin(element_ids, line_ids)
+    geometries[line_ids] = shapely.linestrings(
+        elements.xy[vertex_is_line],
+        indices=np.searchsorted(line_ids, element_ids[vertex_is_line]),
+    )
+    text_ids = np.flatnonzero(is_text)
+    geometries[text_ids] = shapely.points(elements.xy[elements.offsets[text_ids]])
+
+    return gpd.GeoDataFrame(
+        {
+            "Type": elements.types[keep],
+            "Level": elements.levels[keep],
+            "Text": elements.text[keep],
+        },
+        geometry=geometries[keep],
+        crs=crs,
+    )
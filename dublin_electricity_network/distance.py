@@ -1,12 +1,10 @@
-from dask import compute
-from dask import delayed
-from dask.diagnostics import ProgressBar
 import networkx as nx
 import numpy as np
 import pandas as pd
-from sklearn.neighbors import BallTree
 from tqdm import tqdm
 
+from dublin_electricity_network.components import extract_components
+
 
 def get_nearest_node(G, point):
     """
@@ -27,6 +25,8 @@ def get_nearest_node(G, point):
     int or tuple of (int, float)
         Nearest node ID
     """
+    from sklearn.neighbors import BallTree
+
     # dump graph node coordinates into a pandas dataframe with x and y columns
     coords = (d[0] for d in G.nodes(data=True))
     target = pd.DataFrame(coords, columns=["x", "y"])
@@ -60,6 +60,8 @@ def get_nearest_nodes(G, points):
     ------------
     https://stackoverflow.com/questions/58893719/find-nearest-point-in-other-dataframe-with-a-lot-of-data
     """
+    from sklearn.neighbors import BallTree
+
     # dump graph node coordinates into a pandas dataframe with x and y columns
     coords = (d[0] for d in G.nodes(data=True))
     target = pd.DataFrame(coords, columns=["x", "y"])
@@ -130,17 +132,9 @@ def remove_subgraph(G, S, orig_node):
 
 def get_largest_subgraph(G):
 
-    nodes = max(nx.connected_components(G), key=len)
-    return G.subgraph(nodes)
+    return extract_components(G, n_largest=1)
 
 
 def get_large_subgraphs(G, size=5):
 
-    largest_components = [
-        component
-        for component in sorted(nx.connected_components(G), key=len, reverse=True)
-        if len(component) > 5
-    ]
-    return nx.compose_all(
-        G.subgraph(component) for component in tqdm(largest_components)
-    )
\ No newline at end of file
+    return extract_components(G, n_largest=None, min_size=size)
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_output(filepath):
+    """
+    Write to a temporary file beside `filepath` & move it into place after.
+
+    A crash part way through a write never leaves half a file at `filepath`,
+    only a `{filepath}.tmp` which is removed if the write raises & replaced
+    by the next attempt, e.g.::
+
+        with atomic_output(cache_filepath) as temp_filepath:
+            gdf.to_parquet(temp_filepath)
+
+    Parameters
+    ----------
+    filepath : str or pathlib.Path
+
+    Yields
+    ------
+    pathlib.Path
+        The temporary file to write to
+    """
+    filepath = Path(filepath)
+    temp_filepath = filepath.with_name(filepath.name + ".tmp")
+    temp_filepath.unlink(missing_ok=True)
+    try:
+        yield temp_filepath
+    except BaseException:
+        temp_filepath.unlink(missing_ok=True)
+        raise
+    temp_filepath.replace(filepath)
@@ -0,0 +1,627 @@
+import json
+from pathlib import Path
+from typing import NamedTuple
+from typing import Optional
+
+import geopandas as gpd
+import networkx as nx
+import numpy as np
+import shapely
+from scipy.sparse import coo_matrix
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
+
+
+class NetworkGraph(NamedTuple):
+    """
+    Compact array-backed undirected network graph.
+
+    Nodes are integers 0..n_nodes-1 with ITM coordinates in `node_xy`; edges
+    are integers 0..n_edges-1 running between `edge_u` and `edge_v`.  The
+    CSR arrays (`indptr`, `indices`, `weights`, `edge_index`) store both
+    directions of every edge, keeping only the shortest of any parallel edges,
+    so they can be handed straight to `scipy.sparse.csgraph`.
+
+    Edge geometries are optional and stored as one flat vertex array
+    `edge_xy` sliced by `edge_offsets`, i.e. edge i is
+    `edge_xy[edge_offsets[i]:edge_offsets[i + 1]]` running from `edge_u[i]`
+    to `edge_v[i]`.
+
+    If `resolution` is set the coordinates are quantised, i.e. `node_xy` &
+    `edge_xy` hold integer multiples of `resolution` metres, which halves
+    their memory & makes node coordinates exact keys.  Use `node_coordinates`
+    & `edge_coordinates` to get them back in metres.
+    """
+
+    node_xy: np.ndarray
+    edge_u: np.ndarray
+    edge_v: np.ndarray
+    edge_length: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    weights: np.ndarray
+    edge_index: np.ndarray
+    edge_offsets: Optional[np.ndarray] = None
+    edge_xy: Optional[np.ndarray] = None
+    resolution: Optional[float] = None
+
+    @property
+    def n_nodes(self):
+        return len(self.node_xy)
+
+    @property
+    def n_edges(self):
+        return len(self.edge_u)
+
+
+def _build_csr(n_nodes, edge_u, edge_v, edge_length):
+
+    # both directions of every edge, self-loops are useless for routing
+    not_loop = edge_u != edge_v
+    edge_ids = np.flatnonzero(not_loop)
+    rows = np.concatenate([edge_u[not_loop], edge_v[not_loop]])
+    cols = np.concatenate([edge_v[not_loop], edge_u[not_loop]])
+    weights = np.concatenate([edge_length[not_loop], edge_length[not_loop]])
+    edge_index = np.concatenate([edge_ids, edge_ids])
+
+    # keep only the shortest of any parallel edges as csr_matrix sums duplicates
+    order = np.lexsort((weights, cols, rows))
+    rows, cols, weights, edge_index = (
+        rows[order],
+        cols[order],
+        weights[order],
+        edge_index[order],
+    )
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+    rows, cols, weights, edge_index = (
+        rows[first],
+        cols[first],
+        weights[first],
+        edge_index[first],
+    )
+
+    # scipy downcasts CSR index arrays to int32 where possible, storing them
+    # as int32 up front avoids a copy when wrapping memory-mapped arrays
+    index_dtype = np.int32 if max(len(rows), n_nodes) < 2**31 else np.int64
+    indptr = np.zeros(n_nodes + 1, dtype=index_dtype)
+    np.cumsum(np.bincount(rows, minlength=n_nodes), out=indptr[1:])
+    return (
+        indptr,
+        cols.astype(index_dtype),
+        weights,
+        edge_index.astype(index_dtype),
+    )
+
+
+def make_network_graph(
+    node_xy,
+    edge_u,
+    edge_v,
+    edge_length,
+    edge_offsets=None,
+    edge_xy=None,
+    resolution=None,
+):
+    """
+    Create a NetworkGraph from node & edge arrays.
+
+    Parameters
+    ----------
+    node_xy : numpy.ndarray
+        (n_nodes, 2) node ITM coordinates
+    edge_u, edge_v : numpy.ndarray
+        (n_edges,) node ids of each edge's endpoints
+    edge_length : numpy.ndarray
+        (n_edges,) length of each edge in metres
+    edge_offsets : numpy.ndarray, optional
+        (n_edges + 1,) offsets of each edge's vertices into `edge_xy`
+    edge_xy : numpy.ndarray, optional
+        (n_vertices, 2) edge geometry vertices
+    resolution : float, optional
+        Quantise the coordinates to integer multiples of this many metres,
+        integer coordinates are taken to be quantised already
+
+    Returns
+    -------
+    NetworkGraph
+    """
+    if resolution:
+        node_xy = quantise_xy(node_xy, resolution)
+        if edge_xy is not None:
+            edge_xy = quantise_xy(edge_xy, resolution)
+    else:
+        node_xy = np.asarray(node_xy, dtype=np.float64).reshape(-1, 2)
+    edge_u = np.asarray(edge_u, dtype=np.int64)
+    edge_v = np.asarray(edge_v, dtype=np.int64)
+    edge_length = np.asarray(edge_length, dtype=np.float64)
+    indptr, indices, weights, edge_index = _build_csr(
+        len(node_xy), edge_u, edge_v, edge_length
+    )
+    return NetworkGraph(
+        node_xy=node_xy,
+        edge_u=edge_u,
+        edge_v=edge_v,
+        edge_length=edge_length,
+        indptr=indptr,
+        indices=indices,
+        weights=weights,
+        edge_index=edge_index,
+        edge_offsets=edge_offsets,
+        edge_xy=edge_xy,
+        resolution=resolution,
+    )
+
+
+def from_networkx(G, weight="mm_len", resolution=None):
+    """
+    Convert a momepy primal graph to a NetworkGraph.
+
+    Parameters
+    ----------
+    G : networkx.Graph or networkx.MultiGraph
+        Graph whose nodes are (x, y) coordinate tuples as created by
+        `momepy.gdf_to_nx(..., approach="primal")`
+    weight : str
+        Edge attribute holding the edge length, falls back to the length of
+        the edge `geometry` or else to the straight-line distance
+    resolution : float, optional
+        Quantise the coordinates to integer multiples of this many metres
+
+    Returns
+    -------
+    NetworkGraph
+    """
+    nodes = list(G.nodes)
+    node_ids = {node: i for i, node in enumerate(nodes)}
+    node_xy = np.array(nodes, dtype=np.float64).reshape(-1, 2)
+
+    edge_u = []
+    edge_v = []
+    edge_length = []
+    edge_coords = []
+    for u, v, data in G.edges(data=True):
+        geometry = data.get("geometry")
+        if geometry is not None:
+            coords = np.asarray(geometry.coords)[:, :2]
+            # networkx orders the ends of an undirected edge by node insertion
+            # not by geometry, so orient the vertices to run from u to v
+            if np.hypot(*(coords[0] - u[:2])) > np.hypot(*(coords[-1] - u[:2])):
+                coords = coords[::-1]
+        else:
+            coords = np.array([u, v], dtype=np.float64)[:, :2]
+        length = data.get(weight)
+        if length is None:
+            length = np.hypot(*np.diff(coords, axis=0).T).sum()
+        edge_u.append(node_ids[u])
+        edge_v.append(node_ids[v])
+        edge_length.append(length)
+        edge_coords.append(coords)
+
+    edge_offsets = np.zeros(len(edge_coords) + 1, dtype=np.int64)
+    np.cumsum([len(c) for c in edge_coords], out=edge_offsets[1:])
+    if edge_coords:
+        edge_xy = np.concatenate(edge_coords).astype(np.float64)
+    else:
+        edge_xy = np.empty((0, 2), dtype=np.float64)
+
+    return make_network_graph(
+        node_xy,
+        np.array(edge_u, dtype=np.int64),
+        np.array(edge_v, dtype=np.int64),
+        np.array(edge_length, dtype=np.float64),
+        edge_offsets=edge_offsets,
+        edge_xy=edge_xy,
+        resolution=resolution,
+    )
+
+
+def quantise_xy(xy, resolution=0.01):
+    """
+    Round ITM coordinates to integer multiples of `resolution` metres.
+
+    Integer coordinates are taken to be quantised already & are only
+    downcast.
+
+    Returns
+    -------
+    numpy.ndarray
+        (n, 2) int32, or int64 if the coordinates do not fit in int32
+    """
+    xy = np.asarray(xy).reshape(-1, 2)
+    if np.issubdtype(xy.dtype, np.integer):
+        cells = xy
+    else:
+        cells = np.round(xy.astype(np.float64) / resolution)
+    if np.abs(cells).max(initial=0) < 2**31:
+        return cells.astype(np.int32)
+    else:
+        return cells.astype(np.int64)
+
+
+def dequantise_xy(ixy, resolution=0.01):
+
+    return np.asarray(ixy).astype(np.float64) * resolution
+
+
+def pack_xy_keys(ixy):
+    """
+    Pack quantised (x, y) coordinates into one int64 key per point.
+
+    Equal coordinates give equal keys so nodes can be hashed, sorted & looked
+    up exactly, e.g. with `np.unique` or `np.searchsorted`.
+    """
+    ixy = np.asarray(ixy, dtype=np.int64).reshape(-1, 2)
+    return (ixy[:, 0] << 32) | (ixy[:, 1] & 0xFFFFFFFF)
+
+
+def unpack_xy_keys(keys):
+
+    keys = np.asarray(keys, dtype=np.int64)
+    # sign extend the lower 32 bits
+    y = ((keys & 0xFFFFFFFF) ^ 0x80000000) - 0x80000000
+    return np.column_stack([keys >> 32, y])
+
+
+def _snap_keys(xy, tolerance):
+    # coordinates within the same `tolerance` grid cell hash to the same key
+    return pack_xy_keys(quantise_xy(xy, tolerance))
+
+
+def _link_points_within_distance(coords, max_distance):
+    # DBSCAN with min_samples=1 links every pair of points within eps of one
+    # another, so its clusters are the connected components of the eps-graph
+    pairs = cKDTree(coords).query_pairs(r=max_distance, output_type="ndarray")
+    adjacency = coo_matrix(
+        (np.ones(len(pairs), dtype=np.int8), (pairs[:, 0], pairs[:, 1])),
+        shape=(len(coords), len(coords)),
+    )
+    _, labels = connected_components(adjacency, directed=False)
+    return labels
+
+
+def from_lines(lines, tolerance=0.01, quantise=False):
+    """
+    Build a NetworkGraph from line geometries in one vectorised pass.
+
+    Each line becomes an edge between its first & last vertex, equivalent to
+    `momepy.gdf_to_nx(lines, approach="primal")`.  Endpoints within
+    `tolerance` metres of one another are merged into one node so that
+    near-miss CAD joins become one node, chains of such endpoints included.
+
+    Parameters
+    ----------
+    lines : geopandas.GeoDataFrame or geopandas.GeoSeries
+        LineStrings or MultiLineStrings in ITM, multi-part lines are split
+        into one edge per part
+    tolerance : float
+        Endpoints within `tolerance` metres of one another are merged, each
+        node sits at the first of its endpoints
+    quantise : bool
+        Store the coordinates as integer multiples of `tolerance`
+
+    Returns
+    -------
+    NetworkGraph
+    """
+    geometries = shapely.get_parts(np.asarray(lines.geometry.values))
+    is_line = np.isin(shapely.get_type_id(geometries), [1, 2])
+    geometries = geometries[is_line & (shapely.get_num_coordinates(geometries) > 1)]
+
+    edge_xy, edge_ids = shapely.get_coordinates(geometries, return_index=True)
+    edge_offsets = np.zeros(len(geometries) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edge_ids, minlength=len(geometries)), out=edge_offsets[1:])
+
+    endpoints = np.concatenate(
+        [edge_xy[edge_offsets[:-1]], edge_xy[edge_offsets[1:] - 1]]
+    )
+    # most joins share exact coordinates so are merged before the search
+    unique_xy, unique_ids = np.unique(endpoints, axis=0, return_inverse=True)
+    labels = _link_points_within_distance(unique_xy, tolerance)[unique_ids.ravel()]
+    _, first, node_ids = np.unique(labels, return_index=True, return_inverse=True)
+    node_ids = node_ids.ravel()
+
+    return make_network_graph(
+        endpoints[first],
+        node_ids[: len(geometries)],
+        node_ids[len(geometries) :],
+        shapely.length(geometries),
+        edge_offsets=edge_offsets,
+        edge_xy=edge_xy,
+        resolution=tolerance if quantise else None,
+    )
+
+
+def node_coordinates(graph, nodes=None):
+    """
+    Get the node coordinates in metres whether or not they are quantised.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    nodes : array-like, optional
+        Only get the coordinates of these nodes, e.g. a path
+    """
+    node_xy = graph.node_xy if nodes is None else graph.node_xy[nodes]
+    if graph.resolution:
+        return dequantise_xy(node_xy, graph.resolution)
+    return node_xy
+
+
+def edge_coordinates(graph):
+    """
+    Get the edge vertices in metres whether or not they are quantised.
+    """
+    if graph.resolution and graph.edge_xy is not None:
+        return dequantise_xy(graph.edge_xy, graph.resolution)
+    return graph.edge_xy
+
+
+def find_nodes(graph, points, resolution=0.01):
+    """
+    Look up the nodes at exact coordinates.
+
+    Coordinates are compared as packed integer keys at the graph's
+    resolution (or at `resolution` if it is not quantised), so floating
+    point noise below the resolution cannot cause a miss.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    points : geopandas.GeoDataFrame or numpy.ndarray
+        Points in ITM
+    resolution : float
+        Used if the graph is not quantised
+
+    Returns
+    -------
+    numpy.ndarray
+        (n,) node ids, -1 where no node is at the coordinates
+    """
+    resolution = graph.resolution or resolution
+    if graph.resolution:
+        node_keys = pack_xy_keys(graph.node_xy)
+    else:
+        node_keys = _snap_keys(graph.node_xy, resolution)
+    keys = _snap_keys(points_to_xy(points), resolution)
+    if graph.n_nodes == 0:
+        return np.full(len(keys), -1, dtype=np.int64)
+
+    order = np.argsort(node_keys, kind="stable")
+    sorted_keys = node_keys[order]
+    positions = np.searchsorted(sorted_keys, keys).clip(max=len(order) - 1)
+    return np.where(sorted_keys[positions] == keys, order[positions], -1)
+
+
+def as_network_graph(G, weight="mm_len"):
+
+    if isinstance(G, NetworkGraph):
+        return G
+    elif isinstance(G, nx.Graph):
+        return from_networkx(G, weight=weight)
+    else:
+        raise TypeError(f"Expected a NetworkGraph or networkx graph not {type(G)}")
+
+
+def to_csr_matrix(graph):
+
+    return csr_matrix(
+        (graph.weights, graph.indices, graph.indptr),
+        shape=(graph.n_nodes, graph.n_nodes),
+    )
+
+
+def subset_graph(graph, node_mask):
+    """
+    Extract the nodes in `node_mask` and the edges between them.
+
+    Node & edge ids are renumbered so the result stays compact.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    node_mask : numpy.ndarray
+        (n_nodes,) bool
+
+    Returns
+    -------
+    NetworkGraph
+    """
+    node_mask = np.asarray(node_mask, dtype=bool)
+    new_node_ids = np.full(graph.n_nodes, -1, dtype=np.int64)
+    new_node_ids[node_mask] = np.arange(node_mask.sum())
+
+    edge_mask = node_mask[graph.edge_u] & node_mask[graph.edge_v]
+
+    if graph.edge_offsets is not None:
+        vertex_counts = np.diff(graph.edge_offsets)
+        edge_offsets = np.zeros(edge_mask.sum() + 1, dtype=np.int64)
+        np.cumsum(vertex_counts[edge_mask], out=edge_offsets[1:])
+        edge_xy = graph.edge_xy[np.repeat(edge_mask, vertex_counts)]
+    else:
+        edge_offsets = None
+        edge_xy = None
+
+    return make_network_graph(
+        graph.node_xy[node_mask],
+        new_node_ids[graph.edge_u[edge_mask]],
+        new_node_ids[graph.edge_v[edge_mask]],
+        graph.edge_length[edge_mask],
+        edge_offsets=edge_offsets,
+        edge_xy=edge_xy,
+        resolution=graph.resolution,
+    )
+
+
+def points_to_xy(points):
+    """
+    Extract (n, 2) ITM coordinates from points, polygons or an array.
+
+    Polygons such as Small Areas are represented by their centroids.
+    """
+    if isinstance(points, np.ndarray):
+        return points.reshape(-1, 2).astype(np.float64)
+    centroids = points.geometry.centroid
+    return np.column_stack([centroids.x.to_numpy(), centroids.y.to_numpy()])
+
+
+def nearest_nodes(graph, points):
+    """
+    Snap points to their nearest graph node.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    points : geopandas.GeoDataFrame or numpy.ndarray
+        Points (or polygons whose centroids are used) in ITM
+
+    Returns
+    -------
+    tuple of (numpy.ndarray, numpy.ndarray)
+        Nearest node id & straight-line distance to it for each point
+    """
+    tree = cKDTree(node_coordinates(graph))
+    distance, node_ids = tree.query(points_to_xy(points), k=1)
+    return node_ids.astype(np.int64), distance
+
+
+def write_network_graph(graph, dirpath):
+    """
+    Save a NetworkGraph as one `.npy` file per array.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    dirpath : str or pathlib.Path
+        Directory in which to save the graph
+    """
+    dirpath = Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+
+    # the metadata is removed first so a half overwritten graph can't be read
+    (dirpath / "graph.json").unlink(missing_ok=True)
+
+    saved = []
+    for name, values in graph._asdict().items():
+        if name == "resolution":
+            continue
+        filepath = dirpath / f"{name}.npy"
+        if values is None:
+            # never leave an array of a previously saved graph behind
+            filepath.unlink(missing_ok=True)
+        else:
+            np.save(filepath, np.ascontiguousarray(values))
+            saved.append(name)
+
+    # written last so an interrupted save is never mistaken for a graph
+    with open(dirpath / "graph.json", "w") as f:
+        json.dump(
+            {
+                "n_nodes": graph.n_nodes,
+                "n_edges": graph.n_edges,
+                "resolution": graph.resolution,
+                "arrays": saved,
+            },
+            f,
+        )
+
+
+def read_network_graph(dirpath, mmap_mode="r"):
+    """
+    Load a NetworkGraph saved by `write_network_graph`.
+
+    By default the arrays are memory-mapped so loading is near instant and
+    worker processes opening the same graph share one copy of it in the OS
+    page cache.
+
+    Parameters
+    ----------
+    dirpath : str or pathlib.Path
+        Directory containing the graph
+    mmap_mode : str, optional
+        Passed to `numpy.load`, set to None to read the arrays into memory
+
+    Returns
+    -------
+    NetworkGraph
+    """
+    dirpath = Path(dirpath)
+    if not (dirpath / "graph.json").exists():
+        raise FileNotFoundError(f"No network graph saved in {dirpath}")
+    with open(dirpath / "graph.json") as f:
+        metadata = json.load(f)
+
+    # only the arrays listed with the graph belong to it
+    arrays = {
+        name: (
+            np.load(dirpath / f"{name}.npy", mmap_mode=mmap_mode)
+            if name in metadata["arrays"]
+            else None
+        )
+        for name in NetworkGraph._fields
+        if name != "resolution"
+    }
+
+    return NetworkGraph(**arrays, resolution=metadata.get("resolution"))
+
+
+def to_gdfs(graph, crs="epsg:2157", spatial_weights=False):
+    """
+    Convert a NetworkGraph to node & edge GeoDataFrames.
+
+    Geometries are built in bulk from the coordinate arrays, so this replaces
+    `momepy.nx_to_gdf` & keeps its column names.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    crs : str
+        CRS of the graph coordinates
+    spatial_weights : bool
+        Also return the `libpysal.weights.W` linking each node to its
+        neighbours
+
+    Returns
+    -------
+    tuple of geopandas.GeoDataFrame
+        nodes, edges & optionally the spatial weights
+    """
+    node_xy = node_coordinates(graph)
+    nodes = gpd.GeoDataFrame(
+        {"nodeID": np.arange(graph.n_nodes)},
+        geometry=gpd.points_from_xy(node_xy[:, 0], node_xy[:, 1]),
+        crs=crs,
+    )
+
+    if graph.edge_offsets is not None:
+        vertex_counts = np.diff(graph.edge_offsets)
+        geometry = shapely.linestrings(
+            edge_coordinates(graph),
+            indices=np.repeat(np.arange(graph.n_edges), vertex_counts),
+        )
+    else:
+        geometry = shapely.linestrings(
+            np.stack([node_xy[graph.edge_u], node_xy[graph.edge_v]], 1)
+        )
+    edges = gpd.GeoDataFrame(
+        {
+            "mm_len": graph.edge_length,
+            "node_start": graph.edge_u,
+            "node_end": graph.edge_v,
+        },
+        geometry=geometry,
+        crs=crs,
+    )
+
+    if spatial_weights:
+        from libpysal.weights import W
+
+        neighbours = np.split(np.asarray(graph.indices), graph.indptr[1:-1])
+        sw = W(
+            {node: ids.tolist() for node, ids in enumerate(neighbours)},
+            silence_warnings=True,
+        )
+        return nodes, edges, sw
+    else:
+        return nodes, edges
@@ -2,6 +2,12 @@ import geopandas as gpd
 import pandas as pd
 from shapely.geometry import Point
 
+from dublin_electricity_network.dgn import TEXT
+from dublin_electricity_network.dgn import elements_to_gdf
+from dublin_electricity_network.dgn import read_dgn
+from dublin_electricity_network.projection import points_from_xy
+from dublin_electricity_network.projection import to_crs
+
 
 def read_capacitymap(filepath):
 
@@ -30,11 +36,10 @@ def read_capacitymap(filepath):
 
     capacitymap_gdf = gpd.GeoDataFrame(
         capacitymap_df,
-        geometry=gpd.points_from_xy(
-            capacitymap_df["Longitude"], capacitymap_df["Latitude"]
+        geometry=points_from_xy(
+            capacitymap_df["Longitude"], capacitymap_df["Latitude"], crs="epsg:4326"
         ),
-        crs="epsg:4326",
-    ).to_crs(epsg=2157)
+    )
 
     return capacitymap_gdf
 
@@ -43,8 +48,8 @@ def read_dublin_admin_county_boundaries(filepath):
 
     return (
         gpd.read_file(filepath)
-        .to_crs(epsg=2157)  # read & convert to ITM or epsg=2157
         .loc[:, ["COUNTYNAME", "geometry"]]
+        .pipe(to_crs)  # convert to ITM or epsg=2157
         .reset_index(drop=True)
     )
 
@@ -73,9 +78,10 @@ def read_heatmap(filepath):
 
     heatmap_gdf = gpd.GeoDataFrame(
         heatmap_df,
-        geometry=gpd.points_from_xy(heatmap_df["Longitude"], heatmap_df["Latitude"]),
-        crs="epsg:4326",
-    ).to_crs(epsg=2157)
+        geometry=points_from_xy(
+            heatmap_df["Longitude"], heatmap_df["Latitude"], crs="epsg:4326"
+        ),
+    )
 
     return heatmap_gdf
 
@@ -85,29 +91,69 @@ def read_dublin_small_areas(filepath):
     return (
         gpd.read_file(filepath)
         .loc[:, ["SMALL_AREA", "COUNTYNAME", "geometry"]]
-        .to_crs(epsg=2157)  # convert to ITM
         .query(
             "`COUNTYNAME` == ['South Dublin', 'Dún Laoghaire-Rathdown', 'Fingal', 'Dublin City']"
         )
+        .pipe(to_crs)  # convert only the Dublin small areas to ITM
         .reset_index(drop=True)
     )
 
 
-def read_mv_index(filepath):
-
-    ireland_mv_index = gpd.read_file(filepath, driver="DGN")
-    ireland_mv_index.crs = "EPSG:29903"
-    ireland_mv_index = ireland_mv_index.to_crs(epsg=2157)
+def read_mv_index(filepath, engine="gdal"):
+    """
+    Read the text labels of the MV index tiles as points in ITM.
+
+    Parameters
+    ----------
+    filepath : str or pathlib.Path
+        e.g. "Ancillary Data/mv_index.dgn"
+    engine : str
+        "gdal" to read every element with GDAL's DGN driver & keep the points
+        or "native" to read only the text elements with `read_dgn`
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+    """
+    if engine == "native":
+        ireland_mv_index = elements_to_gdf(read_dgn(filepath, element_types=(TEXT,)))
+        return to_crs(ireland_mv_index)
+
+    ireland_mv_index = gpd.read_file(filepath, driver="DGN").set_crs(
+        "epsg:29903", allow_override=True
+    )
     point_rows = ireland_mv_index.geometry.apply(lambda x: isinstance(x, Point))
-    return ireland_mv_index[point_rows].copy()
-
-
-def read_network(filepaths, levels=None):
-
+    return to_crs(ireland_mv_index[point_rows])
+
+
+def read_network(filepaths, levels=None, n_threads=1, engine="gdal"):
+    """
+    Read the lines of CAD network tiles into one GeoDataFrame in ITM.
+
+    Parameters
+    ----------
+    filepaths : list of pathlib.Path
+        DGN tiles
+    levels : list of int, optional
+        Only read elements on these levels, by default all levels
+    n_threads : int
+        See `transform_xy`
+    engine : str
+        "gdal" to read every element with GDAL's DGN driver or "native" to
+        skip other levels without decoding them with `read_dgn`, which is
+        faster but only reads lines, line strings & text, see `read_dgn`
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        2D geometries, the Z of 3D designs is dropped by either engine
+    """
     network = []
     for filepath in filepaths:
 
-        if levels:
+        if engine == "native":
+            region = elements_to_gdf(read_dgn(filepath, levels=levels))
+        elif levels:
             region = gpd.read_file(filepath, driver="DGN").query(
                 f"`Level` == {str(levels)}"
             )
@@ -116,4 +162,7 @@ def read_network(filepaths, levels=None):
 
         network.append(region)
 
-    return gpd.GeoDataFrame(pd.concat(network), crs="epsg:29903").to_crs(epsg=2157)
\ No newline at end of file
+    return to_crs(
+        gpd.GeoDataFrame(pd.concat(network)).set_crs("epsg:29903", allow_override=True),
+        n_threads=n_threads,
+    )
@@ -49,3 +49,48 @@ def snap_points_to_network(G, points):
             snapped_to_g.y,
         ),
     ).drop(columns=["x", "y"])
+
+
+def link_remaining_to_nearest(small_areas, linked, stations, on="SMALL_AREA"):
+    """
+    Link small areas missing from `linked` to their nearest station.
+
+    Small areas that could not be linked via the network are found with an
+    anti-join on `on` & linked to the station nearest their centroid as the
+    crow flies.
+
+    Parameters
+    ----------
+    small_areas : geopandas.GeoDataFrame
+        All small areas
+    linked : geopandas.GeoDataFrame
+        Small areas already linked to a station, such as the output of
+        `extract_nearest_dest`
+    stations : geopandas.GeoDataFrame
+        Stations to link the remaining small areas to
+    on : str
+        Column uniquely identifying each small area
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        One row per small area
+    """
+    linked = linked.drop_duplicates(subset=on)
+    remaining = small_areas[~small_areas[on].isin(linked[on])].reset_index(drop=True)
+
+    centroids = remaining.geometry.centroid
+    station_centroids = stations.geometry.centroid
+    btree = cKDTree(np.column_stack([station_centroids.x, station_centroids.y]))
+    _, idx = btree.query(np.column_stack([centroids.x, centroids.y]), k=1)
+
+    station_columns = [
+        c for c in stations.columns if c != "geometry" and c not in small_areas
+    ]
+    nearest_stations = stations[station_columns].iloc[idx].reset_index(drop=True)
+    remaining_linked = pd.concat([remaining, nearest_stations], axis=1)
+
+    return gpd.GeoDataFrame(
+        pd.concat([linked, remaining_linked], ignore_index=True),
+        crs=small_areas.crs,
+    )
@@ -0,0 +1,179 @@
+from typing import Dict
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from dublin_electricity_network.graph import NetworkGraph
+from dublin_electricity_network.graph import from_lines
+from dublin_electricity_network.graph import nearest_nodes
+from dublin_electricity_network.io import read_network
+from dublin_electricity_network.paths import _nearest_dest_per_node
+
+
+class LayeredNetwork(NamedTuple):
+    """
+    Independent per-voltage network graphs linked at station points.
+
+    `station_nodes` has one row per station & one column per layer holding
+    the layer node id the station is linked to, or -1 if the station does
+    not sit on that layer.
+    """
+
+    layers: Dict[str, NetworkGraph]
+    station_nodes: pd.DataFrame
+
+
+def build_layered_network(layers, stations, max_snap_distance=100, tolerance=0.01):
+    """
+    Build one graph per network layer & link the layers at stations.
+
+    Parameters
+    ----------
+    layers : dict of str to geopandas.GeoDataFrame
+        Network lines of each layer such as {"mv": ..., "hv": ...}
+    stations : geopandas.GeoDataFrame
+        Stations which link the layers
+    max_snap_distance : float
+        A station is only linked to a layer if it lies within this many
+        metres of a node in that layer
+    tolerance : float
+        Line endpoints within `tolerance` metres of one another are merged
+        into one node, see `from_lines`
+
+    Returns
+    -------
+    LayeredNetwork
+    """
+    graphs = {
+        name: from_lines(lines, tolerance=tolerance) for name, lines in layers.items()
+    }
+
+    station_nodes = {}
+    for name, graph in graphs.items():
+        node_ids, distance = nearest_nodes(graph, stations)
+        station_nodes[name] = np.where(distance <= max_snap_distance, node_ids, -1)
+
+    return LayeredNetwork(graphs, pd.DataFrame(station_nodes))
+
+
+def read_layered_network(
+    mv_filepaths,
+    hv_filepaths,
+    mv_levels=[10, 11, 14],
+    hv_levels=None,
+    station_levels=[20, 30, 40],
+    max_snap_distance=100,
+    tolerance=0.01,
+):
+    """
+    Read the MV & HV CAD networks into a LayeredNetwork.
+
+    Parameters
+    ----------
+    mv_filepaths : list of pathlib.Path
+        MV-LV Data DGN tiles
+    hv_filepaths : list of pathlib.Path
+        HV Data DGN files
+    mv_levels : list of int
+        Levels of the MV lines
+    hv_levels : list of int, optional
+        Levels of the HV lines, by default all HV lines are used
+    station_levels : list of int
+        Levels of the 38kV, 110kV & 220kV stations in the HV Data
+    max_snap_distance : float
+        See `build_layered_network`
+    tolerance : float
+        See `build_layered_network`
+
+    Returns
+    -------
+    tuple of (LayeredNetwork, geopandas.GeoDataFrame)
+        The network & the stations which link its layers
+    """
+    mv_lines = read_network(mv_filepaths, levels=mv_levels)
+
+    hv_network = read_network(hv_filepaths)
+    if hv_levels:
+        hv_lines = hv_network.query(f"`Level` == {str(hv_levels)}")
+    else:
+        hv_lines = hv_network
+    stations = hv_network.query(f"`Level` == {str(station_levels)}").reset_index(
+        drop=True
+    )
+
+    network = build_layered_network(
+        {"mv": mv_lines, "hv": hv_lines},
+        stations,
+        max_snap_distance=max_snap_distance,
+        tolerance=tolerance,
+    )
+    return network, stations
+
+
+def route_through_layers(network, orig_points, hops):
+    """
+    Route each orig through a sequence of layers to a station in each.
+
+    The first hop routes each orig along its layer to the nearest of that
+    hop's stations, every later hop routes onwards from the station reached
+    by the previous hop.  Each hop is a single multi-source search over its
+    own layer, e.g. small areas along the MV network to the nearest 38kV
+    station & then along the HV network to the nearest 110kV or 220kV
+    station::
+
+        route_through_layers(
+            network,
+            small_areas,
+            hops=[("mv", stations_38kv), ("hv", stations_110kv_220kv)],
+        )
+
+    Parameters
+    ----------
+    network : LayeredNetwork
+    orig_points : geopandas.GeoDataFrame
+        The points (or polygons such as Small Areas) to be routed
+    hops : list of tuple of (str, array-like)
+        Layer name & positions of the stations that can be reached on it
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per orig with columns `station_{i}` & `distance_{i}` for
+        each hop i (-1 & inf if unreachable) & the total `distance`
+    """
+    first_layer = hops[0][0]
+    current_nodes, _ = nearest_nodes(network.layers[first_layer], orig_points)
+
+    routes = pd.DataFrame(index=pd.RangeIndex(len(current_nodes)))
+    total_distance = np.zeros(len(current_nodes))
+    for i, (layer, station_ids) in enumerate(hops):
+        graph = network.layers[layer]
+        layer_station_nodes = network.station_nodes[layer].to_numpy()
+
+        if i > 0:
+            # continue from the station reached on the previous hop
+            current_nodes = np.where(
+                previous_stations >= 0, layer_station_nodes[previous_stations], -1
+            )
+
+        station_ids = np.asarray(station_ids, dtype=np.int64)
+        station_ids = station_ids[layer_station_nodes[station_ids] >= 0]
+        nearest_dests, distances, _ = _nearest_dest_per_node(
+            graph, layer_station_nodes[station_ids]
+        )
+
+        reached = current_nodes >= 0
+        stations = np.full(len(current_nodes), -1, dtype=np.int64)
+        distance = np.full(len(current_nodes), np.inf)
+        dests = nearest_dests[current_nodes[reached]]
+        stations[reached] = np.append(station_ids, -1)[dests]
+        distance[reached] = distances[current_nodes[reached]]
+
+        routes[f"station_{i}"] = stations
+        routes[f"distance_{i}"] = distance
+        total_distance += distance
+        previous_stations = stations
+
+    routes["distance"] = total_distance
+    return routes
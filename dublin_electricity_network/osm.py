@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import re
+import urllib.parse
+import urllib.request
+
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+from dublin_electricity_network.files import atomic_output
+from dublin_electricity_network.projection import points_from_xy
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+
+
+def _matches(tags, tag_filter):
+    """
+    Check OSM tags against an osmnx style filter.
+
+    Each key of tag_filter maps to True (any value), a value or a list of
+    values & a feature matches if any key matches.
+    """
+    for key, value in tag_filter.items():
+        if key not in tags:
+            continue
+        if value is True or tags[key] == value:
+            return True
+        if isinstance(value, (list, tuple)) and tags[key] in value:
+            return True
+    return False
+
+
+def _to_overpass_filters(tag_filter):
+
+    filters = []
+    for key, value in tag_filter.items():
+        if value is True:
+            filters.append(f'["{key}"]')
+        elif isinstance(value, (list, tuple)):
+            values = "|".join(re.escape(str(v)) for v in value)
+            filters.append(f'["{key}"~"^({values})$"]')
+        else:
+            filters.append(f'["{key}"="{value}"]')
+    return filters
+
+
+def _to_overpass_polys(polygon):
+
+    if polygon.geom_type not in ("Polygon", "MultiPolygon"):
+        raise ValueError(f"Expected a Polygon or MultiPolygon not {polygon.geom_type}")
+    # overpass polygons are "lat lon lat lon ..." around the exterior, one
+    # per part of a multi-polygon
+    return [
+        " ".join(f"{y:.7f} {x:.7f}" for x, y in part.exterior.coords)
+        for part in shapely.get_parts(polygon)
+    ]
+
+
+def _to_overpass_query(polygon, tag_filter, date=None, timeout=180):
+
+    settings = f"[out:json][timeout:{timeout}]"
+    if date:
+        settings += f'[date:"{date}T00:00:00Z"]'
+    statements = "".join(
+        f'{element}{overpass_filter}(poly:"{poly}");'
+        for poly in _to_overpass_polys(polygon)
+        for overpass_filter in _to_overpass_filters(tag_filter)
+        for element in ("node", "way", "relation")
+    )
+    return f"{settings};({statements});out center tags;"
+
+
+def _read_overpass(polygon, tag_filter, date=None, overpass_url=OVERPASS_URL):
+
+    query = _to_overpass_query(polygon, tag_filter, date=date)
+    data = urllib.parse.urlencode({"data": query}).encode()
+    with urllib.request.urlopen(overpass_url, data=data) as response:
+        elements = json.load(response)["elements"]
+
+    features = []
+    for element in elements:
+        # ways & relations are represented by the centre of their bounding box
+        location = element if element["type"] == "node" else element.get("center")
+        if location is None:
+            continue
+        features.append(
+            {
+                "element_type": element["type"],
+                "osmid": element["id"],
+                **element.get("tags", {}),
+                "lon": location["lon"],
+                "lat": location["lat"],
+            }
+        )
+    return features
+
+
+def _read_pbf(filepath, tag_filter):
+
+    import osmium
+
+    features = []
+
+    def add_feature(element_type, obj, lons, lats):
+        if lons:
+            features.append(
+                {
+                    "element_type": element_type,
+                    "osmid": obj.orig_id() if element_type == "relation" else obj.id,
+                    **{tag.k: tag.v for tag in obj.tags},
+                    # the centre of the bounding box as for overpass
+                    "lon": (min(lons) + max(lons)) / 2,
+                    "lat": (min(lats) + max(lats)) / 2,
+                }
+            )
+
+    class Handler(osmium.SimpleHandler):
+        def node(self, n):
+            if _matches(n.tags, tag_filter):
+                add_feature("node", n, [n.location.lon], [n.location.lat])
+
+        def way(self, w):
+            if _matches(w.tags, tag_filter):
+                locations = [n.location for n in w.nodes if n.location.valid()]
+                add_feature(
+                    "way",
+                    w,
+                    [location.lon for location in locations],
+                    [location.lat for location in locations],
+                )
+
+        def area(self, a):
+            # only relations, closed ways are already handled by `way`
+            if not a.from_way() and _matches(a.tags, tag_filter):
+                locations = [
+                    n.location
+                    for ring in a.outer_rings()
+                    for n in ring
+                    if n.location.valid()
+                ]
+                add_feature(
+                    "relation",
+                    a,
+                    [location.lon for location in locations],
+                    [location.lat for location in locations],
+                )
+
+    # a single streaming pass with node locations cached for the ways
+    Handler().apply_file(str(filepath), locations=True)
+    return features
+
+
+def _get_cache_key(polygon, tag_filter, source):
+
+    digest = hashlib.sha1()
+    digest.update(shapely.to_wkb(shapely.normalize(polygon)))
+    digest.update(json.dumps(tag_filter, sort_keys=True).encode())
+    digest.update(source.encode())
+    return digest.hexdigest()[:16]
+
+
+def get_osm_points(
+    polygon,
+    tags={"substation": True},
+    date=None,
+    pbf_filepath=None,
+    overpass_url=OVERPASS_URL,
+    cache_dirpath=None,
+    refresh=False,
+):
+    """
+    Get the OSM features within a polygon as points in ITM.
+
+    Features are read from a local `.osm.pbf` extract if one is given &
+    otherwise queried from Overpass.  Results are cached in
+    `{cache_dirpath}/osm-{hash}.parquet` keyed by the polygon, tags & date
+    (or the extract), so reruns are instant & work offline.
+
+    Parameters
+    ----------
+    polygon : shapely.geometry.Polygon or shapely.geometry.MultiPolygon
+        Area of interest in epsg:4326, Overpass ignores any holes
+    tags : dict
+        osmnx style tag filter, e.g. {"substation": True} or
+        {"power": ["substation", "sub_station"]}
+    date : str, optional
+        Query OSM as of this "YYYY-MM-DD" date for reproducible results, by
+        default the latest data which is cached until `refresh` is set
+    pbf_filepath : str or pathlib.Path, optional
+        Local extract to stream instead of querying Overpass, e.g. from
+        https://download.geofabrik.de/europe/ireland-and-northern-ireland.html
+    overpass_url : str
+        Overpass interpreter endpoint, e.g. a local stand-in server
+    cache_dirpath : str or pathlib.Path, optional
+        Directory in which to cache the results
+    refresh : bool
+        Ignore & overwrite any cached result, e.g. to pick up the latest OSM
+        edits for an unpinned query
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+        One row per feature with `element_type`, `osmid`, its tags as columns
+        & its centre as geometry in epsg:2157
+    """
+    if pbf_filepath:
+        stat = os.stat(pbf_filepath)
+        source = f"{Path(pbf_filepath).name}:{stat.st_size}:{stat.st_mtime_ns}"
+    else:
+        source = f"{overpass_url}:{date or 'latest'}"
+
+    if cache_dirpath:
+        cache_dirpath = Path(cache_dirpath)
+        cache_filepath = (
+            cache_dirpath / f"osm-{_get_cache_key(polygon, tags, source)}.parquet"
+        )
+        if cache_filepath.exists() and not refresh:
+            return gpd.read_parquet(cache_filepath)
+
+    if pbf_filepath:
+        features = pd.DataFrame(_read_pbf(pbf_filepath, tags))
+        if len(features):
+            features = features[
+                shapely.contains_xy(polygon, features["lon"], features["lat"])
+            ]
+    else:
+        features = pd.DataFrame(
+            _read_overpass(polygon, tags, date=date, overpass_url=overpass_url)
+        )
+    if len(features) == 0:
+        features = pd.DataFrame(columns=["element_type", "osmid", "lon", "lat"])
+
+    points = gpd.GeoDataFrame(
+        features.drop(columns=["lon", "lat"]).reset_index(drop=True),
+        geometry=points_from_xy(features["lon"], features["lat"], crs="epsg:4326"),
+    )
+
+    if cache_dirpath:
+        cache_dirpath.mkdir(parents=True, exist_ok=True)
+        with atomic_output(cache_filepath) as temp_filepath:
+            points.to_parquet(temp_filepath)
+
+    return points
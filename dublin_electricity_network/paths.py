@@ -1,18 +1,75 @@
-from dask import compute
-from dask import delayed
-from dask.diagnostics import ProgressBar
+from heapq import heapify
+from heapq import heappop
+from heapq import heappush
+
 import geopandas as gpd
 import networkx as nx
+import numpy as np
 import pandas as pd
+from scipy.sparse.csgraph import dijkstra
+from tqdm import tqdm
 
 from dublin_electricity_network.distance import get_nearest_node
 from dublin_electricity_network.distance import get_nearest_nodes
+from dublin_electricity_network.graph import _snap_keys
+from dublin_electricity_network.graph import as_network_graph
+from dublin_electricity_network.graph import nearest_nodes
+from dublin_electricity_network.graph import node_coordinates
+from dublin_electricity_network.graph import to_csr_matrix
+
+
+def _get_network_paths_for_chunk(G, target_nodes, orig_nodes):
+
+    return [
+        nx.multi_source_dijkstra(G, sources=target_nodes, target=orig_node)
+        for orig_node in orig_nodes
+    ]
+
+
+def _get_network_paths_in_chunks(G, orig_points, dest_points, chunksize, n_workers):
 
+    from dask.distributed import Client
+    from dask.distributed import LocalCluster
+    from dask.distributed import as_completed as as_completed_futures
 
-def get_network_paths_between_points(G, orig_points, dest_points):
+    # snap all points in one go rather than once per orig
+    orig_centroids = gpd.GeoDataFrame(geometry=orig_points.geometry.centroid)
+    orig_nodes = get_nearest_nodes(G, orig_centroids)
+    target_nodes = get_nearest_nodes(G, dest_points.copy())
+
+    chunks = [
+        orig_nodes[start : start + chunksize]
+        for start in range(0, len(orig_nodes), chunksize)
+    ]
+    with LocalCluster(
+        n_workers=n_workers, threads_per_worker=1, processes=True
+    ) as cluster, Client(cluster) as client:
+        # ship the graph to each worker once rather than once per task
+        [G_scattered] = client.scatter([G], broadcast=True)
+        futures = {
+            client.submit(
+                _get_network_paths_for_chunk, G_scattered, target_nodes, chunk
+            ): i
+            for i, chunk in enumerate(chunks)
+        }
+        chunk_paths = [None] * len(chunks)
+        for future in tqdm(as_completed_futures(futures), total=len(futures)):
+            chunk_paths[futures[future]] = future.result()
+
+    return tuple(path for paths in chunk_paths for path in paths)
+
+
+def get_network_paths_between_points(
+    G, orig_points, dest_points, chunksize=None, n_workers=None
+):
     """
     Find the nearest dest to each orig.
 
+    By default each orig is a separate task on dask's threaded scheduler.  If
+    `chunksize` is set origs are instead routed in chunks on a local
+    `dask.distributed` cluster of worker processes which each receive the
+    graph once, so throughput scales with the number of cores.
+
     Parameters
     ----------
     G : networkx.MultiDiGraph
@@ -21,6 +78,10 @@ def get_network_paths_between_points(G, orig_points, dest_points):
         The points for which we will find the nearest dest_point
     dest_points : geopandas.GeoDataFrame
         The points to be compared to orig_points
+    chunksize : int, optional
+        Number of origs routed per task
+    n_workers : int, optional
+        Number of worker processes, by default one per CPU
 
     Returns
     -------
@@ -31,6 +92,15 @@ def get_network_paths_between_points(G, orig_points, dest_points):
     ------------
     https://stackoverflow.com/questions/63690631/osmnx-shortest-path-how-to-skip-node-if-not-reachable-and-take-the-next-neares/63713539#63713539
     """
+    if chunksize:
+        return _get_network_paths_in_chunks(
+            G, orig_points, dest_points, chunksize, n_workers
+        )
+
+    from dask import compute
+    from dask import delayed
+    from dask.diagnostics import ProgressBar
+
     paths = []
     target_nodes = delayed(get_nearest_nodes)(G, dest_points)
     for orig_point in orig_points.itertuples():
@@ -50,22 +120,303 @@ def get_network_paths_between_points(G, orig_points, dest_points):
     return shortest_paths
 
 
-def extract_nearest_dest(paths, orig, dest):
+def extract_nearest_dest(paths, orig, dest, resolution=0.01):
+    """
+    Link each orig to the dest at the start of its path.
 
-    nearest_dest_coords = [path[1][0] for path in paths]
-    nearest_dest_coords_df = pd.DataFrame(nearest_dest_coords, columns=["x", "y"])
-    orig_with_dest_coords = nearest_dest_coords_df.merge(
+    Path starts are matched to the dest centroids on the `resolution` metre
+    grid used by quantised graphs rather than by exact float equality, so
+    coordinates that went through a quantised graph still match.
+    """
+    # origs with no path to any dest have an empty path & are dropped
+    has_path = np.array([len(path[1]) > 0 for path in paths], dtype=bool)
+    nearest_dest_xy = np.array(
+        [path[1][0] for path in paths if len(path[1])], dtype=np.float64
+    ).reshape(-1, 2)
+    nearest_dest_keys = pd.DataFrame(
+        {"xy_key": _snap_keys(nearest_dest_xy, resolution)},
+        index=np.flatnonzero(has_path),
+    )
+    orig_with_dest_keys = nearest_dest_keys.merge(
         orig,
         left_index=True,
         right_index=True,
     )
 
-    dest["x"] = dest.geometry.centroid.x
-    dest["y"] = dest.geometry.centroid.y
+    centroids = dest.geometry.centroid
+    dest_keys = _snap_keys(np.column_stack([centroids.x, centroids.y]), resolution)
 
     return gpd.GeoDataFrame(
-        orig_with_dest_coords.merge(
-            dest.drop(columns="geometry"),
-            on=["x", "y"],
-        ).drop(columns=["x", "y"])
+        orig_with_dest_keys.merge(
+            dest.drop(columns="geometry").assign(xy_key=dest_keys),
+            on="xy_key",
+        ).drop(columns="xy_key")
+    )
+
+
+# a compiled search per dest beats the python k-label search until there are
+# about this many dests per label, as measured on a 90,000 node grid
+_DESTS_PER_LABEL = 32
+
+
+def _k_nearest_dests_by_dest(graph, orig_nodes, dest_nodes, k, max_distance):
+    """
+    Find the k nearest dest nodes to each orig node with a search per dest.
+
+    Runs scipy's compiled Dijkstra from chunks of dests, each bounded by
+    `max_distance`, & merges each chunk's distances into a running top k so
+    only (chunksize, n_nodes) distances are ever held in memory.
+    """
+    adjacency = to_csr_matrix(graph)
+    nearest_dests = np.full((len(orig_nodes), k), -1, dtype=np.int64)
+    nearest_distances = np.full((len(orig_nodes), k), np.inf)
+    chunksize = max(1, 2**24 // max(graph.n_nodes, 1))
+    for start in range(0, len(dest_nodes), chunksize):
+        chunk = dest_nodes[start : start + chunksize]
+        distances = dijkstra(
+            adjacency, directed=True, indices=chunk, limit=max_distance
+        )[:, orig_nodes].T
+        all_distances = np.concatenate([nearest_distances, distances], axis=1)
+        all_dests = np.concatenate(
+            [
+                nearest_dests,
+                np.broadcast_to(np.arange(start, start + len(chunk)), distances.shape),
+            ],
+            axis=1,
+        )
+        # a stable sort keeps the lowest dest position first on ties
+        order = np.argsort(all_distances, axis=1, kind="stable")[:, :k]
+        nearest_distances = np.take_along_axis(all_distances, order, axis=1)
+        nearest_dests = np.take_along_axis(all_dests, order, axis=1)
+
+    nearest_dests[~np.isfinite(nearest_distances)] = -1
+    return nearest_dests, nearest_distances
+
+
+def _k_nearest_dests_by_labels(graph, orig_nodes, dest_nodes, k, max_distance):
+    """
+    Find the k nearest dest nodes to each orig node in one labelled search.
+
+    A bounded k-label multi-source Dijkstra: every dest seeds the queue & each
+    node is settled at most once per dest and at most k times in total, so
+    the search costs roughly k times a single nearest-dest search however
+    many dests there are.  It stops as soon as every orig node has k labels.
+    The labels are (node, dest) pairs that scipy's Dijkstra cannot track, so
+    the loop is plain python.
+    """
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    weights = graph.weights.tolist()
+
+    n_dests = len(dest_nodes)
+    counts = [0] * graph.n_nodes
+    settled = set()  # node * n_dests + dest
+    labels = {}
+    pending = set(np.asarray(orig_nodes).tolist())
+    queue = [(0.0, node, dest) for dest, node in enumerate(dest_nodes.tolist())]
+    heapify(queue)
+    while queue and pending:
+        distance, node, dest = heappop(queue)
+        key = node * n_dests + dest
+        if counts[node] == k or key in settled:
+            continue
+        settled.add(key)
+        counts[node] += 1
+        if node in pending:
+            labels.setdefault(node, []).append((dest, distance))
+            if counts[node] == k:
+                pending.discard(node)
+        for i in range(indptr[node], indptr[node + 1]):
+            neighbour = indices[i]
+            if counts[neighbour] < k:
+                neighbour_distance = distance + weights[i]
+                if neighbour_distance <= max_distance and (
+                    neighbour * n_dests + dest not in settled
+                ):
+                    heappush(queue, (neighbour_distance, neighbour, dest))
+
+    nearest_dests = np.full((len(orig_nodes), k), -1, dtype=np.int64)
+    nearest_distances = np.full((len(orig_nodes), k), np.inf)
+    for i, node in enumerate(np.asarray(orig_nodes).tolist()):
+        for rank, (dest, distance) in enumerate(labels.get(node, ())):
+            nearest_dests[i, rank] = dest
+            nearest_distances[i, rank] = distance
+
+    return nearest_dests, nearest_distances
+
+
+def _k_nearest_dests(graph, orig_nodes, dest_nodes, k, max_distance=np.inf):
+    """
+    Find the k nearest dest nodes to each orig node.
+
+    The python k-label search does ~k node visits per node whereas the
+    compiled search does one per node per dest, so the compiled search is
+    used for few dests & the label search for many.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    orig_nodes : numpy.ndarray
+        (n_orig,) node ids
+    dest_nodes : numpy.ndarray
+        (n_dest,) node ids
+    k : int
+    max_distance : float
+        Ignore dests further than this along the network
+
+    Returns
+    -------
+    tuple of (numpy.ndarray, numpy.ndarray)
+        (n_orig, k) dest positions (-1 if not found) & distances (inf)
+    """
+    orig_nodes = np.asarray(orig_nodes, dtype=np.int64)
+    dest_nodes = np.asarray(dest_nodes, dtype=np.int64)
+    if len(dest_nodes) <= _DESTS_PER_LABEL * k:
+        search = _k_nearest_dests_by_dest
+    else:
+        search = _k_nearest_dests_by_labels
+    return search(graph, orig_nodes, dest_nodes, k, max_distance)
+
+
+def get_k_nearest_dests(G, orig_points, dest_points, k=3, max_distance=np.inf):
+    """
+    Find the k nearest dests to each orig along the network in one pass.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+        input graph
+    orig_points : geopandas.GeoDataFrame
+        The points (or polygons such as Small Areas) for which we will find
+        the nearest dest_points
+    dest_points : geopandas.GeoDataFrame
+        The points to be compared to orig_points
+    k : int
+        Number of nearest dests to find for each orig
+    max_distance : float
+        Ignore dests further than this along the network
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns `origin`, `rank`, `station` & `distance` where origin &
+        station are positions in orig_points & dest_points and rank 0 is the
+        nearest; origs with fewer than k reachable dests have fewer rows
+    """
+    graph = as_network_graph(G)
+    orig_nodes, _ = nearest_nodes(graph, orig_points)
+    dest_nodes, _ = nearest_nodes(graph, dest_points)
+
+    nearest_dests, nearest_distances = _k_nearest_dests(
+        graph, orig_nodes, dest_nodes, k=k, max_distance=max_distance
+    )
+    origin, rank = np.nonzero(nearest_dests >= 0)
+    return pd.DataFrame(
+        {
+            "origin": origin,
+            "rank": rank,
+            "station": nearest_dests[origin, rank],
+            "distance": nearest_distances[origin, rank],
+        }
     )
+
+
+def _nearest_dest_per_node(graph, dest_nodes):
+    """
+    Find the nearest dest to every node in one compiled multi-source search.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    dest_nodes : numpy.ndarray
+        (n_dest,) node ids
+
+    Returns
+    -------
+    tuple of (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        (n_nodes,) nearest dest position (-1 if unreachable), network
+        distance to it (inf) & predecessor of each node on the way back to it
+        (-9999 at the dest itself or if unreachable)
+    """
+    dest_nodes = np.asarray(dest_nodes, dtype=np.int64)
+    if len(dest_nodes) == 0:
+        return (
+            np.full(graph.n_nodes, -1, dtype=np.int64),
+            np.full(graph.n_nodes, np.inf),
+            np.full(graph.n_nodes, -9999, dtype=np.int64),
+        )
+
+    distances, predecessors, sources = dijkstra(
+        to_csr_matrix(graph),
+        directed=True,  # the CSR arrays already store both directions
+        indices=dest_nodes,
+        min_only=True,
+        return_predecessors=True,
+    )
+
+    # where several dests snap to the same node the first one wins
+    dest_of_node = np.full(graph.n_nodes, -1, dtype=np.int64)
+    dest_of_node[dest_nodes[::-1]] = np.arange(len(dest_nodes))[::-1]
+    # unreachable nodes have a source of -9999 so must not be looked up
+    reached = sources >= 0
+    nearest_dests = np.full(graph.n_nodes, -1, dtype=np.int64)
+    nearest_dests[reached] = dest_of_node[sources[reached]]
+
+    return nearest_dests, distances, predecessors.astype(np.int64)
+
+
+def _trace_path(predecessors, node):
+
+    path = [node]
+    while predecessors[path[-1]] >= 0:
+        path.append(predecessors[path[-1]])
+    return path[::-1]
+
+
+def iter_network_paths_between_points(
+    G, orig_points, dest_points, chunksize=1000, skip_chunks=()
+):
+    """
+    Find the nearest dest to each orig & yield the paths in chunks.
+
+    A single multi-source search assigns every node its nearest dest, then
+    the paths of each chunk of origs are traced & yielded in turn, so only
+    one chunk of paths is held in memory at a time.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+        input graph
+    orig_points : geopandas.GeoDataFrame
+        The points (or polygons such as Small Areas) for which we will find
+        the nearest dest_point
+    dest_points : geopandas.GeoDataFrame
+        The points to be compared to orig_points
+    chunksize : int
+        Number of origs per chunk
+    skip_chunks : collection of int
+        Chunks not to trace, such as those already completed by a previous run
+
+    Yields
+    ------
+    tuple of (int, list of (tuple of (float, list of (coords)))
+        Chunk number & the paths of the origs
+        `orig_points.iloc[chunk * chunksize:(chunk + 1) * chunksize]` in the
+        format returned by `get_network_paths_between_points`
+    """
+    graph = as_network_graph(G)
+    orig_nodes, _ = nearest_nodes(graph, orig_points)
+    dest_nodes, _ = nearest_nodes(graph, dest_points)
+    _, distances, predecessors = _nearest_dest_per_node(graph, dest_nodes)
+
+    for chunk, start in enumerate(range(0, len(orig_nodes), chunksize)):
+        if chunk in skip_chunks:
+            continue
+        paths = []
+        for node in orig_nodes[start : start + chunksize].tolist():
+            if np.isfinite(distances[node]):
+                path = node_coordinates(graph, _trace_path(predecessors, node)).tolist()
+            else:
+                path = []
+            paths.append((distances[node], [tuple(xy) for xy in path]))
+        yield chunk, paths
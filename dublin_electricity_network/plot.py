@@ -1,16 +1,13 @@
 import gc
 import os
 
-from dask.diagnostics import ProgressBar
-from dask import compute
-from dask import delayed
-import matplotlib.patheffects as pe
-import matplotlib.pyplot as plt
 import networkx as nx
 from tqdm import tqdm
 
 
 def plot_gdf_vs_nx(G, gdf, boundaries):
+    import matplotlib.pyplot as plt
+
     positions = {n: [n[0], n[1]] for n in list(G.nodes)}
 
     f, ax = plt.subplots(1, 2, figsize=(30, 30), sharex=True, sharey=True)
@@ -27,6 +24,8 @@ def plot_gdf_vs_nx(G, gdf, boundaries):
 
 
 def plot_path_n(G, paths, orig_points, dest_points, boundaries, n):
+    import matplotlib.pyplot as plt
+
     f, ax = plt.subplots(figsize=(30, 30))
 
     boundaries.plot(edgecolor="red", facecolor="none", ax=ax)
@@ -49,6 +48,8 @@ def plot_graph(G, ax):
 
 
 def plot_paths_to_files(G, paths, orig_points, dest_points, boundaries, dirpath):
+    import matplotlib.pyplot as plt
+
     assert os.path.exists(dirpath)
 
     for n in tqdm(range(len(paths))):
@@ -74,6 +75,11 @@ def plot_paths_to_files(G, paths, orig_points, dest_points, boundaries, dirpath)
 def plot_paths_to_files_delayed(
     G, paths, orig_points, dest_points, boundaries, dirpath
 ):
+    from dask import compute
+    from dask import delayed
+    from dask.diagnostics import ProgressBar
+    import matplotlib.pyplot as plt
+
     assert os.path.exists(dirpath)
 
     figures = []
@@ -103,6 +109,8 @@ def plot_paths_to_files_delayed(
 
 
 def plot_heatmap_vs_capacitymap(heatmap, capacitymap, boundaries):
+    import matplotlib.patheffects as pe
+    import matplotlib.pyplot as plt
 
     f, ax = plt.subplots(figsize=(100, 100))
 
@@ -139,6 +147,8 @@ def plot_heatmap_vs_capacitymap(heatmap, capacitymap, boundaries):
 
 
 def plot_small_areas_linked_to_stations(small_areas, stations):
+    import matplotlib.patheffects as pe
+    import matplotlib.pyplot as plt
 
     f, ax = plt.subplots(figsize=(100, 100))
 
@@ -164,6 +174,8 @@ def plot_small_areas_linked_to_stations(small_areas, stations):
 
 
 def plot_cad_stations_vs_heatmap_stations(cad_stations, heatmap_stations, boundaries):
+    import matplotlib.patheffects as pe
+    import matplotlib.pyplot as plt
 
     f, ax = plt.subplots(figsize=(100, 100))
     boundaries.plot(ax=ax, facecolor="orange", edgecolor="teal")
@@ -0,0 +1,46 @@
+from concurrent.futures import ProcessPoolExecutor
+
+# the state built by `setup` in each worker process of a `process_pool`
+_worker_state = None
+
+
+def _init_worker(setup, args):
+
+    global _worker_state
+    _worker_state = setup(*args)
+
+
+def process_pool(setup, *args, n_workers=None):
+    """
+    Create a process pool whose workers each build their state once.
+
+    `setup(*args)` runs once in every worker process as it starts & tasks
+    read its result via `worker_state`, so large inputs such as graphs or
+    layers are shipped to each worker once rather than once per task, e.g.::
+
+        with process_pool(_build_indexes, layers, n_workers=4) as executor:
+            results = list(executor.map(_query_indexes, queries))
+
+    Parameters
+    ----------
+    setup : callable
+        Module level function, so it can be sent to the workers
+    *args
+        Arguments of `setup`
+    n_workers : int, optional
+        Number of processes, by default one per CPU
+
+    Returns
+    -------
+    concurrent.futures.ProcessPoolExecutor
+    """
+    return ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(setup, args)
+    )
+
+
+def worker_state():
+    """
+    Get the state built by `setup` in this worker process of a `process_pool`.
+    """
+    return _worker_state
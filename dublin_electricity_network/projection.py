@@ -0,0 +1,146 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import threading
+
+import geopandas as gpd
+import numpy as np
+from pyproj import CRS
+from pyproj import Transformer
+import shapely
+
+
+@lru_cache(maxsize=None)
+def _get_transformer(from_crs, to_crs):
+
+    return Transformer.from_crs(from_crs, to_crs, always_xy=True)
+
+
+def get_transformer(from_crs, to_crs="epsg:2157"):
+    """
+    Get a (cached) Transformer between two CRS.
+
+    Creating a Transformer means a PROJ database lookup, so each pair of CRS
+    is only set up once per process & reused by every later call.
+
+    Parameters
+    ----------
+    from_crs, to_crs : str, int or pyproj.CRS
+        e.g. "epsg:4326", 29903 or a GeoDataFrame's crs
+
+    Returns
+    -------
+    pyproj.Transformer
+        Taking & returning (x, y), i.e. (longitude, latitude) in epsg:4326
+    """
+    return _get_transformer(CRS.from_user_input(from_crs), CRS.from_user_input(to_crs))
+
+
+def transform_xy(x, y, from_crs, to_crs="epsg:2157", n_threads=1, chunksize=100000):
+    """
+    Reproject coordinate arrays in bulk.
+
+    Parameters
+    ----------
+    x, y : array-like
+        Coordinates in from_crs, (longitude, latitude) in epsg:4326
+    from_crs, to_crs : str, int or pyproj.CRS
+    n_threads : int
+        Reproject chunks of `chunksize` points on this many threads, PROJ
+        releases the GIL so this scales for large line sets
+    chunksize : int
+
+    Returns
+    -------
+    tuple of (numpy.ndarray, numpy.ndarray)
+        x, y in to_crs
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    transformer = get_transformer(from_crs, to_crs)
+    if n_threads == 1 or len(x) <= chunksize:
+        return transformer.transform(x, y)
+
+    # pyproj objects are only thread safe from pyproj 3.1, so rather than
+    # share the cached transformer each thread builds its own
+    from_wkt, to_wkt = transformer.source_crs.to_wkt(), transformer.target_crs.to_wkt()
+    local = threading.local()
+
+    def transform_chunk(start):
+        if not hasattr(local, "transformer"):
+            local.transformer = Transformer.from_crs(from_wkt, to_wkt, always_xy=True)
+        return local.transformer.transform(
+            x[start : start + chunksize], y[start : start + chunksize]
+        )
+
+    starts = range(0, len(x), chunksize)
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        chunks = list(executor.map(transform_chunk, starts))
+    return (
+        np.concatenate([chunk_x for chunk_x, _ in chunks]),
+        np.concatenate([chunk_y for _, chunk_y in chunks]),
+    )
+
+
+def points_from_xy(x, y, crs, to_crs="epsg:2157"):
+    """
+    Build points directly in to_crs from coordinates in crs.
+
+    Equivalent to `gpd.points_from_xy(x, y, crs=crs)` followed by `.to_crs`
+    but without building the intermediate points.
+
+    Returns
+    -------
+    geopandas.array.GeometryArray
+    """
+    to_x, to_y = transform_xy(x, y, crs, to_crs)
+    return gpd.points_from_xy(to_x, to_y, crs=to_crs)
+
+
+def to_crs(gdf, to_crs="epsg:2157", n_threads=1):
+    """
+    Reproject a GeoDataFrame in one pass over all of its vertices.
+
+    Parameters
+    ----------
+    gdf : geopandas.GeoDataFrame or geopandas.GeoSeries
+        With its crs set
+    to_crs : str, int or pyproj.CRS
+    n_threads : int
+        See `transform_xy`
+
+    Returns
+    -------
+    geopandas.GeoDataFrame or geopandas.GeoSeries
+    """
+    geometries = shapely.transform(
+        gdf.geometry.to_numpy(),
+        lambda xy: np.column_stack(
+            transform_xy(xy[:, 0], xy[:, 1], gdf.crs, to_crs, n_threads=n_threads)
+        ),
+    )
+    reprojected = gpd.GeoSeries(
+        geometries, index=gdf.index, crs=to_crs, name=gdf.geometry.name
+    )
+    if isinstance(gdf, gpd.GeoSeries):
+        return reprojected
+    return gdf.set_geometry(reprojected)
+
+
+def with_lat_long(gdf, latitude="Latitude", longitude="Longitude"):
+    """
+    Add latitude & longitude columns from one reprojection of the centroids.
+
+    Parameters
+    ----------
+    gdf : geopandas.GeoDataFrame
+        With its crs set
+    latitude, longitude : str
+        Names of the new columns
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+    """
+    centroids = gdf.geometry.centroid
+    x, y = transform_xy(centroids.x, centroids.y, gdf.crs, "epsg:4326")
+    return gdf.assign(**{latitude: y, longitude: x})
@@ -0,0 +1,139 @@
+import json
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+from tqdm import tqdm
+
+from dublin_electricity_network.graph import nearest_nodes
+from dublin_electricity_network.graph import node_coordinates
+from dublin_electricity_network.paths import _nearest_dest_per_node
+
+NO_STATION = np.iinfo(np.uint16).max
+
+
+class StationGrid(NamedTuple):
+    """
+    Nearest station to the centre of every cell of a regular ITM grid.
+
+    Row 0 is the bottom (`ymin`) row & column 0 the left (`xmin`) column.
+    Cells which cannot reach any station are `NO_STATION` with a nan distance.
+    """
+
+    station: np.ndarray
+    distance: np.ndarray
+    xmin: float
+    ymin: float
+    cell_size: float
+
+
+def rasterise_nearest_stations(graph, stations, bounds, cell_size=25, chunksize=256):
+    """
+    Rasterise the nearest station along the network onto a grid.
+
+    Every node is first assigned its nearest station in one multi-source
+    search, then each cell centre is snapped to its nearest node as in
+    `join_nearest_points`.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    stations : geopandas.GeoDataFrame
+        Stations in ITM, snapped to their nearest node
+    bounds : tuple of float
+        (xmin, ymin, xmax, ymax) of the grid, e.g. the Dublin box
+        (695000, 715000, 740000, 771000)
+    cell_size : float
+        Width of each cell in metres
+    chunksize : int
+        Number of rows snapped at a time
+
+    Returns
+    -------
+    StationGrid
+        `station` holds the position of each cell's station in `stations` &
+        `distance` the network distance plus the distance from the cell
+        centre to the network
+    """
+    if len(stations) >= NO_STATION:
+        raise ValueError(f"Can only rasterise fewer than {NO_STATION} stations")
+
+    station_nodes, _ = nearest_nodes(graph, stations)
+    node_station, node_distance, _ = _nearest_dest_per_node(graph, station_nodes)
+
+    xmin, ymin, xmax, ymax = bounds
+    n_cols = int(np.ceil((xmax - xmin) / cell_size))
+    n_rows = int(np.ceil((ymax - ymin) / cell_size))
+    x = xmin + (np.arange(n_cols) + 0.5) * cell_size
+
+    station = np.full((n_rows, n_cols), NO_STATION, dtype=np.uint16)
+    distance = np.full((n_rows, n_cols), np.nan, dtype=np.float32)
+
+    tree = cKDTree(node_coordinates(graph))
+    for start in tqdm(range(0, n_rows, chunksize)):
+        rows = np.arange(start, min(start + chunksize, n_rows))
+        y = ymin + (rows + 0.5) * cell_size
+        cell_xy = np.column_stack([np.tile(x, len(rows)), np.repeat(y, n_cols)])
+        snap_distance, nodes = tree.query(cell_xy, k=1)
+
+        reached = node_station[nodes] >= 0
+        chunk_station = np.full(len(nodes), NO_STATION, dtype=np.uint16)
+        chunk_station[reached] = node_station[nodes[reached]]
+        chunk_distance = np.where(reached, node_distance[nodes] + snap_distance, np.nan)
+
+        station[rows] = chunk_station.reshape(len(rows), n_cols)
+        distance[rows] = chunk_distance.reshape(len(rows), n_cols)
+
+    return StationGrid(station, distance, float(xmin), float(ymin), float(cell_size))
+
+
+def write_station_grid(grid, dirpath):
+
+    dirpath = Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+    np.save(dirpath / "station.npy", grid.station)
+    np.save(dirpath / "distance.npy", grid.distance)
+    with open(dirpath / "grid.json", "w") as f:
+        json.dump(
+            {"xmin": grid.xmin, "ymin": grid.ymin, "cell_size": grid.cell_size}, f
+        )
+
+
+def read_station_grid(dirpath, mmap_mode="r"):
+
+    dirpath = Path(dirpath)
+    with open(dirpath / "grid.json") as f:
+        extent = json.load(f)
+    return StationGrid(
+        station=np.load(dirpath / "station.npy", mmap_mode=mmap_mode),
+        distance=np.load(dirpath / "distance.npy", mmap_mode=mmap_mode),
+        **extent,
+    )
+
+
+def lookup_stations(grid, x, y):
+    """
+    Look up the nearest station to points in O(1) per point.
+
+    Parameters
+    ----------
+    grid : StationGrid
+    x, y : array-like
+        ITM coordinates
+
+    Returns
+    -------
+    tuple of (numpy.ndarray, numpy.ndarray)
+        Station position (`NO_STATION` outside the grid) & distance (nan)
+    """
+    cols = np.floor((np.asarray(x) - grid.xmin) / grid.cell_size).astype(np.int64)
+    rows = np.floor((np.asarray(y) - grid.ymin) / grid.cell_size).astype(np.int64)
+    n_rows, n_cols = grid.station.shape
+    inside = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+
+    station = np.full(rows.shape, NO_STATION, dtype=np.uint16)
+    distance = np.full(rows.shape, np.nan, dtype=np.float32)
+    station[inside] = grid.station[rows[inside], cols[inside]]
+    distance[inside] = grid.distance[rows[inside], cols[inside]]
+    return station, distance
@@ -0,0 +1,240 @@
+"""
+Answer "which station serves this point" over HTTP.
+
+Run with::
+
+    python -m dublin_electricity_network.service \
+        --graph data/dublin-mv-graph \
+        --stations data/cad_stations_dublin.geojson \
+        --station-column station_name
+
+& query with a batch of points in ITM (epsg:2157) or lat/long (epsg:4326)::
+
+    curl -X POST localhost:8000/nearest -d '{
+        "points": [[-6.26, 53.34]], "crs": "epsg:4326", "paths": true
+    }'
+"""
+
+import argparse
+import asyncio
+from http import HTTPStatus
+import json
+from typing import NamedTuple
+
+import geopandas as gpd
+import numpy as np
+from pyproj import CRS
+from pyproj.exceptions import CRSError
+from scipy.spatial import cKDTree
+
+from dublin_electricity_network.graph import NetworkGraph
+from dublin_electricity_network.graph import nearest_nodes
+from dublin_electricity_network.graph import node_coordinates
+from dublin_electricity_network.graph import read_network_graph
+from dublin_electricity_network.paths import _nearest_dest_per_node
+from dublin_electricity_network.paths import _trace_path
+from dublin_electricity_network.projection import transform_xy
+
+
+class StationIndex(NamedTuple):
+    """
+    Nearest station along the network to every node of a graph.
+
+    `node_station`, `node_distance` & `node_predecessor` are the result of one
+    multi-source search from all stations so answering a query is a KD-tree
+    snap to the nearest node followed by array lookups.
+    """
+
+    graph: NetworkGraph
+    tree: cKDTree
+    station_ids: list
+    node_station: np.ndarray
+    node_distance: np.ndarray
+    node_predecessor: np.ndarray
+
+
+def build_station_index(graph, stations, station_column=None):
+    """
+    Precompute the nearest station to every node of the graph.
+
+    Parameters
+    ----------
+    graph : NetworkGraph
+    stations : geopandas.GeoDataFrame
+        Stations in ITM, snapped to their nearest node
+    station_column : str, optional
+        Column identifying each station, by default its position
+
+    Returns
+    -------
+    StationIndex
+    """
+    station_nodes, _ = nearest_nodes(graph, stations)
+    node_station, node_distance, node_predecessor = _nearest_dest_per_node(
+        graph, station_nodes
+    )
+    if station_column:
+        station_ids = stations[station_column].tolist()
+    else:
+        station_ids = list(range(len(stations)))
+
+    return StationIndex(
+        graph=graph,
+        tree=cKDTree(node_coordinates(graph)),
+        station_ids=station_ids,
+        node_station=node_station,
+        node_distance=node_distance,
+        node_predecessor=node_predecessor,
+    )
+
+
+def query_station_index(index, xy, crs="epsg:2157", include_paths=False):
+    """
+    Find the station serving each point.
+
+    Parameters
+    ----------
+    index : StationIndex
+    xy : array-like
+        (n, 2) point coordinates, (longitude, latitude) if crs is epsg:4326
+    crs : str, int or pyproj.CRS
+        CRS of xy, e.g. "epsg:4326" or 4326
+    include_paths : bool
+        Also return the path from the station to each point's nearest node
+
+    Returns
+    -------
+    list of dict
+        `station`, `distance` along the network & `snap_distance` from each
+        point to the network; station is None if no station can be reached
+    """
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    crs = CRS.from_user_input(crs)
+    if crs != "epsg:2157":
+        xy = np.column_stack(transform_xy(xy[:, 0], xy[:, 1], crs, "epsg:2157"))
+
+    snap_distances, nodes = index.tree.query(xy, k=1)
+    stations = index.node_station[nodes]
+    distances = index.node_distance[nodes]
+
+    results = []
+    for node, station, distance, snap_distance in zip(
+        nodes.tolist(), stations.tolist(), distances.tolist(), snap_distances.tolist()
+    ):
+        reached = station >= 0
+        result = {
+            "station": index.station_ids[station] if reached else None,
+            "distance": distance if reached else None,
+            "snap_distance": snap_distance,
+        }
+        if include_paths:
+            path = _trace_path(index.node_predecessor, node) if reached else []
+            result["path"] = node_coordinates(index.graph, path).tolist()
+        results.append(result)
+
+    return results
+
+
+def handle_request(index, method, target, body):
+    """
+    Answer one HTTP request.
+
+    Returns
+    -------
+    tuple of (http.HTTPStatus, dict)
+        Status & JSON payload
+    """
+    if method == "GET" and target == "/health":
+        return HTTPStatus.OK, {"status": "ok", "n_nodes": index.graph.n_nodes}
+    elif method == "POST" and target == "/nearest":
+        try:
+            request = json.loads(body or b"{}")
+            results = query_station_index(
+                index,
+                request["points"],
+                crs=request.get("crs", "epsg:2157"),
+                include_paths=request.get("paths", False),
+            )
+        except (CRSError, KeyError, TypeError, ValueError) as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except Exception as e:
+            # always answer, a crash would leave the client hanging
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+        return HTTPStatus.OK, {"results": results}
+    else:
+        return HTTPStatus.NOT_FOUND, {"error": f"No route for {method} {target}"}
+
+
+async def _handle_connection(index, reader, writer):
+
+    try:
+        request_line = await reader.readline()
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+        status, payload = handle_request(index, method, target, body)
+    except (ValueError, asyncio.IncompleteReadError) as e:
+        status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+    except Exception as e:
+        status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+
+    content = json.dumps(payload).encode()
+    writer.write(
+        (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode("latin-1")
+        + content
+    )
+    await writer.drain()
+    writer.close()
+
+
+async def _serve(index, host, port):
+
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(index, reader, writer),
+        host,
+        port,
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def serve(index, host="127.0.0.1", port=8000):
+    """
+    Serve a StationIndex over HTTP until interrupted.
+
+    Routes are `GET /health` & `POST /nearest` with a JSON body
+    `{"points": [[x, y], ...], "crs": "epsg:2157", "paths": false}`.
+    """
+    print(f"Serving {index.graph.n_nodes} nodes on http://{host}:{port}...")
+    asyncio.run(_serve(index, host, port))
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--graph", required=True, help="saved NetworkGraph dir")
+    parser.add_argument("--stations", required=True, help="stations file")
+    parser.add_argument("--station-column", default=None)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    graph = read_network_graph(args.graph)
+    stations = gpd.read_file(args.stations).to_crs(epsg=2157)
+    index = build_station_index(graph, stations, station_column=args.station_column)
+    serve(index, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
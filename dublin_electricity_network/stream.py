@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import geopandas as gpd
+import pandas as pd
+
+from dublin_electricity_network.files import atomic_output
+from dublin_electricity_network.paths import extract_nearest_dest
+from dublin_electricity_network.paths import iter_network_paths_between_points
+
+
+def _get_completed_chunks(dirpath):
+
+    return {
+        int(filepath.stem.split("-")[1]) for filepath in dirpath.glob("chunk-*.parquet")
+    }
+
+
+def write_nearest_dest_in_chunks(G, orig, dest, dirpath, chunksize=1000):
+    """
+    Link each orig to its nearest dest & save the result chunk by chunk.
+
+    Each chunk of origs is linked to its dest attributes via
+    `extract_nearest_dest` & saved as `{dirpath}/chunk-{n}.parquet` as soon as
+    it is routed, so memory use does not grow with the number of origs.
+    Chunks saved by a previous run are skipped, so an interrupted run resumes
+    from the last completed chunk.
+
+    Parameters
+    ----------
+    G : NetworkGraph or networkx.Graph
+        input graph
+    orig : geopandas.GeoDataFrame
+        The points (or polygons such as Small Areas) to be linked
+    dest : geopandas.GeoDataFrame
+        The points, snapped to the network, to be linked to
+    dirpath : str or pathlib.Path
+        Directory in which to save the chunks
+    chunksize : int
+        Number of origs per chunk, must not change when resuming a run
+    """
+    dirpath = Path(dirpath)
+    dirpath.mkdir(parents=True, exist_ok=True)
+
+    paths = iter_network_paths_between_points(
+        G,
+        orig,
+        dest,
+        chunksize=chunksize,
+        skip_chunks=_get_completed_chunks(dirpath),
+    )
+    for chunk, chunk_paths in paths:
+        start = chunk * chunksize
+        orig_chunk = orig.iloc[start : start + chunksize].reset_index(drop=True)
+        linked = gpd.GeoDataFrame(
+            extract_nearest_dest(chunk_paths, orig_chunk, dest.copy()), crs=orig.crs
+        )
+
+        with atomic_output(dirpath / f"chunk-{chunk}.parquet") as temp_filepath:
+            linked.to_parquet(temp_filepath)
+
+
+def read_chunks(dirpath):
+
+    filepaths = sorted(
+        Path(dirpath).glob("chunk-*.parquet"),
+        key=lambda filepath: int(filepath.stem.split("-")[1]),
+    )
+    return gpd.GeoDataFrame(
+        pd.concat([gpd.read_parquet(filepath) for filepath in filepaths]),
+    ).reset_index(drop=True)
@@ -0,0 +1,279 @@
+from concurrent.futures import as_completed
+import gzip
+import json
+from math import pi
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import shapely
+from tqdm import tqdm
+
+from dublin_electricity_network.files import atomic_output
+from dublin_electricity_network.pool import process_pool
+from dublin_electricity_network.pool import worker_state
+from dublin_electricity_network.projection import to_crs
+from dublin_electricity_network.projection import transform_xy
+
+# half the width of the web mercator world in metres
+_ORIGIN_SHIFT = pi * 6378137
+
+
+def _tile_bounds(zoom, x, y):
+    """
+    Get the web mercator bounds of an XYZ tile.
+    """
+    size = 2 * _ORIGIN_SHIFT / 2**zoom
+    minx = x * size - _ORIGIN_SHIFT
+    maxy = _ORIGIN_SHIFT - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def _tiles_for_bounds(bounds, zoom):
+    """
+    List the XYZ tiles covering web mercator bounds at a zoom level.
+    """
+    minx, miny, maxx, maxy = bounds
+    size = 2 * _ORIGIN_SHIFT / 2**zoom
+    n_tiles = 2**zoom
+    x_start = max(int((minx + _ORIGIN_SHIFT) // size), 0)
+    x_end = min(int((maxx + _ORIGIN_SHIFT) // size), n_tiles - 1)
+    y_start = max(int((_ORIGIN_SHIFT - maxy) // size), 0)
+    y_end = min(int((_ORIGIN_SHIFT - miny) // size), n_tiles - 1)
+    return [
+        (zoom, x, y)
+        for x in range(x_start, x_end + 1)
+        for y in range(y_start, y_end + 1)
+    ]
+
+
+def _to_properties(gdf):
+    """
+    Convert the attributes of each feature to plain, non-null values.
+    """
+    records = pd.DataFrame(gdf.drop(columns=gdf.geometry.name)).to_dict("records")
+    return [
+        {
+            key: value if isinstance(value, (bool, int, float, str)) else str(value)
+            for key, value in record.items()
+            if value is not None and not (isinstance(value, float) and np.isnan(value))
+        }
+        for record in records
+    ]
+
+
+def _get_field_types(gdf):
+
+    fields = {}
+    for column, dtype in gdf.drop(columns=gdf.geometry.name).dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            fields[column] = "Boolean"
+        elif pd.api.types.is_numeric_dtype(dtype):
+            fields[column] = "Number"
+        else:
+            fields[column] = "String"
+    return fields
+
+
+def _simplify_layers(layers, zoom, extent):
+    """
+    Simplify each layer to the resolution of a tile at a zoom level.
+
+    Detail finer than one unit of the tile grid, `extent` units per tile, is
+    lost when the tile is encoded anyway, so dropping it first keeps the low
+    zoom tiles small & quick to encode.
+    """
+    tolerance = 2 * _ORIGIN_SHIFT / 2**zoom / extent
+    zoom_layers = []
+    for name, geometries, properties in layers:
+        simplified = shapely.simplify(geometries, tolerance, preserve_topology=True)
+        keep = ~shapely.is_empty(simplified)
+        zoom_layers.append(
+            (
+                name,
+                simplified[keep],
+                [p for p, k in zip(properties, keep.tolist()) if k],
+            )
+        )
+    return zoom_layers
+
+
+def _build_tile_indexes(layers):
+
+    # build the spatial indexes once per worker rather than once per tile
+    return {
+        zoom: [
+            (name, geometries, properties, shapely.STRtree(geometries))
+            for name, geometries, properties in zoom_layers
+        ]
+        for zoom, zoom_layers in layers.items()
+    }
+
+
+def _encode_tile(zoom, x, y, extent, buffer):
+
+    import mapbox_vector_tile
+
+    minx, miny, maxx, maxy = _tile_bounds(zoom, x, y)
+    margin = (maxx - minx) * buffer / extent
+    clip_bounds = (minx - margin, miny - margin, maxx + margin, maxy + margin)
+    scale = extent / (maxx - minx)
+
+    tile_layers = []
+    for name, geometries, properties, tree in worker_state()[zoom]:
+        ids = tree.query(shapely.box(*clip_bounds))
+        if len(ids) == 0:
+            continue
+        ids.sort()
+        clipped = shapely.clip_by_rect(geometries[ids], *clip_bounds)
+        # snap to the tile grid in one vectorised pass rather than letting
+        # the encoder round each vertex in python
+        quantised = shapely.transform(
+            clipped, lambda xy: np.round((xy - (minx, miny)) * scale)
+        )
+        features = [
+            {"geometry": geometry, "properties": properties[i]}
+            for i, geometry in zip(ids.tolist(), quantised)
+            if not geometry.is_empty
+        ]
+        if features:
+            tile_layers.append({"name": name, "features": features})
+    if not tile_layers:
+        return None
+
+    tile = mapbox_vector_tile.encode(tile_layers, default_options={"extents": extent})
+    return gzip.compress(tile)
+
+
+def _encode_tiles(tiles, extent, buffer):
+
+    return [(tile, _encode_tile(*tile, extent, buffer)) for tile in tiles]
+
+
+def write_mbtiles(
+    layers,
+    filepath,
+    min_zoom=8,
+    max_zoom=16,
+    extent=4096,
+    buffer=64,
+    chunksize=64,
+    n_workers=None,
+    name="dublin-electricity-network",
+):
+    """
+    Export layers as Mapbox Vector Tiles to an MBTiles file.
+
+    Every layer is reprojected to web mercator once & simplified once per
+    zoom level, then tiles are clipped & encoded in chunks of `chunksize` on
+    a process pool.  The file can be browsed with any MBTiles viewer, e.g.
+    QGIS or `tileserver-gl-light`.
+
+    Parameters
+    ----------
+    layers : dict of str to geopandas.GeoDataFrame
+        e.g. {"network": mv_network_lines, "stations": stations,
+        "small_areas": small_areas_linked_to_stations}, with their crs set
+    filepath : str or pathlib.Path
+        e.g. data_dir / "dublin-electricity-network.mbtiles"
+    min_zoom, max_zoom : int
+        Range of zoom levels to export
+    extent : int
+        Size of the tile grid, geometries are simplified to this resolution
+    buffer : int
+        Clip geometries this many grid units beyond each tile so lines are
+        not cut at tile edges
+    chunksize : int
+        Number of tiles encoded per task
+    n_workers : int, optional
+        Number of processes, by default one per CPU
+    name : str
+        Name of the tileset
+    """
+    web_mercator_layers = []
+    vector_layers = []
+    for layer_name, gdf in layers.items():
+        gdf = to_crs(gdf[gdf.geometry.notna()], "epsg:3857")
+        web_mercator_layers.append(
+            (layer_name, gdf.geometry.to_numpy(), _to_properties(gdf))
+        )
+        vector_layers.append(
+            {
+                "id": layer_name,
+                "fields": _get_field_types(gdf),
+                "minzoom": min_zoom,
+                "maxzoom": max_zoom,
+            }
+        )
+
+    bounds = shapely.total_bounds(
+        np.concatenate([geometries for _, geometries, _ in web_mercator_layers])
+    )
+    zoom_layers = {
+        zoom: _simplify_layers(web_mercator_layers, zoom, extent)
+        for zoom in range(min_zoom, max_zoom + 1)
+    }
+    tiles = [
+        tile
+        for zoom in range(min_zoom, max_zoom + 1)
+        for tile in _tiles_for_bounds(bounds, zoom)
+    ]
+    chunks = [
+        tiles[start : start + chunksize] for start in range(0, len(tiles), chunksize)
+    ]
+
+    with atomic_output(filepath) as temp_filepath:
+        connection = sqlite3.connect(temp_filepath)
+        try:
+            connection.execute("CREATE TABLE metadata (name text, value text)")
+            connection.execute(
+                "CREATE TABLE tiles"
+                " (zoom_level integer, tile_column integer, tile_row integer,"
+                " tile_data blob)"
+            )
+
+            # the layers are shipped to each worker once rather than once per task
+            with process_pool(
+                _build_tile_indexes, zoom_layers, n_workers=n_workers
+            ) as executor:
+                futures = [
+                    executor.submit(_encode_tiles, chunk, extent, buffer)
+                    for chunk in chunks
+                ]
+                for future in tqdm(as_completed(futures), total=len(futures)):
+                    # MBTiles numbers rows from the bottom (TMS) not the top (XYZ)
+                    connection.executemany(
+                        "INSERT INTO tiles VALUES (?, ?, ?, ?)",
+                        [
+                            (zoom, x, 2**zoom - 1 - y, tile_data)
+                            for (zoom, x, y), tile_data in future.result()
+                            if tile_data is not None
+                        ],
+                    )
+
+            connection.execute(
+                "CREATE UNIQUE INDEX tile_index ON tiles"
+                " (zoom_level, tile_column, tile_row)"
+            )
+            lon, lat = transform_xy(
+                bounds[[0, 2]], bounds[[1, 3]], "epsg:3857", "epsg:4326"
+            )
+            connection.executemany(
+                "INSERT INTO metadata VALUES (?, ?)",
+                [
+                    ("name", name),
+                    ("format", "pbf"),
+                    ("type", "overlay"),
+                    ("bounds", f"{lon[0]:.6f},{lat[0]:.6f},{lon[1]:.6f},{lat[1]:.6f}"),
+                    (
+                        "center",
+                        f"{lon.mean():.6f},{lat.mean():.6f},{(min_zoom + max_zoom) // 2}",
+                    ),
+                    ("minzoom", str(min_zoom)),
+                    ("maxzoom", str(max_zoom)),
+                    ("json", json.dumps({"vector_layers": vector_layers})),
+                ],
+            )
+            connection.commit()
+        finally:
+            connection.close()
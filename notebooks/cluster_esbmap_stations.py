@@ -9,6 +9,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 
 from dublin_electricity_network.cluster import cluster_itm_coords
+from dublin_electricity_network.cluster import sweep_cluster_params
 
 sns.set()
 data_dir = Path("../data")
@@ -63,6 +64,21 @@ coords = (
     .to_numpy()
 )
 
+# %% [markdown]
+# # Sweep clustering parameters
+
+# %%
+cluster_sweep = sweep_cluster_params(
+    coords,
+    [{"how": "knearest", "n_clusters": n} for n in range(2, 31)]
+    + [
+        {"how": "dbscan", "max_km_distance_between_points": d}
+        for d in range(500, 5001, 250)
+    ],
+    capacities=esbmap_stations_dublin["demand_available_mva"],
+)
+cluster_sweep.results
+
 # %% [markdown]
 # # Cluster Substations via DBSCAN
 
@@ -73,9 +89,8 @@ keep_columns = esbmap_capacity_columns + ["cluster_id", "geometry"]
 esbmap_stations_clustered = cluster_itm_coords(
     esbmap_stations_dublin,
     coords,
-    how="knearest",
-    n_clusters=10,
     keep_columns=keep_columns,
+    **cluster_sweep.best,
 )
 
 # %%
@@ -50,10 +50,7 @@ cad_stations_linked_to_map.to_file(
 
 # %%
 cad_stations_linked_to_heatmap_lat_long = (
-    cad_stations_linked_to_map.assign(
-        Latitude=lambda gdf: gdf.to_crs(epsg=4326).geometry.y,
-        Longitude=lambda gdf: gdf.to_crs(epsg=4326).geometry.x,
-    )
+    den.with_lat_long(cad_stations_linked_to_map)
     .loc[:, ["station_name", "Latitude", "Longitude"]]
     .sort_values(["Latitude", "Longitude"])
 )
@@ -7,10 +7,11 @@
 from pathlib import Path
 
 import geopandas as gpd
-from osmnx.geometries import geometries_from_polygon
 import seaborn as sns
 from string_grouper import match_strings, match_most_similar
 
+import dublin_electricity_network as den
+
 sns.set()
 data_dir = Path("../data")
 
@@ -30,11 +31,13 @@ dublin_polygon = dublin_boundary.geometry.item()
 
 # %% [markdown]
 # # Get OSM substations within Dublin Boundary
-osm_substations = geometries_from_polygon(dublin_polygon, tags={"substation": True})
-
-# %%
-osm_substation_points = osm_substations.assign(
-    geometry=lambda gdf: gdf.geometry.centroid
+# ... cached in data/osm so reruns are offline, pass `date` to pin the query,
+# `refresh=True` to pick up the latest OSM edits or `pbf_filepath` to read a
+# local extract instead of querying Overpass
+osm_substation_points = den.get_osm_points(
+    dublin_polygon,
+    tags={"substation": True},
+    cache_dirpath=data_dir / "osm",
 )
 # %% [markdown]
 # # Standardise Station Names
@@ -72,17 +75,12 @@ osm_substations_linked_to_heatmap = osm_substation_points.query(
 # # Save
 # ... can view result in QGIS to view comparison vs Heat Map Station Locations
 
-osm_substations_linked_to_heatmap.drop(columns="nodes").to_file(
+osm_substations_linked_to_heatmap.to_file(
     data_dir / "osm_substations_linked_to_heatmap.geojson",
     driver="GeoJSON",
 )
 
 # %%
-osm_substations.drop(columns="nodes").to_file(
-    data_dir / "osm_substation.geojson", driver="GeoJSON"
-)
-
-# %%
-osm_substation_points.drop(columns="nodes").to_file(
+osm_substation_points.to_file(
     data_dir / "osm_substation_points.geojson", driver="GeoJSON"
 )
@@ -123,9 +123,7 @@ G = momepy.gdf_to_nx(mv_network_lines, approach="primal")
 G_largest = den.get_largest_subgraph(G)
 
 # %%
-G_largest_nodes, G_largest_edges, G_largest_sw = momepy.nx_to_gdf(
-    G_largest, points=True, lines=True, spatial_weights=True
-)
+G_largest_nodes, G_largest_edges = den.to_gdfs(den.from_networkx(G_largest))
 
 # %%
 G_largest_edges_buffered = (
@@ -201,28 +199,18 @@ small_areas_linked_to_stations_via_network = den.extract_nearest_dest(
 
 
 # %%
-small_areas_remaining_centroids = gpd.GeoDataFrame(
-    small_areas.merge(small_areas_near_g_largest, how="left", indicator=True)
-    .query("`_merge` == 'left_only'")
-    .drop(columns="_merge")
-    .assign(geometry=lambda gdf: gdf.geometry.centroid)
-)
-
-# %%
-small_areas_linked_to_stations_via_nearest = (
-    den.join_nearest_points(small_areas_remaining_centroids, hv_stations_dublin)
-    .drop(columns=["geometry", "COUNTYNAME"])
-    .merge(small_areas)
-    .drop_duplicates(subset="SMALL_AREA")
+small_areas_linked_to_stations = den.link_remaining_to_nearest(
+    small_areas,
+    small_areas_linked_to_stations_via_network,
+    hv_stations_dublin,
 )
 
 # %%
-small_areas_linked_to_stations = pd.concat(
-    [
-        small_areas_linked_to_stations_via_network,
-        small_areas_linked_to_stations_via_nearest,
-    ]
-).drop_duplicates(subset="SMALL_AREA")
+small_areas_linked_to_stations_via_nearest = small_areas_linked_to_stations[
+    ~small_areas_linked_to_stations["SMALL_AREA"].isin(
+        small_areas_linked_to_stations_via_network["SMALL_AREA"]
+    )
+]
 
 # %%
 if show_plots:
@@ -306,3 +294,22 @@ small_areas_linked_to_stations.to_file(
     data_dir / "small-areas-linked-to-map-stations.geojson",
     driver="GeoJSON",
 )
+
+# %%
+station_catchments = den.get_station_catchments(
+    small_areas_linked_to_stations, coverage=True, cache_dirpath=data_dir
+)
+station_catchments.to_file(
+    data_dir / "station-catchments.geojson",
+    driver="GeoJSON",
+)
+
+# %%
+den.write_mbtiles(
+    {
+        "network": mv_network_lines,
+        "stations": hv_stations_dublin,
+        "small_areas": small_areas_linked_to_stations,
+    },
+    data_dir / "dublin-electricity-network.mbtiles",
+)
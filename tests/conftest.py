@@ -0,0 +1,79 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+
+from dublin_electricity_network.graph import make_network_graph
+
+
+def make_grid(n, spacing=10.0, origin=(0.0, 0.0)):
+    """
+    Create an n x n grid graph with straight edges `spacing` metres long.
+    """
+    ii, jj = np.meshgrid(np.arange(n), np.arange(n), indexing="ij")
+    node_xy = np.column_stack([ii.ravel(), jj.ravel()]) * spacing + origin
+    ids = np.arange(n * n).reshape(n, n)
+    edge_u = np.concatenate([ids[:-1].ravel(), ids[:, :-1].ravel()])
+    edge_v = np.concatenate([ids[1:].ravel(), ids[:, 1:].ravel()])
+    edge_offsets = np.arange(0, 2 * len(edge_u) + 1, 2)
+    edge_xy = np.column_stack([node_xy[edge_u], node_xy[edge_v]]).reshape(-1, 2)
+    return make_network_graph(
+        node_xy,
+        edge_u,
+        edge_v,
+        np.full(len(edge_u), spacing),
+        edge_offsets,
+        edge_xy,
+    )
+
+
+def merge_graphs(*graphs):
+    """
+    Combine graphs into one graph with a component per input graph.
+    """
+    node_offsets = np.cumsum([0] + [len(g.node_xy) for g in graphs])
+    vertex_offsets = np.cumsum([0] + [len(g.edge_xy) for g in graphs])
+    return make_network_graph(
+        np.concatenate([g.node_xy for g in graphs]),
+        np.concatenate([g.edge_u + o for g, o in zip(graphs, node_offsets)]),
+        np.concatenate([g.edge_v + o for g, o in zip(graphs, node_offsets)]),
+        np.concatenate([g.edge_length for g in graphs]),
+        np.concatenate(
+            [[0]] + [g.edge_offsets[1:] + o for g, o in zip(graphs, vertex_offsets)]
+        ),
+        np.concatenate([g.edge_xy for g in graphs]),
+    )
+
+
+def make_points(xy, crs="epsg:2157"):
+
+    xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+    return gpd.GeoDataFrame(geometry=gpd.points_from_xy(xy[:, 0], xy[:, 1]), crs=crs)
+
+
+def make_lines(graph, crs="epsg:2157"):
+    """
+    Convert each edge of a graph to a straight line.
+    """
+    return gpd.GeoDataFrame(
+        geometry=shapely.linestrings(
+            np.stack([graph.node_xy[graph.edge_u], graph.node_xy[graph.edge_v]], axis=1)
+        ),
+        crs=crs,
+    )
+
+
+@pytest.fixture
+def grid_graph():
+    """
+    A connected 5 x 5 grid, 40m across.
+    """
+    return make_grid(5)
+
+
+@pytest.fixture
+def disconnected_graph():
+    """
+    A 5 x 5 grid (nodes 0-24) & an isolated 3 x 3 grid (nodes 25-33) 1km away.
+    """
+    return merge_graphs(make_grid(5), make_grid(3, origin=(1000.0, 0.0)))
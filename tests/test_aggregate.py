@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dublin_electricity_network.aggregate import aggregate_to_stations
+from dublin_electricity_network.aggregate import build_incidence
+
+
+@pytest.fixture
+def linked():
+    # area "c" is split between two stations by a capacitated assignment
+    return pd.DataFrame(
+        {
+            "SMALL_AREA": ["a", "b", "c", "c"],
+            "station_name": ["west", "east", "west", "east"],
+            "share": [1.0, 1.0, 0.25, 0.75],
+        }
+    )
+
+
+def test_aggregate_attributes_match_groupby(linked):
+
+    population = pd.DataFrame(
+        {"population": [100, 200, 400, 800], "households": [1, 2, 4, 8]},
+        index=["a", "b", "c", "d"],
+    )
+
+    incidence = build_incidence(linked, share_column="share")
+    totals = aggregate_to_stations(incidence, population)
+
+    expected = (
+        linked.join(population, on="SMALL_AREA")
+        .assign(
+            population=lambda df: df["population"] * df["share"],
+            households=lambda df: df["households"] * df["share"],
+        )
+        .groupby("station_name")[["population", "households"]]
+        .sum()
+    )
+    pd.testing.assert_frame_equal(totals, expected, check_names=False)
+    assert aggregate_to_stations(incidence, population["population"]).tolist() == [
+        500,
+        200,
+    ]
+
+
+def test_aggregate_profiles(linked):
+
+    incidence = build_incidence(linked, areas=["c", "b", "a"])
+    profiles = np.arange(12, dtype=np.float32).reshape(3, 4)
+
+    station_profiles = aggregate_to_stations(incidence, profiles)
+
+    assert incidence.stations.tolist() == ["east", "west"]
+    assert station_profiles.dtype == np.float32
+    np.testing.assert_array_equal(
+        station_profiles, [profiles[0] + profiles[1], profiles[0] + profiles[2]]
+    )
+    with pytest.raises(ValueError):
+        aggregate_to_stations(incidence, profiles[:2])
+
+
+def test_build_incidence_unknown_area(linked):
+
+    with pytest.raises(ValueError, match="2 linked areas"):
+        build_incidence(linked, areas=["a", "b"])
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from conftest import make_grid
+from conftest import make_lines
+from dublin_electricity_network import assemble
+from dublin_electricity_network.graph import from_lines
+
+
+@pytest.fixture
+def tile_dirpath(tmp_path, monkeypatch):
+    """
+    Tile tables of a 5 x 5 grid split into two tiles which share the x=20 edges.
+    """
+    lines = make_lines(make_grid(5))
+    bounds = lines.bounds
+    tiles = {
+        "west.dgn": lines[bounds["maxx"] <= 20],
+        "east.dgn": lines[bounds["minx"] >= 20],
+    }
+    monkeypatch.setattr(
+        assemble, "read_network", lambda filepaths, levels: tiles[filepaths[0]]
+    )
+    dirpath = tmp_path / "tiles"
+    assemble.write_tile_tables(list(tiles), dirpath)
+    return dirpath
+
+
+def _edge_set(graph):
+    return {
+        tuple(sorted([tuple(graph.node_xy[u]), tuple(graph.node_xy[v])]))
+        for u, v in zip(graph.edge_u, graph.edge_v)
+    }
+
+
+def test_assemble_network_merges_tiles(tile_dirpath):
+
+    graph = assemble.assemble_network(tile_dirpath, include_geometry=True)
+
+    expected = from_lines(make_lines(make_grid(5)))
+    assert sorted(p.name for p in tile_dirpath.iterdir()) == ["east.npz", "west.npz"]
+    assert graph.n_nodes == 25
+    assert graph.n_edges == 40
+    assert _edge_set(graph) == _edge_set(expected)
+    assert len(graph.edge_xy) == 80
+    np.testing.assert_array_equal(np.diff(graph.edge_offsets), 2)
+
+
+def test_assemble_network_quantised(tile_dirpath):
+
+    graph = assemble.assemble_network(tile_dirpath, quantise=True)
+
+    assert np.issubdtype(graph.node_xy.dtype, np.integer)
+    assert graph.resolution == 0.01
+    assert graph.node_xy.max() == 4000
+
+
+def test_assemble_network_skips_written_tiles(tile_dirpath, monkeypatch):
+
+    monkeypatch.setattr(assemble, "read_network", None)
+
+    assemble.write_tile_tables(["west.dgn", "east.dgn"], tile_dirpath)
+
+
+@pytest.mark.parametrize("temp_tile", [False, True])
+def test_assemble_network_without_tiles(tmp_path, temp_tile):
+
+    if temp_tile:
+        (tmp_path / "west.npz.tmp").touch()
+
+    with pytest.raises(FileNotFoundError, match="No tile tables"):
+        assemble.assemble_network(tmp_path)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_points
+from dublin_electricity_network.assign import assign_stations_with_capacity
+from dublin_electricity_network.assign import solve_capacitated_assignment
+
+
+def _candidates(rows):
+    return pd.DataFrame(rows, columns=["origin", "station", "distance"])
+
+
+def test_overflow_beyond_capacity():
+
+    candidates = _candidates([[0, 0, 10.0], [1, 0, 20.0]])
+
+    allocations, overflow = solve_capacitated_assignment(
+        candidates, demand=[50, 30], capacity=[20]
+    )
+
+    # the nearer origin fills the station & everything else overflows
+    assert allocations[["origin", "station"]].values.tolist() == [[0, 0]]
+    assert allocations["demand"].tolist() == pytest.approx([20])
+    assert overflow["origin"].tolist() == [0, 1]
+    assert overflow["demand"].tolist() == pytest.approx([30, 30])
+    assert overflow["demand"].sum() == pytest.approx(60)
+
+
+def test_spills_over_to_next_nearest():
+
+    candidates = _candidates([[0, 0, 1.0], [0, 1, 5.0]])
+
+    allocations, overflow = solve_capacitated_assignment(
+        candidates, demand=[30], capacity=[20, 100]
+    )
+
+    assert allocations["station"].tolist() == [0, 1]
+    assert allocations["demand"].tolist() == pytest.approx([20, 10])
+    assert allocations["share"].tolist() == pytest.approx([2 / 3, 1 / 3])
+    assert overflow.empty
+
+
+@pytest.mark.parametrize(
+    "demand, capacity",
+    [([np.nan], [10]), ([10], [np.nan]), ([-1], [10]), ([10], [np.inf])],
+)
+def test_rejects_invalid_values(demand, capacity):
+
+    with pytest.raises(ValueError):
+        solve_capacitated_assignment(
+            _candidates([[0, 0, 1.0]]), demand=demand, capacity=capacity
+        )
+
+
+def test_assign_respects_capacity(grid_graph):
+
+    rng = np.random.default_rng(0)
+    origins = make_points(rng.uniform(0, 40, (30, 2)))
+    origins["demand"] = rng.uniform(1, 5, 30)
+    stations = make_points([[0, 0], [40, 40], [0, 40]])
+    capacity = np.array([10.0, 20.0, 15.0])
+
+    allocations, overflow = assign_stations_with_capacity(
+        grid_graph, origins, stations, "demand", capacity, k=3
+    )
+
+    served = allocations.groupby("station")["demand"].sum()
+    assert np.all(served.to_numpy() <= capacity[served.index] + 1e-6)
+    assert served.sum() == pytest.approx(min(capacity.sum(), origins.demand.sum()))
+    total = pd.concat([allocations, overflow]).groupby("origin")["demand"].sum()
+    np.testing.assert_allclose(total.sort_index(), origins["demand"])
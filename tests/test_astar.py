@@ -0,0 +1,162 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+from scipy.sparse.csgraph import dijkstra
+
+from conftest import make_grid
+from conftest import make_points
+from conftest import merge_graphs
+from dublin_electricity_network.astar import get_shortest_paths
+from dublin_electricity_network.astar import read_landmarks
+from dublin_electricity_network.astar import select_landmarks
+from dublin_electricity_network.astar import write_landmarks
+from dublin_electricity_network.graph import from_networkx
+from dublin_electricity_network.graph import make_network_graph
+from dublin_electricity_network.graph import to_csr_matrix
+
+
+def _with_random_lengths(graph, resolution=None):
+    # never shorter than the straight line so the heuristic stays admissible
+    rng = np.random.default_rng(0)
+    return make_network_graph(
+        graph.node_xy,
+        graph.edge_u,
+        graph.edge_v,
+        rng.uniform(10, 20, graph.n_edges),
+        graph.edge_offsets,
+        graph.edge_xy,
+        resolution=resolution,
+    )
+
+
+@pytest.fixture(params=[None, 0.01], ids=["float", "quantised"])
+def graph(request):
+    return _with_random_lengths(
+        merge_graphs(make_grid(15), make_grid(3, origin=(1000.0, 0.0))),
+        resolution=request.param,
+    )
+
+
+@pytest.fixture
+def pairs():
+    rng = np.random.default_rng(1)
+    return make_points(rng.uniform(0, 140, (30, 2))), make_points(
+        rng.uniform(0, 140, (30, 2))
+    )
+
+
+@pytest.mark.parametrize("use_landmarks", [False, True])
+def test_shortest_paths_match_dijkstra(graph, pairs, use_landmarks):
+
+    origins, dests = pairs
+    landmarks = select_landmarks(graph, n_landmarks=4) if use_landmarks else None
+
+    paths = get_shortest_paths(graph, origins, dests, landmarks=landmarks)
+
+    distances = dijkstra(to_csr_matrix(graph))
+    orig_nodes = _snap(origins)
+    dest_nodes = _snap(dests)
+    assert paths.columns.tolist() == ["network_distance", "n_settled", "geometry"]
+    np.testing.assert_allclose(
+        paths["network_distance"], distances[orig_nodes, dest_nodes]
+    )
+    for path, orig, dest in zip(paths.geometry, orig_nodes, dest_nodes):
+        if orig == dest:
+            assert path is None
+        else:
+            assert path.coords[0] == tuple(_node_xy(orig))
+            assert path.coords[-1] == tuple(_node_xy(dest))
+
+
+def test_landmarks_settle_fewer_nodes(graph, pairs):
+
+    origins, dests = pairs
+
+    plain = get_shortest_paths(graph, origins, dests)
+    alt = get_shortest_paths(graph, origins, dests, select_landmarks(graph, 8))
+
+    assert alt["n_settled"].sum() < plain["n_settled"].sum()
+
+
+@pytest.mark.parametrize("use_landmarks", [False, True])
+def test_unreachable_pairs(graph, use_landmarks):
+
+    landmarks = select_landmarks(graph, n_landmarks=4) if use_landmarks else None
+    origins = make_points([[0, 0], [1000, 0]])
+    dests = make_points([[1020, 20], [1020, 20]])
+
+    paths = get_shortest_paths(graph, origins, dests, landmarks=landmarks)
+
+    assert paths["network_distance"][0] == np.inf
+    assert paths.geometry[0] is None
+    assert np.isfinite(paths["network_distance"][1])
+
+
+def test_unpaired_points(graph):
+
+    with pytest.raises(ValueError):
+        get_shortest_paths(graph, make_points([[0, 0]]), make_points([]))
+
+
+def test_landmarks_roundtrip(graph, tmp_path):
+
+    landmarks = select_landmarks(graph, n_landmarks=3)
+
+    write_landmarks(landmarks, tmp_path)
+    loaded = read_landmarks(tmp_path)
+
+    assert len(landmarks.nodes) == 3
+    # only the component of node 0 is covered
+    assert np.all(np.isinf(landmarks.distances[225:]))
+    np.testing.assert_array_equal(loaded.nodes, landmarks.nodes)
+    np.testing.assert_array_equal(loaded.distances, landmarks.distances)
+    with pytest.raises(FileNotFoundError):
+        read_landmarks(tmp_path / "missing")
+
+
+def _snap(points):
+    # points are snapped to the nearest 10m grid node
+    xy = np.round(np.column_stack([points.geometry.x, points.geometry.y]) / 10)
+    return (xy[:, 0] * 15 + xy[:, 1]).astype(np.int64)
+
+
+def _node_xy(node):
+    return np.array(divmod(node, 15), dtype=np.float64) * 10
+
+
+@pytest.mark.parametrize("resolution", [None, 0.01])
+def test_path_geometry_of_momepy_graph(resolution):
+
+    momepy = pytest.importorskip("momepy")
+    # the second line is added with its ends the other way round to its
+    # geometry, as (10, 0) is already a node
+    lines = gpd.GeoDataFrame(
+        geometry=[
+            shapely.LineString([(10, 0), (15, 5), (20, 0)]),
+            shapely.LineString([(0, 0), (5, 5), (10, 0)]),
+        ],
+        crs="epsg:2157",
+    )
+    graph = from_networkx(
+        momepy.gdf_to_nx(lines, approach="primal"), resolution=resolution
+    )
+
+    paths = get_shortest_paths(
+        graph, make_points([[0, 0], [20, 0]]), make_points([[20, 0], [0, 0]])
+    )
+
+    assert paths.geometry.iloc[0].coords[:] == [
+        (0, 0),
+        (5, 5),
+        (10, 0),
+        (15, 5),
+        (20, 0),
+    ]
+    assert paths.geometry.iloc[1].coords[:] == [
+        (20, 0),
+        (15, 5),
+        (10, 0),
+        (5, 5),
+        (0, 0),
+    ]
@@ -0,0 +1,85 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+
+from conftest import make_points
+from dublin_electricity_network import catchments
+
+
+@pytest.fixture
+def linked():
+    # a 4 x 4 coverage of 10m squares split between two stations down x=20
+    x, y = np.meshgrid(np.arange(0, 40, 10), np.arange(0, 40, 10))
+    return gpd.GeoDataFrame(
+        {"station_name": np.where(x.ravel() < 20, "west", "east")},
+        geometry=shapely.box(x.ravel(), y.ravel(), x.ravel() + 10, y.ravel() + 10),
+        crs="epsg:2157",
+    )
+
+
+@pytest.mark.parametrize("coverage", [False, True])
+def test_get_station_catchments(linked, coverage):
+
+    result = catchments.get_station_catchments(linked, chunksize=3, coverage=coverage)
+
+    assert result["station_name"].tolist() == ["east", "west"]
+    assert result["n_areas"].tolist() == [8, 8]
+    assert result.geometry[0].normalize().equals(shapely.box(20, 0, 40, 40))
+    assert result.geometry[1].normalize().equals(shapely.box(0, 0, 20, 40))
+    assert result.crs == linked.crs
+
+
+def test_catchments_cache(linked, tmp_path, monkeypatch):
+
+    pytest.importorskip("pyarrow")
+    union_by_group = catchments._union_by_group
+    calls = []
+
+    def count_unions(*args, **kwargs):
+        calls.append(kwargs["coverage"])
+        return union_by_group(*args, **kwargs)
+
+    monkeypatch.setattr(catchments, "_union_by_group", count_unions)
+
+    first = catchments.get_station_catchments(linked, cache_dirpath=tmp_path)
+    cached = catchments.get_station_catchments(linked, cache_dirpath=tmp_path)
+    catchments.get_station_catchments(linked, coverage=True, cache_dirpath=tmp_path)
+    reassigned = linked.assign(station_name="west")
+    catchments.get_station_catchments(reassigned, cache_dirpath=tmp_path)
+    renamed = linked.rename(columns={"station_name": "station"})
+    by_station = catchments.get_station_catchments(
+        renamed, station_column="station", cache_dirpath=tmp_path
+    )
+
+    assert calls == [False, True, False, False]
+    assert len(list(tmp_path.glob("catchments-*.parquet"))) == 4
+    assert cached.equals(first)
+    assert "station" in by_station
+
+
+def test_network_voronoi_with_isolated_component(disconnected_graph):
+
+    stations = make_points([[0, 0], [40, 40]])
+    stations["station_name"] = ["west", "east"]
+
+    voronoi = catchments.get_network_voronoi(
+        disconnected_graph, stations, station_column="station_name"
+    )
+
+    # the 12 edges of the isolated component are served by neither station
+    assert voronoi["station_name"].tolist() == ["west", "east"]
+    assert voronoi["length"].sum() == 400
+    assert voronoi.geometry.length.sum() == 400
+    assert voronoi.total_bounds.tolist() == [0, 0, 40, 40]
+
+
+def test_network_voronoi_buffered(disconnected_graph):
+
+    stations = make_points([[0, 0]])
+
+    voronoi = catchments.get_network_voronoi(disconnected_graph, stations, buffer=5)
+
+    assert voronoi["station"].tolist() == [0]
+    assert voronoi.geometry[0].geom_type == "Polygon"
+    assert voronoi.total_bounds.tolist() == pytest.approx([-5, -5, 45, 45])
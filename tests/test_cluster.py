@@ -0,0 +1,149 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.spatial.distance import pdist
+from sklearn.cluster import DBSCAN
+
+from dublin_electricity_network.cluster import _get_cluster_labels
+from dublin_electricity_network.cluster import _max_intra_cluster_distance
+from dublin_electricity_network.cluster import cluster_itm_coords
+from dublin_electricity_network.cluster import sweep_cluster_params
+
+
+@pytest.fixture
+def stations():
+    rng = np.random.default_rng(0)
+    centres = np.array([[700000, 730000], [710000, 735000], [720000, 740000]])
+    coords = np.concatenate([rng.normal(c, 300, (40, 2)) for c in centres])
+    return gpd.GeoDataFrame(
+        {
+            "station_name": [f"station {i}" for i in range(len(coords))],
+            "demand_available_mva": rng.uniform(0, 10, len(coords)),
+            "installed_capacity_mva": rng.uniform(10, 20, len(coords)),
+        },
+        geometry=gpd.points_from_xy(coords[:, 0], coords[:, 1]),
+        crs="epsg:2157",
+    )
+
+
+def _same_partition(labels, other_labels):
+    pairs = pd.DataFrame({"a": labels, "b": other_labels}).drop_duplicates()
+    return pairs["a"].is_unique and pairs["b"].is_unique
+
+
+@pytest.mark.parametrize("eps", [200, 1000, 5000])
+def test_dbscan_components_match_sklearn(stations, eps):
+
+    coords = np.column_stack([stations.geometry.x, stations.geometry.y])
+
+    labels = _get_cluster_labels(
+        coords, how="dbscan", max_km_distance_between_points=eps
+    )
+
+    expected = DBSCAN(eps=eps, min_samples=1).fit_predict(coords)
+    assert _same_partition(labels, expected)
+
+
+def test_dbscan_keeps_noise_as_single_point_clusters():
+
+    coords = np.array([[0, 0], [1, 0], [2, 0], [100, 0]], dtype=np.float64)
+
+    labels = _get_cluster_labels(
+        coords, how="dbscan", max_km_distance_between_points=1.5, min_samples=3
+    )
+
+    assert labels.tolist() == [0, 0, 0, 1]
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"how": "knearest", "n_clusters": 3},
+        {"how": "dbscan", "max_km_distance_between_points": 2500},
+    ],
+)
+def test_cluster_itm_coords_matches_groupby(stations, params):
+
+    coords = np.column_stack([stations.geometry.x, stations.geometry.y])
+    keep_columns = ["cluster_id", "demand_available_mva", "geometry"]
+
+    clusters = cluster_itm_coords(stations, coords, keep_columns, **params)
+
+    assert clusters.columns.tolist() == keep_columns
+    assert len(clusters) == 3
+    assert clusters.crs == stations.crs
+    # every cluster is located at the mean of its members & sums their values
+    labelled = stations.assign(
+        x=coords[:, 0],
+        y=coords[:, 1],
+        cluster_id=clusters.sindex.nearest(stations.geometry)[1],
+    )
+    expected = labelled.groupby("cluster_id").agg(
+        x=("x", "mean"), y=("y", "mean"), demand=("demand_available_mva", "sum")
+    )
+    np.testing.assert_allclose(clusters.geometry.x, expected["x"])
+    np.testing.assert_allclose(clusters.geometry.y, expected["y"])
+    np.testing.assert_allclose(clusters["demand_available_mva"], expected["demand"])
+
+
+def test_max_intra_cluster_distance_matches_pdist(stations):
+
+    coords = np.column_stack([stations.geometry.x, stations.geometry.y])
+    labels = np.arange(len(coords)) % 4
+
+    expected = max(pdist(coords[labels == label]).max() for label in range(4))
+    assert _max_intra_cluster_distance(coords, labels) == pytest.approx(expected)
+
+
+def test_sweep_cluster_params(stations):
+
+    pytest.importorskip("threadpoolctl")
+    coords = np.column_stack([stations.geometry.x, stations.geometry.y])
+    params = [{"how": "knearest", "n_clusters": n} for n in range(2, 6)] + [
+        {"how": "dbscan", "max_km_distance_between_points": 2500}
+    ]
+    capacities = stations["demand_available_mva"]
+
+    sweep = sweep_cluster_params(
+        coords, params, capacities=capacities, n_workers=1, random_state=1
+    )
+
+    assert len(sweep.results) == len(params)
+    assert sweep.results["n_clusters_found"].tolist() == [2, 3, 4, 5, 3]
+    assert sweep.best == {"how": "knearest", "n_clusters": 3, "random_state": 1}
+    # the seed reproduces the scored clusters
+    labels = _get_cluster_labels(coords, **sweep.best)
+    centroids = pd.DataFrame(coords).groupby(labels).transform("mean").to_numpy()
+    assert sweep.results["inertia"].iloc[1] == pytest.approx(
+        ((coords - centroids) ** 2).sum()
+    )
+    # the capacity of each cluster found by dbscan
+    labels = _get_cluster_labels(coords, **params[-1])
+    cluster_capacities = capacities.groupby(labels).sum()
+    assert sweep.results["capacity_cv"].iloc[-1] == pytest.approx(
+        cluster_capacities.std(ddof=0) / cluster_capacities.mean()
+    )
+    inertia_sweep = sweep_cluster_params(
+        coords, params[:4], metric="inertia", n_workers=1, random_state=1
+    )
+    assert inertia_sweep.best == {
+        "how": "knearest",
+        "n_clusters": 5,
+        "random_state": 1,
+    }
+    assert "capacity_cv" not in inertia_sweep.results
+
+
+def test_sweep_cluster_params_without_scores(stations):
+
+    pytest.importorskip("threadpoolctl")
+    coords = np.column_stack([stations.geometry.x, stations.geometry.y])
+
+    # one cluster has no silhouette
+    with pytest.raises(ValueError, match="silhouette"):
+        sweep_cluster_params(
+            coords,
+            [{"how": "dbscan", "max_km_distance_between_points": 1e6}],
+            n_workers=1,
+        )
@@ -0,0 +1,64 @@
+import networkx as nx
+import numpy as np
+
+from conftest import make_points
+from dublin_electricity_network.components import extract_components
+from dublin_electricity_network.components import label_components
+from dublin_electricity_network.components import summarise_components
+
+
+def test_label_components_ranks_largest_first(disconnected_graph):
+
+    labels = label_components(disconnected_graph)
+
+    np.testing.assert_array_equal(labels[:25], 0)
+    np.testing.assert_array_equal(labels[25:], 1)
+
+
+def test_label_components_matches_networkx(disconnected_graph):
+
+    G = nx.Graph()
+    G.add_nodes_from(range(len(disconnected_graph.node_xy)))
+    G.add_edges_from(zip(disconnected_graph.edge_u, disconnected_graph.edge_v))
+
+    np.testing.assert_array_equal(
+        label_components(G), label_components(disconnected_graph)
+    )
+
+
+def test_extract_components_keeps_largest(disconnected_graph):
+
+    largest = extract_components(disconnected_graph)
+    both = extract_components(disconnected_graph, n_largest=None, min_size=5)
+
+    assert len(largest.node_xy) == 25
+    assert len(largest.edge_u) == 40
+    assert np.all(largest.node_xy[:, 0] < 1000)
+    assert len(both.node_xy) == 34
+
+
+def test_extract_components_networkx():
+
+    G = nx.Graph([(0, 1), (1, 2), (3, 4)])
+
+    H = extract_components(G)
+
+    assert set(H.nodes) == {0, 1, 2}
+    assert set(H.edges) == {(0, 1), (1, 2)}
+
+
+def test_summarise_components(disconnected_graph):
+
+    stations = make_points([[1, 1], [39, 39], [1001, 1]])
+
+    summary = summarise_components(disconnected_graph, stations)
+
+    assert summary["n_nodes"].tolist() == [25, 9]
+    assert summary["n_edges"].tolist() == [40, 12]
+    assert summary["n_stations"].tolist() == [2, 1]
+    assert summary.loc[1, ["minx", "miny", "maxx", "maxy"]].tolist() == [
+        1000,
+        0,
+        1020,
+        20,
+    ]
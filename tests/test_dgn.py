@@ -0,0 +1,94 @@
+import warnings
+
+import geopandas as gpd
+import pytest
+import shapely
+
+from dublin_electricity_network.dgn import LINE
+from dublin_electricity_network.dgn import LINE_STRING
+from dublin_electricity_network.dgn import elements_to_gdf
+from dublin_electricity_network.dgn import read_dgn
+from dublin_electricity_network.io import read_network
+
+pyogrio = pytest.importorskip("pyogrio")
+
+
+def _write_dgn(filepath, geometries, is_3d=False):
+    # GDAL's DGN driver only writes into its single predefined layer
+    pyogrio.write_dataframe(
+        gpd.GeoDataFrame(geometry=geometries),
+        filepath,
+        driver="DGN",
+        dataset_options={"3D": "YES" if is_3d else "NO"},
+    )
+    return filepath
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning", "ignore::RuntimeWarning")
+@pytest.mark.parametrize("is_3d", [False, True])
+def test_read_dgn_matches_gdal(tmp_path, is_3d):
+
+    z = (5.0,) if is_3d else ()
+    filepath = _write_dgn(
+        tmp_path / "tile.dgn",
+        [
+            shapely.LineString([(716000.25, 734000.5) + z, (716100, 734050) + z]),
+            shapely.LineString([(0, 0) + z, (10, 5) + z, (20, 0) + z]),
+        ],
+        is_3d=is_3d,
+    )
+
+    elements = read_dgn(filepath)
+    native = elements_to_gdf(elements)
+    gdal = gpd.read_file(filepath)
+
+    assert set(elements.types.tolist()) <= {LINE, LINE_STRING}
+    assert native["Type"].tolist() == gdal["Type"].tolist()
+    assert native["Level"].tolist() == gdal["Level"].tolist()
+    # the native reader always returns 2D geometries
+    assert not shapely.has_z(native.geometry.to_numpy()).any()
+    assert shapely.equals(
+        native.geometry.to_numpy(), shapely.force_2d(gdal.geometry.to_numpy())
+    ).all()
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning", "ignore::RuntimeWarning")
+def test_read_network_engines_match(tmp_path):
+
+    filepath = _write_dgn(
+        tmp_path / "tile.dgn",
+        [
+            shapely.LineString([(200000, 240000), (200100, 240050)]),
+            shapely.LineString([(200000, 240000), (200010, 240005), (200020, 240000)]),
+        ],
+    )
+
+    native = read_network([filepath], engine="native")
+    gdal = read_network([filepath], engine="gdal")
+
+    assert native.crs == gdal.crs == "epsg:2157"
+    assert shapely.equals_exact(
+        native.geometry.to_numpy(), gdal.geometry.to_numpy(), tolerance=1e-6
+    ).all()
+
+
+@pytest.mark.filterwarnings("ignore::UserWarning:pyogrio")
+def test_read_dgn_warns_of_skipped_elements(tmp_path):
+
+    filepath = _write_dgn(
+        tmp_path / "tile.dgn",
+        [
+            shapely.LineString([(0, 0), (10, 5)]),
+            shapely.Polygon([(0, 0), (1, 0), (1, 1)]),
+            shapely.Polygon([(5, 5), (6, 5), (6, 6)]),
+        ],
+    )
+
+    with pytest.warns(UserWarning, match="Skipped 2 shape elements"):
+        elements = read_dgn(filepath)
+
+    assert elements.types.tolist() == [LINE_STRING]
+    # elements on other levels are not counted
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert len(read_dgn(filepath, levels=[10]).types) == 0
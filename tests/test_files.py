@@ -0,0 +1,31 @@
+import pytest
+
+from dublin_electricity_network.files import atomic_output
+
+
+def test_atomic_output(tmp_path):
+
+    filepath = tmp_path / "table.parquet"
+    (tmp_path / "table.parquet.tmp").write_text("left by a crash")
+
+    with atomic_output(filepath) as temp_filepath:
+        assert not temp_filepath.exists()
+        temp_filepath.write_text("new")
+        assert not filepath.exists()
+
+    assert filepath.read_text() == "new"
+    assert [p.name for p in tmp_path.iterdir()] == ["table.parquet"]
+
+
+def test_atomic_output_keeps_old_file_on_error(tmp_path):
+
+    filepath = tmp_path / "table.parquet"
+    filepath.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_output(filepath) as temp_filepath:
+            temp_filepath.write_text("half")
+            raise RuntimeError("crash")
+
+    assert filepath.read_text() == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["table.parquet"]
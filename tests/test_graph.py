@@ -0,0 +1,230 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+
+from conftest import make_grid
+from dublin_electricity_network.graph import dequantise_xy
+from dublin_electricity_network.graph import find_nodes
+from dublin_electricity_network.graph import from_lines
+from dublin_electricity_network.graph import from_networkx
+from dublin_electricity_network.graph import make_network_graph
+from dublin_electricity_network.graph import node_coordinates
+from dublin_electricity_network.graph import pack_xy_keys
+from dublin_electricity_network.graph import quantise_xy
+from dublin_electricity_network.graph import read_network_graph
+from dublin_electricity_network.graph import to_gdfs
+from dublin_electricity_network.graph import unpack_xy_keys
+from dublin_electricity_network.graph import write_network_graph
+
+
+def _assert_graphs_equal(graph, other):
+    for name in graph._fields:
+        value, other_value = getattr(graph, name), getattr(other, name)
+        if value is None or np.isscalar(value):
+            assert value == other_value, name
+        else:
+            np.testing.assert_array_equal(value, other_value, err_msg=name)
+
+
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+def test_network_graph_roundtrip(tmp_path, mmap_mode):
+
+    graph = make_grid(4)
+
+    write_network_graph(graph, tmp_path / "graph")
+    loaded = read_network_graph(tmp_path / "graph", mmap_mode=mmap_mode)
+
+    _assert_graphs_equal(graph, loaded)
+    assert isinstance(loaded.node_xy, np.memmap) == (mmap_mode is not None)
+
+
+def test_overwrite_drops_stale_arrays(tmp_path):
+
+    graph = make_grid(4)
+    bare = make_network_graph(
+        graph.node_xy[:4],
+        [0, 1, 2],
+        [1, 2, 3],
+        [1.0, 1.0, 1.0],
+        resolution=0.01,
+    )
+
+    write_network_graph(graph, tmp_path)
+    write_network_graph(bare, tmp_path)
+    loaded = read_network_graph(tmp_path)
+
+    _assert_graphs_equal(bare, loaded)
+    assert not (tmp_path / "edge_xy.npy").exists()
+    assert not (tmp_path / "edge_offsets.npy").exists()
+
+
+def test_read_missing_network_graph(tmp_path):
+
+    with pytest.raises(FileNotFoundError):
+        read_network_graph(tmp_path)
+
+
+def test_to_gdfs(grid_graph):
+
+    nodes, edges = to_gdfs(grid_graph)
+
+    assert nodes["nodeID"].tolist() == list(range(25))
+    np.testing.assert_array_equal(
+        np.column_stack([nodes.geometry.x, nodes.geometry.y]), grid_graph.node_xy
+    )
+    assert edges.columns.tolist() == ["mm_len", "node_start", "node_end", "geometry"]
+    assert edges.crs == "epsg:2157"
+    np.testing.assert_allclose(edges.length, edges["mm_len"])
+    np.testing.assert_array_equal(
+        shapely.get_coordinates(shapely.get_point(edges.geometry.values, 0)),
+        grid_graph.node_xy[edges["node_start"]],
+    )
+
+
+def test_to_gdfs_without_edge_geometry(grid_graph):
+
+    bare = grid_graph._replace(edge_offsets=None, edge_xy=None)
+
+    _, edges = to_gdfs(bare)
+    _, expected = to_gdfs(grid_graph)
+
+    assert edges.geometry.geom_equals_exact(expected.geometry, 0).all()
+
+
+def test_to_gdfs_spatial_weights(grid_graph):
+
+    pytest.importorskip("libpysal")
+
+    _, _, weights = to_gdfs(grid_graph, spatial_weights=True)
+
+    assert weights.n == 25
+    assert sorted(weights.neighbors[0]) == [1, 5]
+    assert weights.cardinalities[12] == 4
+
+
+@pytest.fixture
+def lines():
+    return gpd.GeoDataFrame(
+        geometry=[
+            shapely.LineString([(0, 0), (5, 5), (10, 0)]),
+            # ends within 1cm of the end of the first line
+            shapely.LineString([(10.001, 0.001), (20, 0)]),
+            shapely.MultiLineString([[(20, 0), (20, 10)], [(0, 0), (0, 10)]]),
+            shapely.Point(3, 3),
+            shapely.LineString(),
+        ],
+        crs="epsg:2157",
+    )
+
+
+def test_from_lines(lines):
+
+    graph = from_lines(lines)
+
+    assert graph.n_nodes == 5
+    assert graph.n_edges == 4
+    np.testing.assert_allclose(
+        graph.edge_length, [np.hypot(5, 5) * 2, 10, 10, 10], rtol=1e-3
+    )
+    # the near miss joins the first & second lines at one node
+    assert graph.edge_v[0] == graph.edge_u[1]
+    np.testing.assert_array_equal(graph.edge_offsets, [0, 3, 5, 7, 9])
+    np.testing.assert_array_equal(graph.edge_xy[:3], [[0, 0], [5, 5], [10, 0]])
+
+
+@pytest.mark.parametrize("quantise", [False, True])
+def test_from_lines_merges_endpoints_across_grid_cells(quantise):
+
+    # both ends lie 0.002 m apart but in different 0.01 m grid cells
+    lines = gpd.GeoSeries(
+        [
+            shapely.LineString([(0, 0), (10.004, 0)]),
+            shapely.LineString([(10.006, 0), (20, 0)]),
+            shapely.LineString([(30, 0), (30.02, 0)]),
+        ]
+    )
+
+    graph = from_lines(lines, tolerance=0.01, quantise=quantise)
+
+    assert graph.n_nodes == 5
+    assert graph.edge_v[0] == graph.edge_u[1]
+    # ends further apart than the tolerance stay separate
+    assert graph.edge_u[2] != graph.edge_v[2]
+
+
+def test_from_lines_matches_momepy(lines):
+
+    momepy = pytest.importorskip("momepy")
+    # momepy only joins exactly equal endpoints & takes single part lines
+    valid = gpd.GeoDataFrame(
+        geometry=[
+            lines.geometry[0],
+            shapely.LineString([(10, 0), (20, 0)]),
+            *lines.geometry[2].geoms,
+        ],
+        crs=lines.crs,
+    )
+
+    graph = from_lines(valid)
+    expected = from_networkx(momepy.gdf_to_nx(valid, approach="primal"))
+
+    assert sorted(map(tuple, graph.node_xy.tolist())) == sorted(
+        map(tuple, expected.node_xy.tolist())
+    )
+    assert sorted(graph.edge_length) == pytest.approx(sorted(expected.edge_length))
+
+
+def test_from_lines_quantised(lines):
+
+    graph = from_lines(lines, quantise=True)
+
+    assert np.issubdtype(graph.node_xy.dtype, np.integer)
+    assert graph.resolution == 0.01
+    assert sorted(map(tuple, node_coordinates(graph).tolist()))[:2] == [
+        (0, 0),
+        (0, 10),
+    ]
+
+
+def test_quantise_xy():
+
+    xy = np.array([[716000.004, 734000.006], [-0.014, 0.0]])
+
+    ixy = quantise_xy(xy)
+
+    assert ixy.dtype == np.int32
+    np.testing.assert_array_equal(ixy, [[71600000, 73400001], [-1, 0]])
+    np.testing.assert_allclose(dequantise_xy(ixy), xy, atol=0.005)
+    assert quantise_xy([[2**31, 0]], resolution=1).dtype == np.int64
+
+
+def test_xy_keys_roundtrip():
+
+    ixy = np.array([[0, 0], [1, -1], [-1, 1], [-(2**31), 2**31 - 1], [5, 5]])
+
+    keys = pack_xy_keys(ixy)
+
+    assert len(np.unique(keys)) == len(ixy)
+    np.testing.assert_array_equal(unpack_xy_keys(keys), ixy)
+
+
+@pytest.mark.parametrize("resolution", [None, 0.01])
+def test_find_nodes(resolution):
+
+    float_graph = make_grid(3)
+    graph = make_network_graph(
+        float_graph.node_xy,
+        float_graph.edge_u,
+        float_graph.edge_v,
+        float_graph.edge_length,
+        resolution=resolution,
+    )
+    # noise below the resolution must still match
+    points = float_graph.node_xy[[4, 8, 0]] + [[0.001, -0.001], [0, 0], [0, 0.002]]
+    points = np.vstack([points, [[5.0, 5.0]]])
+
+    np.testing.assert_array_equal(find_nodes(graph, points), [4, 8, 0, -1])
+    np.testing.assert_allclose(
+        node_coordinates(graph, [4, 8]), float_graph.node_xy[[4, 8]]
+    )
@@ -0,0 +1,68 @@
+from importlib import import_module
+import inspect
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+import dublin_electricity_network as den
+
+# command line entry points which are run with `python -m` not imported
+_ENTRY_POINTS = {"main"}
+
+_submodules = sorted(
+    filepath.stem
+    for filepath in Path(den.__file__).parent.glob("*.py")
+    if not filepath.stem.startswith("_")
+)
+
+
+def test_every_submodule_is_registered():
+
+    assert sorted(den._submodule_attrs) == _submodules
+
+
+@pytest.mark.parametrize("name", _submodules)
+def test_public_functions_are_exported(name):
+
+    submodule = import_module(f"{den.__name__}.{name}")
+    public = {
+        attr
+        for attr, value in vars(submodule).items()
+        if not attr.startswith("_")
+        and (inspect.isfunction(value) or inspect.isclass(value))
+        and value.__module__ == submodule.__name__
+    }
+
+    assert public - _ENTRY_POINTS == set(den._submodule_attrs[name]) - {
+        attr
+        for attr in den._submodule_attrs[name]
+        if not callable(getattr(submodule, attr))
+    }
+
+
+@pytest.mark.parametrize("name", _submodules)
+def test_exports_resolve(name, monkeypatch):
+
+    submodule = import_module(f"{den.__name__}.{name}")
+
+    if name not in den._submodule_attrs[name]:
+        assert getattr(den, name) is submodule
+    for attr in den._submodule_attrs[name]:
+        # resolve through __getattr__ rather than a previously cached value
+        monkeypatch.delattr(den, attr, raising=False)
+        assert getattr(den, attr) is getattr(submodule, attr)
+        assert attr in dir(den)
+
+
+def test_function_named_like_its_submodule():
+
+    # the submodule must be imported first in a fresh interpreter
+    code = (
+        "from importlib import import_module; import inspect;"
+        f"import_module('{den.__name__}.download');"
+        f"import {den.__name__} as den;"
+        "assert inspect.isfunction(den.download), den.download"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
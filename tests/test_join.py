@@ -0,0 +1,50 @@
+import geopandas as gpd
+import shapely
+
+from conftest import make_points
+from dublin_electricity_network.join import join_nearest_points
+from dublin_electricity_network.join import link_remaining_to_nearest
+
+
+def test_link_remaining_to_nearest():
+
+    small_areas = gpd.GeoDataFrame(
+        {"SMALL_AREA": ["a", "b", "c", "d"]},
+        geometry=[shapely.box(x, 0, x + 10, 10) for x in (0, 100, 200, 300)],
+        crs="epsg:2157",
+    )
+    stations = make_points([[0, 0], [310, 0]])
+    stations["station_name"] = ["west", "east"]
+    # "a" is linked twice & "b" via the network to the far station
+    linked = small_areas.iloc[[0, 0, 1]].assign(station_name=["west", "west", "east"])
+
+    result = link_remaining_to_nearest(small_areas, linked, stations)
+
+    assert result.crs == small_areas.crs
+    assert result["SMALL_AREA"].tolist() == ["a", "b", "c", "d"]
+    assert result["station_name"].tolist() == ["west", "east", "east", "east"]
+    assert result.geometry.equals(small_areas.geometry)
+
+
+def test_link_remaining_to_nearest_all_linked():
+
+    small_areas = gpd.GeoDataFrame(
+        {"SMALL_AREA": ["a"]}, geometry=[shapely.box(0, 0, 1, 1)], crs="epsg:2157"
+    )
+    stations = make_points([[0, 0]]).assign(station_name=["west"])
+
+    result = link_remaining_to_nearest(
+        small_areas, small_areas.assign(station_name="west"), stations
+    )
+
+    assert result["station_name"].tolist() == ["west"]
+
+
+def test_join_nearest_points():
+
+    points = make_points([[0, 1], [9, 9]]).assign(sa_id=[1, 2])
+    stations = make_points([[0, 0], [10, 10]]).assign(station_name=["a", "b"])
+
+    joined = join_nearest_points(points, stations)
+
+    assert joined[["sa_id", "station_name"]].values.tolist() == [[1, "a"], [2, "b"]]
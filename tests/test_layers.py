@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+from conftest import make_grid
+from conftest import make_lines
+from conftest import make_points
+from dublin_electricity_network.layers import LayeredNetwork
+from dublin_electricity_network.layers import build_layered_network
+from dublin_electricity_network.layers import route_through_layers
+
+
+def test_route_through_layers_with_isolated_component(disconnected_graph):
+
+    network = LayeredNetwork(
+        layers={"mv": disconnected_graph, "hv": make_grid(5)},
+        station_nodes=pd.DataFrame({"mv": [0, 24, -1], "hv": [0, -1, 24]}),
+    )
+    origins = make_points([[10, 0], [1000, 0]])
+
+    routes = route_through_layers(network, origins, hops=[("mv", [0, 1]), ("hv", [2])])
+
+    assert routes["station_0"].tolist() == [0, -1]
+    assert routes["station_1"].tolist() == [2, -1]
+    assert routes["distance_0"].tolist() == [10, np.inf]
+    assert routes["distance"].tolist() == [90, np.inf]
+
+
+def test_build_layered_network_snaps_stations():
+
+    mv = make_lines(make_grid(3))
+    hv = make_lines(make_grid(3, origin=(500.0, 0.0)))
+    stations = make_points([[0, 0], [520, 20]])
+
+    network = build_layered_network({"mv": mv, "hv": hv}, stations)
+
+    assert (network.station_nodes.to_numpy() >= 0).tolist() == [
+        [True, False],
+        [False, True],
+    ]
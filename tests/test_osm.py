@@ -0,0 +1,111 @@
+import pytest
+import shapely
+
+from dublin_electricity_network import osm
+
+_OSM_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6" generator="test">
+  <node id="1" version="1" lat="53.30" lon="-6.30">
+    <tag k="power" v="substation"/><tag k="substation" v="distribution"/>
+  </node>
+  <node id="2" version="1" lat="53.30" lon="-5.00">
+    <tag k="substation" v="transmission"/>
+  </node>
+  <node id="3" version="1" lat="53.31" lon="-6.31"/>
+  <node id="4" version="1" lat="53.31" lon="-6.29"/>
+  <node id="5" version="1" lat="53.33" lon="-6.29"/>
+  <node id="6" version="1" lat="53.33" lon="-6.31"/>
+  <node id="7" version="1" lat="53.32" lon="-6.20"><tag k="name" v="shop"/></node>
+  <way id="10" version="1">
+    <nd ref="3"/><nd ref="4"/><nd ref="5"/><nd ref="6"/><nd ref="3"/>
+    <tag k="substation" v="distribution"/>
+  </way>
+</osm>
+"""
+
+_DUBLIN = shapely.box(-6.5, 53.2, -6.0, 53.5)
+
+
+def test_overpass_query():
+
+    query = osm._to_overpass_query(
+        _DUBLIN, {"substation": True, "power": ["sub station", "substation"]}
+    )
+
+    assert query.startswith("[out:json][timeout:180];(")
+    assert query.count("(poly:") == 6
+    assert '["substation"]' in query
+    assert r'["power"~"^(sub\ station|substation)$"]' in query
+    assert '"53.2000000 -6.0000000 53.5000000 -6.0000000 ' in query
+
+
+def test_overpass_query_multipolygon():
+
+    polygon = shapely.MultiPolygon([_DUBLIN, shapely.box(-9.1, 53.2, -9.0, 53.3)])
+
+    query = osm._to_overpass_query(polygon, {"substation": True}, date="2021-01-01")
+
+    assert '[date:"2021-01-01T00:00:00Z"]' in query
+    assert query.count("(poly:") == 6
+    assert query.count('(poly:"53.2000000 -9.0000000') == 3
+
+
+def test_overpass_query_rejects_other_geometries():
+
+    with pytest.raises(ValueError, match="LineString"):
+        osm._to_overpass_query(shapely.LineString([(0, 0), (1, 1)]), {"a": True})
+
+
+@pytest.fixture
+def overpass_calls(monkeypatch):
+    calls = []
+
+    def read_overpass(polygon, tag_filter, date=None, overpass_url=None):
+        calls.append(date)
+        return [
+            {
+                "element_type": "node",
+                "osmid": len(calls),
+                "substation": "distribution",
+                "lon": -6.26,
+                "lat": 53.34,
+            }
+        ]
+
+    monkeypatch.setattr(osm, "_read_overpass", read_overpass)
+    return calls
+
+
+def test_overpass_results_are_cached(overpass_calls, tmp_path):
+
+    pytest.importorskip("pyarrow")
+
+    first = osm.get_osm_points(_DUBLIN, cache_dirpath=tmp_path)
+    cached = osm.get_osm_points(_DUBLIN, cache_dirpath=tmp_path)
+    osm.get_osm_points(_DUBLIN, date="2021-01-01", cache_dirpath=tmp_path)
+    osm.get_osm_points(_DUBLIN, date="2021-01-01", cache_dirpath=tmp_path)
+    refreshed = osm.get_osm_points(_DUBLIN, cache_dirpath=tmp_path, refresh=True)
+    after_refresh = osm.get_osm_points(_DUBLIN, cache_dirpath=tmp_path)
+
+    assert overpass_calls == [None, "2021-01-01", None]
+    assert first.crs == "epsg:2157"
+    assert cached["osmid"].tolist() == [1]
+    assert refreshed["osmid"].tolist() == [3]
+    assert after_refresh["osmid"].tolist() == [3]
+
+
+def test_read_local_extract(tmp_path):
+
+    pytest.importorskip("osmium")
+    filepath = tmp_path / "dublin.osm"
+    filepath.write_text(_OSM_XML)
+
+    points = osm.get_osm_points(_DUBLIN, pbf_filepath=filepath)
+
+    # node 2 is outside the polygon & node 7 has no substation tag
+    assert points["element_type"].tolist() == ["node", "way"]
+    assert points["osmid"].tolist() == [1, 10]
+    assert points["power"].tolist()[0] == "substation"
+    assert points.crs == "epsg:2157"
+    centre = osm.points_from_xy([-6.30], [53.32], "epsg:4326")[0]
+    assert points.geometry[1].distance(centre) < 1e-6
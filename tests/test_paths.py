@@ -0,0 +1,218 @@
+import numpy as np
+import pytest
+from scipy.sparse.csgraph import dijkstra
+
+from conftest import make_grid
+from conftest import make_lines
+from conftest import make_points
+from dublin_electricity_network import paths
+from dublin_electricity_network.graph import make_network_graph
+from dublin_electricity_network.graph import nearest_nodes
+from dublin_electricity_network.graph import to_csr_matrix
+
+
+@pytest.fixture
+def weighted_graph():
+    """
+    A 12 x 12 grid with random edge lengths so no two paths tie.
+    """
+    grid = make_grid(12)
+    rng = np.random.default_rng(42)
+    return make_network_graph(
+        grid.node_xy,
+        grid.edge_u,
+        grid.edge_v,
+        rng.uniform(5, 15, len(grid.edge_u)),
+        grid.edge_offsets,
+        grid.edge_xy,
+    )
+
+
+def _brute_force_k_nearest(graph, orig_nodes, dest_nodes, k, max_distance):
+
+    distances = dijkstra(to_csr_matrix(graph), indices=dest_nodes)[:, orig_nodes].T
+    distances[distances > max_distance] = np.inf
+    order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+    nearest_distances = np.take_along_axis(distances, order, axis=1)
+    nearest_dests = np.where(np.isfinite(nearest_distances), order, -1)
+    return nearest_dests, nearest_distances
+
+
+@pytest.mark.parametrize(
+    "search",
+    [
+        paths._k_nearest_dests_by_dest,
+        paths._k_nearest_dests_by_labels,
+        paths._k_nearest_dests,
+    ],
+)
+@pytest.mark.parametrize("max_distance", [np.inf, 40.0])
+def test_k_nearest_dests_matches_brute_force(weighted_graph, search, max_distance):
+
+    rng = np.random.default_rng(0)
+    orig_nodes = rng.choice(weighted_graph.n_nodes, 50, replace=False)
+    dest_nodes = rng.choice(weighted_graph.n_nodes, 8, replace=False)
+
+    nearest_dests, nearest_distances = search(
+        weighted_graph, orig_nodes, dest_nodes, 3, max_distance
+    )
+
+    expected_dests, expected_distances = _brute_force_k_nearest(
+        weighted_graph, orig_nodes, dest_nodes, 3, max_distance
+    )
+    np.testing.assert_array_equal(nearest_dests, expected_dests)
+    np.testing.assert_allclose(nearest_distances, expected_distances)
+
+
+def test_k_nearest_dests_engines_agree_with_many_dests(weighted_graph):
+
+    rng = np.random.default_rng(1)
+    orig_nodes = rng.choice(weighted_graph.n_nodes, 40, replace=False)
+    dest_nodes = rng.choice(weighted_graph.n_nodes, 100, replace=False)
+
+    by_dest = paths._k_nearest_dests_by_dest(
+        weighted_graph, orig_nodes, dest_nodes, 2, np.inf
+    )
+    by_labels = paths._k_nearest_dests_by_labels(
+        weighted_graph, orig_nodes, dest_nodes, 2, np.inf
+    )
+
+    np.testing.assert_array_equal(by_dest[0], by_labels[0])
+    np.testing.assert_allclose(by_dest[1], by_labels[1])
+
+
+def test_get_k_nearest_dests_skips_unreachable(disconnected_graph):
+
+    origins = make_points([[0, 0], [1010, 10]])
+    stations = make_points([[40, 40], [0, 10], [1020, 20]])
+
+    nearest = paths.get_k_nearest_dests(disconnected_graph, origins, stations, k=2)
+
+    assert nearest.columns.tolist() == ["origin", "rank", "station", "distance"]
+    assert nearest.values.tolist() == [
+        [0, 0, 1, 10.0],
+        [0, 1, 0, 80.0],
+        [1, 0, 2, 20.0],
+    ]
+
+
+def test_iter_paths_match_brute_force(weighted_graph):
+
+    rng = np.random.default_rng(2)
+    origins = make_points(rng.uniform(0, 110, (40, 2)))
+    stations = make_points(rng.uniform(0, 110, (4, 2)))
+
+    results = [
+        path
+        for _, chunk in paths.iter_network_paths_between_points(
+            weighted_graph, origins, stations, chunksize=15
+        )
+        for path in chunk
+    ]
+
+    orig_nodes, _ = nearest_nodes(weighted_graph, origins)
+    dest_nodes, _ = nearest_nodes(weighted_graph, stations)
+    adjacency = to_csr_matrix(weighted_graph).toarray()
+    distances = dijkstra(adjacency, indices=dest_nodes)
+    node_ids = {tuple(xy): i for i, xy in enumerate(weighted_graph.node_xy.tolist())}
+    assert len(results) == len(origins)
+    for orig_node, (distance, path) in zip(orig_nodes, results):
+        assert distance == pytest.approx(distances[:, orig_node].min())
+        nodes = [node_ids[xy] for xy in path]
+        assert nodes[0] in dest_nodes
+        assert nodes[-1] == orig_node
+        edge_lengths = adjacency[nodes[:-1], nodes[1:]]
+        assert edge_lengths.sum() == pytest.approx(distance)
+
+
+@pytest.fixture
+def primal_graph():
+    momepy = pytest.importorskip("momepy")
+    return momepy.gdf_to_nx(make_lines(make_grid(5)), approach="primal")
+
+
+def test_chunked_paths_match_threaded(primal_graph):
+
+    pytest.importorskip("dask.distributed")
+    origins = make_points([[0, 0], [11, 19], [40, 40], [31, 2]])
+    stations = make_points([[0, 40], [40, 0]])
+
+    threaded = paths.get_network_paths_between_points(primal_graph, origins, stations)
+    chunked = paths.get_network_paths_between_points(
+        primal_graph, origins, stations, chunksize=3, n_workers=1
+    )
+
+    # networkx counts hops as the momepy edges have no `weight`
+    assert [distance for distance, _ in chunked] == [4, 3, 4, 1]
+    assert [distance for distance, _ in chunked] == [d for d, _ in threaded]
+    assert [path[-1] for _, path in chunked] == [
+        (0.0, 0.0),
+        (10.0, 20.0),
+        (40.0, 40.0),
+        (30.0, 0.0),
+    ]
+
+
+def test_iter_paths_with_isolated_component(disconnected_graph):
+
+    origins = make_points([[10, 0], [1000, 0], [40, 30]])
+    stations = make_points([[0, 0], [40, 40]])
+
+    chunks = list(
+        paths.iter_network_paths_between_points(
+            disconnected_graph, origins, stations, chunksize=2, skip_chunks={5}
+        )
+    )
+
+    assert chunks == [
+        (0, [(10.0, [(0.0, 0.0), (10.0, 0.0)]), (np.inf, [])]),
+        (1, [(10.0, [(40.0, 40.0), (40.0, 30.0)])]),
+    ]
+
+
+def test_iter_paths_skips_chunks(disconnected_graph):
+
+    origins = make_points([[10, 0], [1000, 0], [40, 30]])
+    stations = make_points([[0, 0]])
+
+    chunks = paths.iter_network_paths_between_points(
+        disconnected_graph, origins, stations, chunksize=2, skip_chunks={0}
+    )
+
+    assert [chunk for chunk, _ in chunks] == [1]
+
+
+def test_extract_nearest_dest_matches_quantised_coordinates():
+
+    dest = make_points([[716000.07, 734000.03], [716100.0, 734100.0]]).assign(
+        station=["a", "b"]
+    )
+    orig = make_points([[716010, 734000], [716100, 734110], [0, 0]]).assign(
+        area=[1, 2, 3]
+    )
+    # a quantised graph gives the dest coordinates back via a float multiply
+    paths_to_dests = [
+        (10.0, [(71600007 * 0.01, 73400003 * 0.01), (716010.0, 734000.0)]),
+        (10.0, [(716100.0, 734100.0), (716100.0, 734110.0)]),
+        (np.inf, []),
+    ]
+
+    linked = paths.extract_nearest_dest(paths_to_dests, orig, dest)
+
+    assert dict(zip(linked["area"], linked["station"])) == {1: "a", 2: "b"}
+
+
+def test_nearest_dest_per_node_isolated_component(disconnected_graph):
+
+    nearest_dests, distances, predecessors = paths._nearest_dest_per_node(
+        disconnected_graph, [24, 0]
+    )
+
+    # grid node i * 5 + j is 10 * (i + j) from node 0 & 10 * (8 - i - j) from 24
+    steps = np.add.outer(np.arange(5), np.arange(5)).ravel()
+    np.testing.assert_array_equal(distances[:25], 10 * np.minimum(steps, 8 - steps))
+    assert np.all(nearest_dests[:25][steps < 4] == 1)
+    assert np.all(nearest_dests[:25][steps > 4] == 0)
+    np.testing.assert_array_equal(nearest_dests[25:], -1)
+    np.testing.assert_array_equal(distances[25:], np.inf)
+    np.testing.assert_array_equal(predecessors[25:], -9999)
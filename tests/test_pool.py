@@ -0,0 +1,25 @@
+import os
+
+from dublin_electricity_network.pool import process_pool
+from dublin_electricity_network.pool import worker_state
+
+
+def _setup(offset):
+    return {"offset": offset, "pid": os.getpid()}
+
+
+def _add_offset(value):
+    state = worker_state()
+    return value + state["offset"], state["pid"]
+
+
+def test_process_pool_builds_state_once_per_worker():
+
+    with process_pool(_setup, 10, n_workers=2) as executor:
+        results = list(executor.map(_add_offset, range(20)))
+
+    assert [value for value, _ in results] == list(range(10, 30))
+    pids = {pid for _, pid in results}
+    assert os.getpid() not in pids
+    assert 1 <= len(pids) <= 2
+    assert worker_state() is None
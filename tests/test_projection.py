@@ -0,0 +1,109 @@
+import threading
+from types import SimpleNamespace
+
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+
+from dublin_electricity_network import projection
+
+
+@pytest.fixture
+def lines():
+    rng = np.random.default_rng(0)
+    starts = rng.uniform([700000, 730000], [720000, 750000], (20, 2))
+    return gpd.GeoDataFrame(
+        {"name": np.arange(20)},
+        geometry=shapely.linestrings(np.stack([starts, starts + 500], axis=1)),
+        crs="epsg:2157",
+    )
+
+
+def test_get_transformer_is_cached():
+
+    transformer = projection.get_transformer("epsg:4326")
+
+    assert projection.get_transformer("EPSG:4326", 2157) is transformer
+
+
+@pytest.mark.parametrize("n_threads", [1, 3])
+def test_transform_xy_matches_geopandas(lines, n_threads):
+
+    xy = shapely.get_coordinates(lines.geometry.values)
+
+    x, y = projection.transform_xy(
+        xy[:, 0], xy[:, 1], "epsg:2157", "epsg:4326", n_threads=n_threads, chunksize=7
+    )
+
+    expected = shapely.get_coordinates(lines.to_crs("epsg:4326").geometry.values)
+    np.testing.assert_allclose(np.column_stack([x, y]), expected)
+
+
+def test_transform_xy_threads_do_not_share_transformers(monkeypatch):
+
+    uses = []
+
+    class RecordingTransformer:
+        # records the thread each transformer is built in & used from
+        def __init__(self, transformer):
+            self.transformer = transformer
+            self.thread = threading.get_ident()
+
+        def transform(self, x, y):
+            uses.append((self.thread, threading.get_ident()))
+            return self.transformer.transform(x, y)
+
+    Transformer = projection.Transformer
+    projection.get_transformer(2157, 29903)  # cache it before patching
+    monkeypatch.setattr(
+        projection,
+        "Transformer",
+        SimpleNamespace(
+            from_crs=lambda *args, **kwargs: RecordingTransformer(
+                Transformer.from_crs(*args, **kwargs)
+            )
+        ),
+    )
+
+    x, y = projection.transform_xy(
+        np.arange(100.0), np.arange(100.0), 2157, 29903, n_threads=4, chunksize=5
+    )
+
+    expected_x, expected_y = Transformer.from_crs(
+        2157, 29903, always_xy=True
+    ).transform(np.arange(100.0), np.arange(100.0))
+    np.testing.assert_allclose(x, expected_x)
+    np.testing.assert_allclose(y, expected_y)
+    assert len(uses) == 20
+    assert all(built_in == used_in for built_in, used_in in uses)
+
+
+@pytest.mark.parametrize("n_threads", [1, 2])
+def test_to_crs_matches_geopandas(lines, n_threads):
+
+    reprojected = projection.to_crs(lines, "epsg:29903", n_threads=n_threads)
+
+    expected = lines.to_crs("epsg:29903")
+    assert reprojected.crs == expected.crs
+    assert reprojected["name"].tolist() == expected["name"].tolist()
+    assert reprojected.geometry.geom_equals_exact(expected.geometry, 1e-6).all()
+    assert isinstance(projection.to_crs(lines.geometry), gpd.GeoSeries)
+
+
+def test_points_from_xy():
+
+    points = projection.points_from_xy([-6.26], [53.34], "epsg:4326")
+
+    expected = gpd.GeoSeries.from_xy([-6.26], [53.34], crs="epsg:4326").to_crs(2157)
+    assert points.crs == "epsg:2157"
+    assert points[0].equals_exact(expected[0], 1e-6)
+
+
+def test_with_lat_long(lines):
+
+    result = projection.with_lat_long(lines)
+
+    centroids = lines.geometry.centroid.to_crs("epsg:4326")
+    np.testing.assert_allclose(result["Latitude"], centroids.y)
+    np.testing.assert_allclose(result["Longitude"], centroids.x)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from conftest import make_points
+from dublin_electricity_network.raster import NO_STATION
+from dublin_electricity_network.raster import lookup_stations
+from dublin_electricity_network.raster import rasterise_nearest_stations
+from dublin_electricity_network.raster import read_station_grid
+from dublin_electricity_network.raster import write_station_grid
+
+
+@pytest.fixture
+def grid(disconnected_graph):
+    stations = make_points([[0, 0], [40, 40]])
+    return rasterise_nearest_stations(
+        disconnected_graph, stations, (-5, -5, 1025, 45), cell_size=10, chunksize=2
+    )
+
+
+def test_rasterise_nearest_stations(grid):
+
+    assert grid.station.shape == (5, 103)
+    # cell (row, col) is centred on grid node (col, row) 10 * (row + col) from
+    # station 0 & 10 * (8 - row - col) from station 1
+    steps = np.add.outer(np.arange(5), np.arange(5))
+    np.testing.assert_array_equal(
+        grid.distance[:, :5], 10 * np.minimum(steps, 8 - steps)
+    )
+    assert np.all(grid.station[:, :5][steps < 4] == 0)
+    assert np.all(grid.station[:, :5][steps > 4] == 1)
+
+
+def test_rasterise_isolated_component(grid):
+
+    # cells nearer the isolated component than the stations' component
+    col_x = -5 + (np.arange(103) + 0.5) * 10
+    isolated = col_x > 520
+    assert np.all(grid.station[:, isolated] == NO_STATION)
+    assert np.all(np.isnan(grid.distance[:, isolated]))
+    assert np.all(grid.station[:, ~isolated] != NO_STATION)
+    assert not np.any(np.isnan(grid.distance[:, ~isolated]))
+
+
+def test_lookup_stations(grid, tmp_path):
+
+    write_station_grid(grid, tmp_path)
+    loaded = read_station_grid(tmp_path)
+
+    station, distance = lookup_stations(loaded, [1, 39, 1010, -100], [1, 38, 10, 0])
+
+    assert station.tolist() == [0, 1, NO_STATION, NO_STATION]
+    np.testing.assert_array_equal(distance, [0, 0, np.nan, np.nan])
+
+
+def test_rasterise_too_many_stations(disconnected_graph):
+
+    stations = make_points(np.zeros((NO_STATION, 2)))
+
+    with pytest.raises(ValueError):
+        rasterise_nearest_stations(disconnected_graph, stations, (0, 0, 10, 10))
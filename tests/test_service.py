@@ -0,0 +1,157 @@
+import asyncio
+from http import HTTPStatus
+import json
+
+import pytest
+
+from conftest import make_points
+from dublin_electricity_network import service
+
+
+@pytest.fixture
+def index(disconnected_graph):
+    stations = make_points([[0, 0], [40, 40]])
+    stations["station_name"] = ["west", "east"]
+    return service.build_station_index(disconnected_graph, stations, "station_name")
+
+
+def test_query_station_index(index):
+
+    results = service.query_station_index(
+        index, [[11, 1], [1000, 0]], include_paths=True
+    )
+
+    assert results == [
+        {
+            "station": "west",
+            "distance": 10.0,
+            "snap_distance": pytest.approx(2**0.5),
+            "path": [[0.0, 0.0], [10.0, 0.0]],
+        },
+        # the isolated component can reach neither station
+        {"station": None, "distance": None, "snap_distance": 0.0, "path": []},
+    ]
+
+
+@pytest.mark.parametrize("crs", ["EPSG:4326", 4326])
+def test_query_station_index_reprojects(index, crs):
+
+    lon, lat = service.transform_xy([40], [40], "epsg:2157", "epsg:4326")
+
+    (result,) = service.query_station_index(index, [[lon[0], lat[0]]], crs)
+
+    assert result["station"] == "east"
+    assert result["snap_distance"] == pytest.approx(0, abs=1e-6)
+
+
+@pytest.mark.parametrize(
+    "method, target, body, status",
+    [
+        ("GET", "/health", b"", HTTPStatus.OK),
+        ("POST", "/nearest", b'{"points": [[0, 0]]}', HTTPStatus.OK),
+        ("POST", "/nearest", b"{}", HTTPStatus.BAD_REQUEST),
+        ("POST", "/nearest", b"not json", HTTPStatus.BAD_REQUEST),
+        (
+            "POST",
+            "/nearest",
+            b'{"points": [[0, 0]], "crs": "epsg:bogus"}',
+            HTTPStatus.BAD_REQUEST,
+        ),
+        ("POST", "/nearest", b'{"points": [[0, 0]], "crs": 2157}', HTTPStatus.OK),
+        (
+            "POST",
+            "/nearest",
+            b'{"points": [[0, 0]], "crs": [4326]}',
+            HTTPStatus.BAD_REQUEST,
+        ),
+        ("GET", "/nearest", b"", HTTPStatus.NOT_FOUND),
+    ],
+)
+def test_handle_request(index, method, target, body, status):
+
+    response_status, payload = service.handle_request(index, method, target, body)
+
+    assert response_status == status
+    assert ("error" in payload) == (status != HTTPStatus.OK)
+
+
+def test_handle_request_unexpected_error(index, monkeypatch):
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, "query_station_index", fail)
+
+    status, payload = service.handle_request(
+        index, "POST", "/nearest", b'{"points": [[0, 0]]}'
+    )
+
+    assert status == HTTPStatus.INTERNAL_SERVER_ERROR
+    assert payload == {"error": "boom"}
+
+
+class _Writer:
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _respond(index, request):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(request)
+        reader.feed_eof()
+        writer = _Writer()
+        await service._handle_connection(index, reader, writer)
+        return writer.data
+
+    head, _, content = asyncio.run(run()).partition(b"\r\n\r\n")
+    return head.split(b"\r\n")[0].decode(), json.loads(content)
+
+
+def test_handle_connection(index):
+
+    body = b'{"points": [[40, 39]]}'
+    status_line, payload = _respond(
+        index,
+        b"POST /nearest HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body,
+    )
+
+    assert status_line == "HTTP/1.1 200 OK"
+    assert payload["results"][0]["station"] == "east"
+
+
+@pytest.mark.parametrize(
+    "request_, status_line",
+    [
+        (b"garbage\r\n\r\n", "HTTP/1.1 400 Bad Request"),
+        (
+            b"POST /nearest HTTP/1.1\r\nContent-Length: 100\r\n\r\n{}",
+            "HTTP/1.1 400 Bad Request",
+        ),
+    ],
+)
+def test_handle_connection_bad_request(index, request_, status_line):
+
+    assert _respond(index, request_)[0] == status_line
+
+
+def test_handle_connection_unexpected_error(index, monkeypatch):
+
+    def fail(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, "handle_request", fail)
+
+    status_line, payload = _respond(index, b"GET /health HTTP/1.1\r\n\r\n")
+
+    assert status_line == "HTTP/1.1 500 Internal Server Error"
+    assert payload == {"error": "boom"}
@@ -0,0 +1,61 @@
+import pytest
+
+from conftest import make_points
+from dublin_electricity_network import stream
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def points():
+    origins = make_points([[10, 0], [1000, 0], [40, 30], [0, 30], [20, 20]])
+    origins["sa_id"] = ["a", "b", "c", "d", "e"]
+    stations = make_points([[0, 0], [40, 40]])
+    stations["station_name"] = ["west", "east"]
+    return origins, stations
+
+
+def test_write_nearest_dest_in_chunks(disconnected_graph, points, tmp_path):
+
+    origins, stations = points
+
+    stream.write_nearest_dest_in_chunks(
+        disconnected_graph, origins, stations, tmp_path, chunksize=2
+    )
+    linked = stream.read_chunks(tmp_path)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "chunk-0.parquet",
+        "chunk-1.parquet",
+        "chunk-2.parquet",
+    ]
+    # the orig on the isolated component has no station & is dropped
+    assert linked["sa_id"].tolist() == ["a", "c", "d", "e"]
+    assert linked["station_name"].tolist()[:2] == ["west", "east"]
+    assert linked.crs == origins.crs
+
+
+def test_write_nearest_dest_in_chunks_resumes(
+    disconnected_graph, points, tmp_path, monkeypatch
+):
+
+    origins, stations = points
+    stream.write_nearest_dest_in_chunks(
+        disconnected_graph, origins, stations, tmp_path, chunksize=2
+    )
+    (tmp_path / "chunk-1.parquet").unlink()
+
+    skipped = []
+    iter_paths = stream.iter_network_paths_between_points
+
+    def record_skipped(*args, skip_chunks, **kwargs):
+        skipped.append(skip_chunks)
+        return iter_paths(*args, skip_chunks=skip_chunks, **kwargs)
+
+    monkeypatch.setattr(stream, "iter_network_paths_between_points", record_skipped)
+    stream.write_nearest_dest_in_chunks(
+        disconnected_graph, origins, stations, tmp_path, chunksize=2
+    )
+
+    assert skipped == [{0, 2}]
+    assert len(stream.read_chunks(tmp_path)) == 4
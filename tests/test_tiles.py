@@ -0,0 +1,84 @@
+import gzip
+import json
+import sqlite3
+
+import geopandas as gpd
+import pytest
+import shapely
+
+from dublin_electricity_network.tiles import _tile_bounds
+from dublin_electricity_network.tiles import _tiles_for_bounds
+from dublin_electricity_network.tiles import write_mbtiles
+
+mapbox_vector_tile = pytest.importorskip("mapbox_vector_tile")
+
+
+def test_tile_bounds():
+
+    assert _tile_bounds(0, 0, 0) == pytest.approx(
+        (-20037508.34, -20037508.34, 20037508.34, 20037508.34)
+    )
+    # XYZ rows count down from the top
+    assert _tile_bounds(1, 1, 0) == pytest.approx((0, 0, 20037508.34, 20037508.34))
+
+
+def test_tiles_for_bounds():
+
+    assert _tiles_for_bounds((-1, -1, 1, 1), 1) == [
+        (1, 0, 0),
+        (1, 0, 1),
+        (1, 1, 0),
+        (1, 1, 1),
+    ]
+    assert _tiles_for_bounds((1, 1, 2, 2), 2) == [(2, 2, 1)]
+    # bounds reaching beyond the world are clamped to the tile grid
+    assert _tiles_for_bounds((-1e9, 1, -1, 1e9), 1) == [(1, 0, 0)]
+
+
+def test_write_mbtiles(tmp_path):
+
+    lines = gpd.GeoDataFrame(
+        {"voltage": [10, 20], "name": ["a", None]},
+        geometry=[
+            shapely.LineString([(716000, 734000), (717000, 735000)]),
+            shapely.LineString([(716000, 735000), (717000, 734000)]),
+        ],
+        crs="epsg:2157",
+    )
+    filepath = tmp_path / "network.mbtiles"
+
+    write_mbtiles({"network": lines}, filepath, min_zoom=10, max_zoom=12, n_workers=1)
+
+    connection = sqlite3.connect(filepath)
+    metadata = dict(connection.execute("SELECT name, value FROM metadata"))
+    tiles = connection.execute(
+        "SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles"
+    ).fetchall()
+    connection.close()
+
+    assert not filepath.with_suffix(".mbtiles.tmp").exists()
+    assert (metadata["minzoom"], metadata["maxzoom"]) == ("10", "12")
+    assert json.loads(metadata["json"])["vector_layers"] == [
+        {
+            "id": "network",
+            "fields": {"voltage": "Number", "name": "String"},
+            "minzoom": 10,
+            "maxzoom": 12,
+        }
+    ]
+    lon_min, lat_min, lon_max, lat_max = map(float, metadata["bounds"].split(","))
+    assert -6.4 < lon_min < lon_max < -6.2
+    assert 53.3 < lat_min < lat_max < 53.4
+    assert {zoom for zoom, *_ in tiles} == {10, 11, 12}
+    for zoom, x, tms_y, tile_data in tiles:
+        # rows are stored bottom up
+        xyz_y = 2**zoom - 1 - tms_y
+        assert (zoom, x, xyz_y) in _tiles_for_bounds(
+            lines.to_crs("epsg:3857").total_bounds, zoom
+        )
+        layer = mapbox_vector_tile.decode(gzip.decompress(tile_data))["network"]
+        properties = [feature["properties"] for feature in layer["features"]]
+        assert {"voltage": 20} in properties or {
+            "voltage": 10,
+            "name": "a",
+        } in properties